@@ -0,0 +1,160 @@
+"""
+Compare HF advisor inference backends.
+
+Each backend runs in a fresh interpreter and reports model load time,
+resident memory and per-batch encode latency on a labeled set of column
+names. Suggestions are checked against the torch reference backend.
+
+    python -m benchmarks.bench_advisor_backends --backends torch onnx onnx-int8
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+# (column name, expected semantic label)
+LABELED_COLUMNS = [
+    ("revenue", "revenue"),
+    ("total_revenue", "revenue"),
+    ("sales_amount", "sales amount"),
+    ("total_sales", "sales amount"),
+    ("maths", "academic score"),
+    ("total_marks", "academic score"),
+    ("exam_score", "academic score"),
+    ("units_sold", "quantity"),
+    ("qty", "quantity"),
+    ("order_count", "count"),
+    ("order_date", "date"),
+    ("exam_date", "date"),
+    ("created_at", "timestamp"),
+    ("event_timestamp", "timestamp"),
+    ("student_name", "person name"),
+    ("customer_name", "person name"),
+    ("product", "product name"),
+    ("product_name", "product name"),
+    ("category", "category"),
+    ("segment", "category"),
+    ("region", "geographic region"),
+    ("country", "geographic region"),
+    ("department", "department"),
+    ("dept_name", "department"),
+]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(backend: str, repeats: int) -> dict:
+    """
+    Measure one backend in this process, bypassing the embedding cache.
+    """
+    from src.v4 import semantic_advisor as advisor
+
+    advisor.set_backend(backend)
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = advisor._load_model()
+    load_s = time.perf_counter() - start
+
+    if model is None:
+        return {"backend": backend, "error": "backend unavailable"}
+
+    rss_after = _rss_mb()
+    texts = [name for name, _ in LABELED_COLUMNS]
+
+    labels = advisor._encode(model, advisor.SEMANTIC_LABELS)
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        columns = advisor._encode(model, texts)
+        latencies.append(time.perf_counter() - start)
+
+    best = (columns @ labels.T).argmax(axis=1)
+
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "rss_mb": rss_after,
+        "rss_delta_mb": rss_after - rss_before,
+        "batch_ms_p50": statistics.median(latencies) * 1000,
+        "suggestions": [advisor.SEMANTIC_LABELS[int(i)] for i in best],
+    }
+
+
+def measure(backend: str, repeats: int) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_advisor_backends",
+         "--worker", backend, "--repeats", str(repeats)],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return {"backend": backend, "error": proc.stderr.strip().splitlines()[-1:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--reference", default="torch")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--min-agreement", type=float, default=1.0)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repeats)))
+        return
+
+    backends = list(dict.fromkeys([args.reference] + args.backends))
+    results = {b: measure(b, args.repeats) for b in backends}
+
+    reference = results[args.reference].get("suggestions")
+    expected = [label for _, label in LABELED_COLUMNS]
+    failed = False
+
+    print(f"{'backend':<12}{'load':>9}{'rss':>10}{'batch p50':>12}{'accuracy':>10}{'agreement':>11}")
+    for backend, r in results.items():
+        if "error" in r:
+            print(f"{backend:<12} unavailable: {r['error']}")
+            continue
+
+        suggestions = r["suggestions"]
+        accuracy = sum(s == e for s, e in zip(suggestions, expected)) / len(expected)
+        agreement = (
+            sum(s == ref for s, ref in zip(suggestions, reference)) / len(reference)
+            if reference else float("nan")
+        )
+
+        print(
+            f"{backend:<12}{r['load_s']:>8.2f}s{r['rss_mb']:>8.0f}MB"
+            f"{r['batch_ms_p50']:>10.2f}ms{accuracy:>10.0%}{agreement:>11.0%}"
+        )
+
+        if reference and agreement < args.min_agreement:
+            failed = True
+            for (name, _), s, ref in zip(LABELED_COLUMNS, suggestions, reference):
+                if s != ref:
+                    print(f"    {name}: {s} (reference: {ref})")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Cold versus warm load times of the columnar dataset cache.
+
+    python -m benchmarks.bench_dataset_cache --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src.utils import dataset_cache
+from src.utils.cache_paths import CACHE_ENV_VAR
+from benchmarks.synthetic import generate_sales, write_csv
+
+
+CURATED = [
+    "data/curated/sales_data.csv",
+    "data/curated/student_marks.csv",
+]
+
+
+def _timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_file(path: str) -> dict:
+    def cold():
+        dataset_cache.clear_cache()
+        dataset_cache.load_csv_cached(path)
+
+    cold_s = _timed(cold)
+    dataset_cache.load_csv_cached(path)
+    warm_s = _timed(lambda: dataset_cache.load_csv_cached(path))
+    text_s = _timed(lambda: pd.read_csv(path))
+
+    return {
+        "file": os.path.basename(path),
+        "read_csv_s": text_s,
+        "cold_s": cold_s,
+        "warm_s": warm_s,
+        "speedup": text_s / warm_s if warm_s else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the user's cache untouched
+        os.environ[CACHE_ENV_VAR] = os.path.join(tmp, "cache")
+
+        synthetic = write_csv(
+            generate_sales(args.rows),
+            os.path.join(tmp, f"synthetic_sales_{args.rows}.csv"),
+        )
+
+        print(f"{'file':<32}{'read_csv':>12}{'cold':>12}{'warm':>12}{'speedup':>10}")
+        for path in CURATED + [synthetic]:
+            r = bench_file(path)
+            print(
+                f"{r['file']:<32}{r['read_csv_s']:>11.4f}s{r['cold_s']:>11.4f}s"
+                f"{r['warm_s']:>11.4f}s{r['speedup']:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Memory and groupby latency of raw versus dictionary-encoded key columns.
+
+Builds a canonical frame with a high-cardinality entity column twice,
+once with the raw string keys and once dictionary-encoded as
+build_canonical_dataframe now stores them, and reports frame memory,
+the one-off encoding cost, and rank / compare latency.
+
+    python -m benchmarks.bench_dictionary_encoding --rows 5000000 --entities 1000000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from src.v4.analytics_engine import group_sum, run_rank, run_compare
+from src.v4.schema_adapter import dictionary_encode
+from benchmarks.synthetic import generate_sales
+
+
+def _timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def canonical_frames(rows: int, entities: int, object_keys: bool):
+    sales = generate_sales(rows, entities=entities)
+    if object_keys:
+        sales = sales.astype({"salesperson": object, "region": object})
+
+    raw = pd.DataFrame({
+        "measure": sales["revenue"],
+        "entity": sales["salesperson"],
+        "dimension_1": sales["region"],
+    })
+
+    start = time.perf_counter()
+    encoded = raw.assign(
+        entity=dictionary_encode(raw["entity"]),
+        dimension_1=dictionary_encode(raw["dimension_1"]),
+    )
+    encode_s = time.perf_counter() - start
+
+    return raw, encoded, encode_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    parser.add_argument("--object-keys", action="store_true",
+                        help="Use object-dtype keys instead of the default string dtype")
+    args = parser.parse_args()
+
+    raw, encoded, encode_s = canonical_frames(args.rows, args.entities, args.object_keys)
+
+    print(f"frame: {args.rows:,} rows, {raw['entity'].nunique():,} distinct entities, "
+          f"key dtype {raw['entity'].dtype}")
+    print(f"one-off encoding: {encode_s:.2f}s\n")
+
+    rows = [
+        ("memory (MiB)", lambda df: df.memory_usage(deep=True).sum() / 2 ** 20),
+        ("entity group_sum (s)", lambda df: _timed(lambda: group_sum(df, "entity"))),
+        ("run_rank (s)", lambda df: _timed(lambda: run_rank(df))),
+        ("run_compare (s)", lambda df: _timed(lambda: run_compare(df))),
+    ]
+
+    print(f"{'':24}{'raw':>12}{'encoded':>12}{'ratio':>8}")
+    for label, measure in rows:
+        before, after = measure(raw), measure(encoded)
+        print(f"{label:24}{before:>12.2f}{after:>12.2f}{before / after:>7.1f}x")
+
+    if repr(run_rank(raw)) != repr(run_rank(encoded)):
+        print("\nMISMATCH between raw and encoded rankings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Mapping proposal latency on very wide schemas (HF hints excluded).
+
+Compares the vectorized score matrix against calling the per-column
+scorers in a loop, checks both agree, and fails when proposals exceed
+the budget.
+
+    python -m benchmarks.bench_mapping --cols 10000 --budget-ms 100
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, Any
+
+import numpy as np
+
+from src.v4 import semantic_mapper
+from src.v4.semantic_advisor import set_advisor_enabled
+
+
+NAME_PARTS = ["revenue", "student_name", "order_date", "region", "type", "score", "qty", "month", "user"]
+
+
+def synthetic_schema_report(cols: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Schema report shaped like extract_schema output, mixed column types.
+    """
+    rng = np.random.default_rng(seed)
+    report = {}
+
+    for i in range(cols):
+        column = f"{NAME_PARTS[i % len(NAME_PARTS)]}_{i}"
+        kind = rng.choice(["numeric", "numeric", "categorical", "date", "text"])
+
+        if kind == "numeric":
+            mean = float(rng.normal(100, 15))
+            signals = {
+                "unique_count": int(rng.integers(1, 1000)),
+                "min": mean - 50,
+                "max": mean + float(rng.choice([-1, 50])),
+                "mean": mean,
+            }
+        elif kind == "categorical":
+            signals = {"unique_count": int(rng.integers(1, 50)), "top_values": []}
+        else:
+            signals = {}
+
+        report[column] = {"type": str(kind), "missing": 0, "signals": signals}
+
+    return report
+
+
+def scalar_scores(schema_report: Dict[str, Any]) -> np.ndarray:
+    return np.array([
+        [
+            semantic_mapper.score_numeric_measure(info),
+            semantic_mapper.score_entity(column, info),
+            semantic_mapper.score_time(column, info),
+            semantic_mapper.score_dimension(column, info),
+        ]
+        for column, info in schema_report.items()
+    ]).reshape(-1, 4)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cols", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    set_advisor_enabled(False)
+    report = synthetic_schema_report(args.cols)
+
+    _, vectorized = semantic_mapper.score_matrix(report)
+    if not np.array_equal(vectorized, scalar_scores(report)):
+        print("MISMATCH between score_matrix and the per-column scorers")
+        sys.exit(1)
+
+    scalar_ms = best_of(lambda: scalar_scores(report), args.repeat)
+    matrix_ms = best_of(lambda: semantic_mapper.score_matrix(report), args.repeat)
+    propose_ms = best_of(lambda: semantic_mapper.propose_mappings(report), args.repeat)
+
+    print(f"schema: {args.cols:,} columns")
+    print(f"  per-column scorers : {scalar_ms:8.1f} ms")
+    print(f"  score_matrix       : {matrix_ms:8.1f} ms")
+    print(f"  propose_mappings   : {propose_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if propose_ms > args.budget_ms:
+        print("FAIL: over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
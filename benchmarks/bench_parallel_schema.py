@@ -0,0 +1,71 @@
+"""
+Scaling of process-pool schema extraction from 1 to N workers.
+
+The default shape (10M rows x 200 columns) needs ~16 GB of RAM; use
+--rows / --cols to scale it down.
+
+    python -m benchmarks.bench_parallel_schema --rows 1000000 --cols 50 --workers 1 2 4 8
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.v3.schema_extractor import extract_schema
+from src.v4.parallel_schema import extract_schema_parallel
+
+
+def synthetic_wide_frame(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Mostly numeric columns, every tenth column categorical, one date column.
+    """
+    rng = np.random.default_rng(seed)
+    categories = np.array([f"cat_{i}" for i in range(50)], dtype=object)
+    dates = pd.date_range("2024-01-01", periods=365).strftime("%Y-%m-%d").to_numpy()
+
+    columns = {"order_date": dates[rng.integers(0, len(dates), rows)]}
+    for i in range(cols - 1):
+        if i % 10 == 9:
+            columns[f"dim_{i}"] = categories[rng.integers(0, len(categories), rows)]
+        elif i % 2:
+            columns[f"int_{i}"] = rng.integers(0, 1_000, rows)
+        else:
+            columns[f"float_{i}"] = rng.normal(100, 15, rows)
+
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--cols", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    df = synthetic_wide_frame(args.rows, args.cols)
+    print(f"frame: {args.rows:,} rows x {args.cols} columns")
+
+    reference = None
+    baseline = None
+
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        if workers == 1:
+            report = extract_schema(df)
+        else:
+            report = extract_schema_parallel(df, workers=workers, min_cells=0)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference, baseline = report, elapsed
+        elif report != reference:
+            print(f"{workers:>8}  MISMATCH against serial schema_report")
+
+        print(f"{workers:>8}{elapsed:>9.2f}s{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+End-to-end pipeline benchmark with saved baselines.
+
+Generates a synthetic sales- or marks-like CSV and times every stage
+separately: load_dataset, extract_schema, propose_mappings (without and,
+when the model is available, with the HF advisor),
+build_canonical_dataframe, reason_about_capabilities and each run_*
+intent. Each stage reports its best wall time over --repeat runs and
+its peak traced memory (tracemalloc, measured in a separate run so
+tracing does not skew the timings).
+
+--save-baseline writes the results to a JSON file; --baseline compares
+against one and exits non-zero when a stage got slower (or used more
+memory) than the baseline by more than --tolerance.
+
+    python -m benchmarks.bench_pipeline --kind sales --rows 200000 --save-baseline base.json
+    python -m benchmarks.bench_pipeline --kind sales --rows 200000 --baseline base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Any, List, Optional
+
+from src.utils.loading import load_dataset
+from src.v4.parallel_schema import extract_schema_parallel
+from src.v4.semantic_mapper import propose_mappings, auto_confirm_mappings
+from src.v4 import semantic_advisor
+from src.v4.date_parsing import clear_date_cache
+from src.v4.schema_adapter import build_canonical_dataframe
+from src.v4.system_reasoner import reason_about_capabilities
+from src.v4.analytics_engine import run_summary, run_rank, run_trend, run_compare
+from src.core.semantic_context import SemanticContext, SemanticMode
+from benchmarks.synthetic import KINDS, generate, write_csv
+
+
+# Minimum absolute change (seconds / MiB) before a stage can regress,
+# so noise on very fast stages is not flagged
+MIN_SECONDS_DELTA = 0.005
+MIN_MIB_DELTA = 1.0
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable] = None) -> Dict[str, float]:
+    """
+    Best wall time over repeat runs, then peak traced memory of one more run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": best, "peak_mib": peak / 2 ** 20}
+
+
+def run_stages(path: str, repeat: int, with_hf: bool) -> Dict[str, Dict[str, float]]:
+    stages: Dict[str, Dict[str, float]] = {}
+    semantic_context = SemanticContext(mode=SemanticMode.SINGLE_MEASURE)
+
+    stages["load_dataset"] = measure(
+        lambda: load_dataset(path, use_cache=False), repeat, clear_date_cache
+    )
+    df = load_dataset(path, use_cache=False)
+
+    stages["extract_schema"] = measure(
+        lambda: extract_schema_parallel(df, workers=1), repeat, clear_date_cache
+    )
+    schema_report = extract_schema_parallel(df, workers=1)
+
+    semantic_advisor.set_advisor_enabled(False)
+    stages["propose_mappings"] = measure(lambda: propose_mappings(schema_report), repeat)
+
+    if with_hf:
+        semantic_advisor.set_advisor_enabled(True)
+        if semantic_advisor._load_model() is not None:
+            # Model load excluded; the persistent embedding cache is
+            # bypassed so every run encodes
+            saved = semantic_advisor._embedding_cache, semantic_advisor._embedding_cache_failed
+            semantic_advisor._embedding_cache, semantic_advisor._embedding_cache_failed = None, True
+            try:
+                stages["propose_mappings_hf"] = measure(
+                    lambda: propose_mappings(schema_report), repeat
+                )
+            finally:
+                semantic_advisor._embedding_cache, semantic_advisor._embedding_cache_failed = saved
+        semantic_advisor.set_advisor_enabled(False)
+
+    confirmed = auto_confirm_mappings(propose_mappings(schema_report))
+    if not confirmed["measures"]:
+        raise SystemExit("No measures proposed for the synthetic dataset")
+    confirmed["active_measure"] = confirmed["measures"][0]
+
+    stages["build_canonical_dataframe"] = measure(
+        lambda: build_canonical_dataframe(df, confirmed, semantic_context),
+        repeat,
+        clear_date_cache,
+    )
+    canonical_df = build_canonical_dataframe(df, confirmed, semantic_context)
+
+    stages["reason_about_capabilities"] = measure(
+        lambda: reason_about_capabilities(canonical_df, semantic_context), repeat
+    )
+
+    intents = {
+        "run_summary": run_summary,
+        "run_rank": run_rank,
+        "run_trend": run_trend,
+        "run_compare": run_compare,
+    }
+    for name, run in intents.items():
+        stages[name] = measure(lambda run=run: run(canonical_df), repeat)
+
+    return stages
+
+
+# -----------------------------
+# Baselines
+# -----------------------------
+
+def regressions(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float
+) -> List[str]:
+    """
+    Human-readable lines for stages slower / larger than baseline * (1 + tolerance).
+    """
+    found = []
+
+    for stage, before in baseline.items():
+        after = current.get(stage)
+        if after is None:
+            continue
+
+        for metric, floor in (("seconds", MIN_SECONDS_DELTA), ("peak_mib", MIN_MIB_DELTA)):
+            limit = before[metric] * (1 + tolerance)
+            if after[metric] > limit and after[metric] - before[metric] > floor:
+                found.append(
+                    f"{stage}: {metric} {before[metric]:.4f} -> {after[metric]:.4f} "
+                    f"(+{(after[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kind", choices=KINDS, default="sales")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=0, help="Extra filler columns")
+    parser.add_argument("--entities", type=int, default=10_000, help="Distinct entities")
+    parser.add_argument("--start", default="2024-01-01", help="First date")
+    parser.add_argument("--days", type=int, default=365, help="Date range in days")
+    parser.add_argument("--null-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--hf", action="store_true",
+                        help="Also time propose_mappings with the HF advisor (if installed)")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Write results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown / memory growth (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    config = {
+        "kind": args.kind,
+        "rows": args.rows,
+        "columns": args.columns,
+        "entities": args.entities,
+        "start": args.start,
+        "days": args.days,
+        "null_rate": args.null_rate,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_csv(
+            generate(
+                args.kind,
+                args.rows,
+                entities=args.entities,
+                start=args.start,
+                days=args.days,
+                seed=args.seed,
+                extra_columns=args.columns,
+                null_rate=args.null_rate,
+            ),
+            os.path.join(tmp, f"{args.kind}.csv"),
+        )
+        size_mib = os.path.getsize(path) / 2 ** 20
+        stages = run_stages(path, args.repeat, args.hf)
+
+    print(f"{args.kind}: {args.rows:,} rows, {size_mib:.1f} MiB CSV\n")
+    print(f"{'stage':<28}{'time (ms)':>12}{'peak (MiB)':>12}")
+    for stage, result in stages.items():
+        print(f"{stage:<28}{result['seconds'] * 1000:>12.1f}{result['peak_mib']:>12.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(
+                {"config": config, "python": platform.python_version(), "stages": stages},
+                f,
+                indent=2,
+            )
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline.get("config") != config:
+            print(f"\nWARNING: baseline was recorded with {baseline.get('config')}")
+
+        found = regressions(stages, baseline["stages"], args.tolerance)
+        if found:
+            print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Load test for the local analytics service.
+
+Starts `python -m src.service` on a scratch Unix socket (or uses a
+running one with --socket), opens a session on a synthetic sales file,
+then sends analyze requests from --concurrency clients and reports
+latency percentiles and throughput.
+
+    python -m benchmarks.bench_service --rows 1000000 --requests 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.service import ServiceClient
+from benchmarks.synthetic import generate_sales, write_csv
+
+
+# Mix of requests cycled by every client
+REQUESTS = [
+    ("summary", "revenue", {}),
+    ("rank", "revenue", {"top_k": 10}),
+    ("rank", "units_sold", {"bottom_k": 5}),
+    ("trend", "revenue", {"bucket": "month"}),
+    ("trend", "units_sold", {"bucket": "week"}),
+]
+
+MAPPINGS = {
+    "measures": ["revenue", "units_sold"],
+    "entity": "salesperson",
+    "time": "order_date",
+    "dimensions": ["region", "product"],
+}
+
+
+def start_service(socket_path: str, workers: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.service", "--socket", socket_path,
+         "--workers", str(workers), "--deterministic-only", "--no-cache"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 30
+    while not os.path.exists(socket_path):
+        if proc.poll() is not None or time.time() > deadline:
+            raise RuntimeError("Service did not start")
+        time.sleep(0.05)
+
+    return proc
+
+
+async def client_loop(socket_path: str, session: str, count: int, offset: int, latencies: list):
+    client = await ServiceClient.connect(socket_path)
+    try:
+        for i in range(count):
+            intent, measure, params = REQUESTS[(offset + i) % len(REQUESTS)]
+            start = time.perf_counter()
+            await client.request(
+                "analyze", session=session, intent=intent, measure=measure, params=params
+            )
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+
+
+async def run(args, socket_path: str, dataset: str):
+    client = await ServiceClient.connect(socket_path)
+    start = time.perf_counter()
+    opened = await client.request("open", dataset=dataset, mappings=MAPPINGS)
+    print(f"open (load + group): {time.perf_counter() - start:.2f}s, {opened['rows']:,} rows")
+
+    # Event-loop responsiveness while analyses run
+    pings = []
+
+    async def ping_loop():
+        while True:
+            t = time.perf_counter()
+            await client.request("ping")
+            pings.append(time.perf_counter() - t)
+            await asyncio.sleep(0.01)
+
+    pinger = asyncio.create_task(ping_loop())
+
+    latencies: list = []
+    per_client = args.requests // args.concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client_loop(socket_path, opened["session"], per_client, i, latencies)
+        for i in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    pinger.cancel()
+    await client.close()
+
+    ms = np.array(latencies) * 1000
+    print(f"requests:    {len(ms):,} from {args.concurrency} clients in {elapsed:.2f}s")
+    print(f"throughput:  {len(ms) / elapsed:,.0f} req/s")
+    print(f"latency:     p50 {np.percentile(ms, 50):.2f} ms, "
+          f"p99 {np.percentile(ms, 99):.2f} ms, max {ms.max():.2f} ms")
+    if pings:
+        print(f"ping p99:    {np.percentile(np.array(pings) * 1000, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--entities", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4, help="Service worker threads")
+    parser.add_argument("--socket", default=None, help="Use an already running service")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = write_csv(
+            generate_sales(args.rows, entities=args.entities),
+            os.path.join(tmp, "sales.csv"),
+        )
+
+        proc = None
+        socket_path = args.socket
+        if socket_path is None:
+            socket_path = os.path.join(tmp, "service.sock")
+            proc = start_service(socket_path, args.workers)
+
+        try:
+            asyncio.run(run(args, socket_path, dataset))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Import-time benchmark for the CLI entry point.
+
+Runs `python -X importtime -c "import src.main"` in fresh interpreters,
+reports the slowest imports and fails when startup exceeds the budget
+or when torch / sentence-transformers are imported eagerly.
+
+    python -m benchmarks.bench_startup --budget-ms 1500
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+
+HEAVY_MODULES = ("torch", "sentence_transformers")
+
+
+def import_profile(module: str) -> List[Tuple[int, int, str]]:
+    """
+    (self_us, cumulative_us, name) for every import made by `import module`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+
+    return rows
+
+
+def heavy_modules_loaded(module: str) -> List[str]:
+    code = (
+        "import sys, {m}; "
+        "print(','.join(n for n in {heavy!r} if n in sys.modules))"
+    ).format(m=module, heavy=HEAVY_MODULES)
+
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals = []
+    profile = []
+    for _ in range(args.runs):
+        profile = import_profile(args.module)
+        target = [r for r in profile if r[2].strip() == args.module]
+        totals.append(target[-1][1] / 1000 if target else float("nan"))
+
+    best_ms = min(totals)
+    print(f"import {args.module}: best {best_ms:.1f} ms over {args.runs} runs")
+
+    print("\nSlowest imports (cumulative):")
+    top_level = sorted(profile, key=lambda r: r[1], reverse=True)[:args.top]
+    for self_us, cumulative_us, name in top_level:
+        print(f"{cumulative_us / 1000:>10.1f} ms  {name.strip()}")
+
+    heavy = heavy_modules_loaded(args.module)
+    failed = False
+
+    if heavy:
+        print(f"\nFAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+
+    if best_ms > args.budget_ms:
+        print(f"\nFAIL: startup {best_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+
+    if not failed:
+        print(f"\nOK: within {args.budget_ms:.1f} ms budget, no heavy imports")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
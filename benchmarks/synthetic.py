@@ -0,0 +1,139 @@
+"""
+Synthetic dataset generator for benchmarks.
+
+Produces sales-like and marks-like files with the same columns as
+data/curated/sales_data.csv and data/curated/student_marks.csv, at any
+size. Optional knobs add extra columns (for wide schemas) and blank out
+a fraction of the values (null_rate).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+REGIONS = ["North", "South", "East", "West"]
+PRODUCTS = ["Laptop", "Tablet", "Phone", "Monitor", "Keyboard"]
+SUBJECTS = ["maths", "physics", "chemistry", "biology"]
+
+KINDS = ("sales", "marks")
+
+
+def _dates(rng, rows: int, start: str, days: int) -> np.ndarray:
+    dates = pd.date_range(start, periods=days, freq="D").strftime("%Y-%m-%d")
+    return dates.to_numpy()[rng.integers(0, days, rows)]
+
+
+def add_columns(df: pd.DataFrame, extra: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Append extra filler columns, alternating numeric and low-cardinality text.
+    """
+    rng = np.random.default_rng(seed + 1)
+    columns = {}
+
+    for i in range(extra):
+        if i % 2 == 0:
+            columns[f"metric_{i}"] = rng.normal(100, 15, len(df)).round(2)
+        else:
+            columns[f"attribute_{i}"] = rng.choice(["a", "b", "c", "d"], len(df))
+
+    return df.assign(**columns)
+
+
+def add_nulls(
+    df: pd.DataFrame,
+    null_rate: float,
+    keep=(),
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Blank out roughly null_rate of the values in every column not in keep.
+    """
+    if null_rate <= 0:
+        return df
+
+    rng = np.random.default_rng(seed + 2)
+    df = df.copy()
+
+    for column in df.columns:
+        if column in keep:
+            continue
+        df[column] = df[column].mask(rng.random(len(df)) < null_rate)
+
+    return df
+
+
+def generate_sales(
+    rows: int,
+    entities: int = 1_000,
+    start: str = "2024-01-01",
+    days: int = 365,
+    seed: int = 0,
+    extra_columns: int = 0,
+    null_rate: float = 0.0
+) -> pd.DataFrame:
+    """
+    Sales-like frame: order_id, order_date, region, salesperson,
+    product, units_sold, unit_price, revenue (+ extra_columns).
+    """
+    rng = np.random.default_rng(seed)
+
+    units = rng.integers(1, 10, rows)
+    price = rng.choice([250, 300, 500, 750, 1200], rows)
+
+    df = pd.DataFrame({
+        "order_id": [f"ORD{i:08d}" for i in range(rows)],
+        "order_date": _dates(rng, rows, start, days),
+        "region": rng.choice(REGIONS, rows),
+        "salesperson": [f"rep_{i}" for i in rng.integers(0, entities, rows)],
+        "product": rng.choice(PRODUCTS, rows),
+        "units_sold": units,
+        "unit_price": price,
+        "revenue": units * price,
+    })
+
+    df = add_columns(df, extra_columns, seed)
+    return add_nulls(df, null_rate, keep=("order_id",), seed=seed)
+
+
+def generate_marks(
+    rows: int,
+    entities: int = 1_000,
+    start: str = "2024-01-01",
+    days: int = 30,
+    seed: int = 0,
+    extra_columns: int = 0,
+    null_rate: float = 0.0
+) -> pd.DataFrame:
+    """
+    Marks-like frame: student_name, one column per subject, total_marks,
+    exam_date (+ extra_columns). entities is the number of students.
+    """
+    rng = np.random.default_rng(seed)
+
+    marks = {subject: rng.integers(35, 101, rows) for subject in SUBJECTS}
+    df = pd.DataFrame({
+        "student_name": [f"student_{i}" for i in rng.integers(0, entities, rows)],
+        **marks,
+        "total_marks": sum(marks.values()),
+        "exam_date": _dates(rng, rows, start, days),
+    })
+
+    df = add_columns(df, extra_columns, seed)
+    return add_nulls(df, null_rate, seed=seed)
+
+
+def generate(kind: str, rows: int, **options) -> pd.DataFrame:
+    """
+    Frame of the given kind ("sales" or "marks").
+    """
+    generators = {"sales": generate_sales, "marks": generate_marks}
+
+    if kind not in generators:
+        raise ValueError(f"Unknown dataset kind '{kind}'. Expected one of {KINDS}")
+
+    return generators[kind](rows, **options)
+
+
+def write_csv(df: pd.DataFrame, path: str) -> str:
+    df.to_csv(path, index=False)
+    return path
@@ -0,0 +1,364 @@
+"""
+Headless batch runner.
+
+Runs the full pipeline (load → extract schema → propose / confirm
+mappings → canonical view → capability reasoning → analyses) for every
+dataset of a job file without prompting, and writes one JSON line per
+dataset with the mappings, capabilities, results and per-stage timings.
+
+Job file:
+
+    {
+      "defaults": {
+        "auto_accept": {"min_confidence": 0.5},
+        "intents": ["summary", "rank", {"intent": "trend", "params": {"bucket": "month"}}]
+      },
+      "jobs": [
+        {"dataset": "data/curated/sales_data.csv", "measures": ["revenue"]},
+        {"dataset": "exports/*.csv"},
+        {
+          "dataset": "data/curated/student_marks.csv",
+          "mappings": {"measures": ["maths"], "entity": "student_name",
+                       "time": "exam_date", "dimensions": []}
+        }
+      ]
+    }
+
+A job uses its pre-confirmed "mappings" when given, then (with
+"use_profiles": true) the mapping profile stored for the file's layout
+if its stats have not drifted, otherwise the proposals accepted by
+"auto_accept" (see auto_confirm_mappings).
+"measures" defaults to every confirmed measure and "intents" to every
+enabled analysis. Dataset entries may be glob patterns. Job keys override
+"defaults".
+
+    python -m src.batch_runner jobs.json --output results.jsonl --workers 4
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.loading import load_dataset
+from src.v4.parallel_schema import extract_schema_parallel
+from src.v4.semantic_mapper import propose_mappings, auto_confirm_mappings
+from src.v4.semantic_advisor import set_advisor_enabled, set_backend, BACKENDS
+from src.v4.schema_adapter import build_canonical_view
+from src.v4.mapping_profiles import (
+    ProfileStore,
+    read_sample,
+    match_profile,
+    format_match,
+    MATCH as PROFILE_MATCH,
+)
+from src.v4.system_reasoner import reason_about_capabilities
+from src.v4.measure_aggregates import MeasureAggregates
+from src.explanation.explainer import explain
+from src.core.semantic_context import SemanticContext, SemanticMode
+from src.utils.timing import Timings
+
+
+# -----------------------------
+# Job file
+# -----------------------------
+
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    """
+    Expand a job file into one job per dataset (defaults merged, globs expanded).
+    Relative dataset paths are resolved against the job file's directory.
+    """
+    with open(path) as f:
+        spec = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = spec.get("defaults", {})
+    jobs = []
+
+    for entry in spec.get("jobs", []):
+        job = {**defaults, **entry}
+        pattern = job["dataset"]
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(base, pattern)
+
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for dataset in matches:
+            jobs.append({**job, "dataset": dataset})
+
+    return jobs
+
+
+def normalize_intents(intents) -> List[Dict[str, Any]]:
+    """
+    "rank" or {"intent": "rank", "params": {...}} -> {"intent", "params"}.
+    """
+    return [
+        {"intent": i, "params": {}} if isinstance(i, str)
+        else {"intent": i["intent"], "params": dict(i.get("params", {}))}
+        for i in intents
+    ]
+
+
+# -----------------------------
+# JSON output
+# -----------------------------
+
+def json_safe(value):
+    """
+    Convert an analysis result to plain JSON types (keys become strings,
+    timestamps ISO strings, NaN / NaT null).
+    """
+    if isinstance(value, dict):
+        return {_json_key(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def _json_key(key) -> str:
+    key = json_safe(key)
+    return "null" if key is None else str(key)
+
+
+# -----------------------------
+# One dataset
+# -----------------------------
+
+def _profile_mappings(dataset: str, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Mappings of a stored profile matching the dataset's layout, or None.
+    The match status (and any drift) is added to record.
+    """
+    store = ProfileStore()
+    try:
+        match = match_profile(store, read_sample(dataset))
+    finally:
+        store.close()
+
+    record["profile"] = {
+        "status": match["status"],
+        "fingerprint": match["fingerprint"],
+        "lines": format_match(match),
+    }
+
+    return match["profile"]["mappings"] if match["status"] == PROFILE_MATCH else None
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the pipeline for one dataset. Never raises: failures are recorded
+    in the returned record.
+    """
+    timings = Timings()
+    record: Dict[str, Any] = {"dataset": job["dataset"], "status": "ok"}
+    started = time.perf_counter()
+
+    try:
+        with timings.span("load_dataset"):
+            df = load_dataset(job["dataset"], use_cache=job.get("cache", True))
+
+        mappings = job.get("mappings")
+        if mappings is None and job.get("use_profiles"):
+            with timings.span("match_profile"):
+                mappings = _profile_mappings(job["dataset"], record)
+
+        if mappings is None:
+            with timings.span("extract_schema"):
+                schema_report = extract_schema_parallel(df, workers=1)
+            with timings.span("propose_mappings"):
+                proposals = propose_mappings(schema_report)
+
+            rules = job.get("auto_accept", {})
+            confirmed = auto_confirm_mappings(proposals, rules.get("min_confidence", 0.0))
+        else:
+            confirmed = {
+                "measures": list(mappings.get("measures", [])),
+                "entity": mappings.get("entity"),
+                "time": mappings.get("time"),
+                "dimensions": list(mappings.get("dimensions", [])),
+            }
+
+        record["mappings"] = dict(confirmed)
+
+        if not confirmed["measures"]:
+            raise ValueError("No measures confirmed")
+
+        measures = job.get("measures") or confirmed["measures"]
+        unknown = [m for m in measures if m not in confirmed["measures"]]
+        if unknown:
+            raise ValueError(f"Measures not confirmed: {unknown}")
+
+        confirmed["active_measure"] = measures[0]
+        semantic_context = SemanticContext(mode=SemanticMode.SINGLE_MEASURE)
+
+        with timings.span("build_canonical"):
+            canonical_df = build_canonical_view(df, confirmed, semantic_context)
+            aggregates = MeasureAggregates(canonical_df, df[confirmed["measures"]])
+
+        with timings.span("reason_about_capabilities"):
+            capabilities = reason_about_capabilities(canonical_df, semantic_context)
+
+        record["capabilities"] = {
+            "enabled": capabilities["enabled"],
+            "disabled": capabilities["disabled"],
+            "risks": capabilities["risks"],
+        }
+
+        intents = normalize_intents(job.get("intents") or capabilities["enabled"])
+        results = []
+
+        for measure in measures:
+            for request in intents:
+                intent, params = request["intent"], request["params"]
+                entry = {"measure": measure, "intent": intent, "params": params}
+
+                if intent not in capabilities["enabled"]:
+                    entry["error"] = capabilities["disabled"].get(
+                        intent, f"Unsupported analysis '{intent}'"
+                    )
+                else:
+                    try:
+                        with timings.span(f"run_{intent}"):
+                            result = aggregates.run(intent, measure, **params)
+                        entry["result"] = json_safe(result)
+                        entry["explanation"] = explain(intent.upper(), result)
+                    except (TypeError, ValueError, KeyError) as e:
+                        entry["error"] = str(e)
+
+                results.append(entry)
+
+        record["results"] = results
+
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    record["timings_ms"] = {
+        name: round(seconds * 1000, 3) for name, seconds in timings.report().items()
+    }
+    record["timings_ms"]["total"] = round((time.perf_counter() - started) * 1000, 3)
+
+    return record
+
+
+# -----------------------------
+# Batch
+# -----------------------------
+
+def _init_worker(advisor: bool, backend: Optional[str]) -> None:
+    set_advisor_enabled(advisor)
+    if backend:
+        set_backend(backend)
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    output,
+    workers: int = 1,
+    advisor: bool = False,
+    backend: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Run every job and write one JSON line per dataset to output as jobs
+    finish (completion order). Returns counts of ok / failed datasets.
+    """
+    counts = {"ok": 0, "error": 0}
+
+    def write(record: Dict[str, Any]) -> None:
+        counts[record["status"]] += 1
+        output.write(json.dumps(record, default=str) + "\n")
+        output.flush()
+
+    if workers <= 1:
+        _init_worker(advisor, backend)
+        for job in jobs:
+            write(run_job(job))
+        return counts
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(advisor, backend),
+    ) as pool:
+        for future in as_completed([pool.submit(run_job, job) for job in jobs]):
+            write(future.result())
+
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run analytics jobs without prompts")
+    parser.add_argument("jobs", help="Job file (JSON)")
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="JSON Lines output file (default: stdout)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Datasets processed in parallel (processes; 1 = serial)",
+    )
+    parser.add_argument(
+        "--advisor",
+        action="store_true",
+        help="Attach HF advisor hints to proposals (slower; not used for auto-accept)",
+    )
+    parser.add_argument(
+        "--advisor-backend",
+        choices=BACKENDS,
+        default=None,
+        help="Inference backend for the HF advisor",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    jobs = load_jobs(args.jobs)
+
+    started = time.perf_counter()
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+
+    try:
+        counts = run_batch(
+            jobs,
+            output,
+            workers=args.workers,
+            advisor=args.advisor,
+            backend=args.advisor_backend,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    rate = len(jobs) / elapsed * 3600 if elapsed > 0 else 0.0
+    print(
+        f"{len(jobs)} datasets ({counts['ok']} ok, {counts['error']} failed) "
+        f"in {elapsed:.1f}s ({rate:,.0f}/hour)",
+        file=sys.stderr,
+    )
+
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,414 @@
+"""
+Dataset catalog: what every CSV under a directory contains.
+
+`scan` walks a directory tree and, in a process pool, extracts each
+file's schema signals, mapping proposals, schema fingerprint and the
+capabilities reason_about_capabilities derives from the proposals
+(every proposal accepted). Results go to a SQLite index under the cache
+directory. Files whose size and mtime are unchanged since the last scan
+are skipped, and files that disappeared are removed.
+
+Queries read only the index:
+
+    python -m src.catalog scan data/ --workers 4
+    python -m src.catalog list --enabled trend
+    python -m src.catalog show data/curated/sales_data.csv
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from src.utils.loading import load_dataset, confirmed_columns
+from src.v4.streaming_schema import extract_schema_streaming, DEFAULT_CHUNK_ROWS
+from src.v4.semantic_mapper import propose_mappings, auto_confirm_mappings
+from src.v4.semantic_advisor import set_advisor_enabled
+from src.v4.schema_adapter import build_canonical_view
+from src.v4.system_reasoner import reason_about_capabilities
+from src.v4.mapping_profiles import read_sample, schema_layout, schema_fingerprint
+from src.core.semantic_context import SemanticContext, SemanticMode
+from src.utils.cache_paths import cache_dir
+
+
+DATASET_SUFFIX = ".csv"
+
+
+# -----------------------------
+# Per-file scan (worker side)
+# -----------------------------
+
+def _init_worker(advisor: bool) -> None:
+    set_advisor_enabled(advisor)
+
+
+def scan_file(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Optional[Dict[str, Any]]:
+    """
+    Catalog entry for one CSV, or None if the file no longer exists.
+    Never raises: failures set "error".
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    entry: Dict[str, Any] = {
+        "path": path,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "scanned_at": time.time(),
+        "fingerprint": None,
+        "rows": None,
+        "schema": {},
+        "mappings": {},
+        "enabled": [],
+        "disabled": {},
+        "error": None,
+    }
+
+    try:
+        entry["fingerprint"] = schema_fingerprint(schema_layout(read_sample(path)))
+        entry["schema"] = extract_schema_streaming(path, chunk_rows)
+
+        confirmed = auto_confirm_mappings(propose_mappings(entry["schema"]))
+        entry["mappings"] = dict(confirmed)
+
+        if confirmed["measures"]:
+            confirmed["active_measure"] = confirmed["measures"][0]
+            df = load_dataset(path, usecols=confirmed_columns(confirmed), use_cache=False)
+            entry["rows"] = len(df)
+
+            semantic_context = SemanticContext(mode=SemanticMode.SINGLE_MEASURE)
+            capabilities = reason_about_capabilities(
+                build_canonical_view(df, confirmed, semantic_context),
+                semantic_context,
+            )
+            entry["enabled"] = capabilities["enabled"]
+            entry["disabled"] = capabilities["disabled"]
+        else:
+            entry["disabled"] = {"*": "No measures proposed"}
+    except Exception as e:
+        if not os.path.exists(path):
+            return None
+        entry["error"] = f"{type(e).__name__}: {e}"
+
+    return entry
+
+
+# -----------------------------
+# Index
+# -----------------------------
+
+class CatalogIndex:
+    """
+    SQLite index of scanned datasets and their enabled analyses.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_dir("catalog"), "catalog.sqlite")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS datasets ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " scanned_at REAL NOT NULL,"
+            " fingerprint TEXT,"
+            " rows INTEGER,"
+            " schema TEXT NOT NULL,"
+            " mappings TEXT NOT NULL,"
+            " disabled TEXT NOT NULL,"
+            " error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS capabilities ("
+            " path TEXT NOT NULL,"
+            " analysis TEXT NOT NULL,"
+            " PRIMARY KEY (analysis, path))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS datasets_fingerprint ON datasets (fingerprint)"
+        )
+        self._conn.commit()
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+
+    def stat_of(self, root: str) -> Dict[str, tuple]:
+        """
+        (size, mtime_ns) of every indexed file under root.
+        """
+        prefix = os.path.join(root, "")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns FROM datasets WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO datasets"
+                " (path, size, mtime_ns, scanned_at, fingerprint, rows,"
+                "  schema, mappings, disabled, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry["path"],
+                    entry["size"],
+                    entry["mtime_ns"],
+                    entry["scanned_at"],
+                    entry["fingerprint"],
+                    entry["rows"],
+                    json.dumps(entry["schema"], default=str),
+                    json.dumps(entry["mappings"]),
+                    json.dumps(entry["disabled"]),
+                    entry["error"],
+                ),
+            )
+            self._conn.execute("DELETE FROM capabilities WHERE path = ?", (entry["path"],))
+            self._conn.executemany(
+                "INSERT INTO capabilities (path, analysis) VALUES (?, ?)",
+                [(entry["path"], analysis) for analysis in entry["enabled"]],
+            )
+            self._conn.commit()
+
+    def remove(self, paths: List[str]) -> None:
+        with self._lock:
+            for path in paths:
+                self._conn.execute("DELETE FROM datasets WHERE path = ?", (path,))
+                self._conn.execute("DELETE FROM capabilities WHERE path = ?", (path,))
+            self._conn.commit()
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+
+    def datasets(
+        self,
+        enabled: Optional[List[str]] = None,
+        fingerprint: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Summary rows (path, rows, fingerprint, enabled, error), optionally
+        restricted to datasets with all of enabled and/or one fingerprint.
+        """
+        query = "SELECT path, rows, fingerprint, error FROM datasets WHERE 1 = 1"
+        params: list = []
+
+        for analysis in enabled or []:
+            query += " AND path IN (SELECT path FROM capabilities WHERE analysis = ?)"
+            params.append(analysis)
+        if fingerprint:
+            query += " AND fingerprint = ?"
+            params.append(fingerprint)
+
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY path", params).fetchall()
+            capabilities: Dict[str, List[str]] = {}
+            for path, analysis in self._conn.execute(
+                "SELECT path, analysis FROM capabilities ORDER BY analysis"
+            ):
+                capabilities.setdefault(path, []).append(analysis)
+
+        return [
+            {
+                "path": path,
+                "rows": n_rows,
+                "fingerprint": fp,
+                "enabled": capabilities.get(path, []),
+                "error": error,
+            }
+            for path, n_rows, fp, error in rows
+        ]
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime_ns, scanned_at, fingerprint, rows,"
+                " schema, mappings, disabled, error FROM datasets WHERE path = ?",
+                (path,),
+            ).fetchone()
+            enabled = [
+                analysis for (analysis,) in self._conn.execute(
+                    "SELECT analysis FROM capabilities WHERE path = ? ORDER BY analysis",
+                    (path,),
+                )
+            ]
+
+        if row is None:
+            return None
+
+        keys = ("path", "size", "mtime_ns", "scanned_at", "fingerprint", "rows",
+                "schema", "mappings", "disabled", "error")
+        entry = dict(zip(keys, row))
+        for key in ("schema", "mappings", "disabled"):
+            entry[key] = json.loads(entry[key])
+        entry["enabled"] = enabled
+        return entry
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# -----------------------------
+# Scan
+# -----------------------------
+
+def find_datasets(root: str, suffix: str = DATASET_SUFFIX) -> List[str]:
+    paths = []
+    for directory, _, files in os.walk(root):
+        paths.extend(
+            os.path.join(directory, name) for name in files
+            if name.lower().endswith(suffix)
+        )
+    return sorted(paths)
+
+
+def scan(
+    root: str,
+    index: CatalogIndex,
+    workers: int = 1,
+    advisor: bool = False,
+    force: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Dict[str, int]:
+    """
+    Scan every CSV under root, re-scanning only new or changed files
+    (size or mtime differs). Files that vanish during the scan count as
+    removed. Returns counts: scanned, unchanged, removed, failed.
+    """
+    root = os.path.abspath(root)
+    known = index.stat_of(root)
+
+    present = set()
+    pending = []
+    for path in find_datasets(root):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        present.add(path)
+        if force or known.get(path) != (stat.st_size, stat.st_mtime_ns):
+            pending.append(path)
+
+    removed = [path for path in known if path not in present]
+    index.remove(removed)
+
+    counts = {
+        "scanned": 0,
+        "unchanged": len(present) - len(pending),
+        "removed": len(removed),
+        "failed": 0,
+    }
+
+    def record(path: str, entry: Optional[Dict[str, Any]]) -> None:
+        if entry is None:
+            index.remove([path])
+            counts["removed"] += 1
+            return
+
+        index.put(entry)
+        counts["scanned"] += 1
+        if entry["error"] is not None:
+            counts["failed"] += 1
+
+    if workers <= 1:
+        _init_worker(advisor)
+        for path in pending:
+            record(path, scan_file(path, chunk_rows))
+        return counts
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(advisor,),
+    ) as pool:
+        entries = pool.map(scan_file, pending, [chunk_rows] * len(pending))
+        for path, entry in zip(pending, entries):
+            record(path, entry)
+
+    return counts
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Catalog of CSV datasets")
+    parser.add_argument("--index", default=None, help="Index file (default: cache directory)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan_cmd = commands.add_parser("scan", help="Scan a directory tree into the index")
+    scan_cmd.add_argument("root", help="Directory to scan")
+    scan_cmd.add_argument("--workers", type=int, default=1,
+                          help="Files scanned in parallel (processes; 1 = serial)")
+    scan_cmd.add_argument("--advisor", action="store_true",
+                          help="Attach HF advisor hints to the stored proposals")
+    scan_cmd.add_argument("--force", action="store_true",
+                          help="Re-scan unchanged files too")
+    scan_cmd.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+
+    list_cmd = commands.add_parser("list", help="List indexed datasets")
+    list_cmd.add_argument("--enabled", action="append", default=[],
+                          help="Only datasets where this analysis is enabled (repeatable)")
+    list_cmd.add_argument("--fingerprint", default=None,
+                          help="Only datasets with this schema fingerprint")
+
+    show_cmd = commands.add_parser("show", help="Show the stored entry of one dataset")
+    show_cmd.add_argument("path")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    index = CatalogIndex(args.index)
+
+    try:
+        if args.command == "scan":
+            started = time.perf_counter()
+            counts = scan(
+                args.root,
+                index,
+                workers=args.workers,
+                advisor=args.advisor,
+                force=args.force,
+                chunk_rows=args.chunk_rows,
+            )
+            print(
+                f"{counts['scanned']} scanned ({counts['failed']} failed), "
+                f"{counts['unchanged']} unchanged, {counts['removed']} removed "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+            return 1 if counts["failed"] else 0
+
+        if args.command == "list":
+            for entry in index.datasets(args.enabled, args.fingerprint):
+                status = entry["error"] or ", ".join(entry["enabled"]) or "-"
+                fingerprint = (entry["fingerprint"] or "-")[:12]
+                print(f"{entry['path']}\t{entry['rows']}\t{fingerprint}\t{status}")
+            return 0
+
+        entry = index.get(os.path.abspath(args.path))
+        if entry is None:
+            print(f"Not indexed: {args.path}", file=sys.stderr)
+            return 1
+        print(json.dumps(entry, indent=2, default=str))
+        return 0
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
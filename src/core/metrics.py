@@ -32,10 +32,11 @@ def revenue_over_time(df: pd.DataFrame, freq: str = "M") -> pd.Series:
     - 'M' = monthly
     - 'Q' = quarterly
     """
-    df_copy = df.copy()
-    df_copy["order_date"] = pd.to_datetime(df_copy["order_date"])
+    # Only the two columns involved; no copy of the frame
+    dates = pd.to_datetime(df["order_date"])
     return (
-        df_copy
+        df[["revenue"]]
+        .assign(order_date=dates)
         .groupby(pd.Grouper(key="order_date", freq=freq))["revenue"]
         .sum()
         .sort_index()
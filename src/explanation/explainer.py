@@ -49,10 +49,23 @@ def explain(intent: str, result: Dict[str, Any]) -> str:
 
         top_entity = next(iter(ranking))
         top_value = ranking[top_entity]
+        total = result.get("total_entities")
+
+        shown = ""
+        if total is not None and total > len(ranking):
+            shown = f" Showing {len(ranking)} of {total} entities."
+
+        if result.get("order") == "ascending":
+            return (
+                f"Entities were ranked by the selected measure. "
+                f"The lowest-ranked entity is {top_entity} with a value of {top_value}."
+                f"{shown}"
+            )
 
         return (
             f"Entities were ranked by the selected measure. "
             f"The top-ranked entity is {top_entity} with a value of {top_value}."
+            f"{shown}"
         )
 
     # -------------------------
@@ -72,6 +85,13 @@ def explain(intent: str, result: Dict[str, Any]) -> str:
                 "This limits trend interpretation, but the aggregated value was computed safely."
             )
 
+        bucket = result.get("bucket")
+        if bucket:
+            return (
+                f"Trend analysis was performed across {time_points} {bucket} buckets, "
+                "showing how the selected measure evolves over time."
+            )
+
         return (
             f"Trend analysis was performed across {time_points} time points, "
             "showing how the selected measure evolves over time."
@@ -81,7 +101,18 @@ def explain(intent: str, result: Dict[str, Any]) -> str:
     # COMPARE
     # -------------------------
     if intent == "COMPARE":
-        comparisons = result.get("comparison")
+        grouping_sets = result.get("grouping_sets")
+
+        if grouping_sets:
+            dims = len(grouping_sets["dimensions"])
+            sets = len(grouping_sets["sets"])
+            return (
+                f"The measure was compared across {sets} groupings of {dims} dimensions, "
+                "including combinations of dimensions, "
+                "highlighting relative differences between groups."
+            )
+
+        comparisons = result.get("comparisons") or result.get("comparison")
 
         if not comparisons:
             return (
@@ -1,22 +1,47 @@
+import argparse
+import json
+import logging
+import os
 import pandas as pd
-from typing import List
+from typing import Dict, List, Optional
 from src.explanation.interpretation_builder import build_interpretation
 
 # -----------------------------
 # Imports (V4)
 # -----------------------------
-from src.v3.schema_extractor import extract_schema
+from src.v4.streaming_schema import extract_schema_streaming, DEFAULT_CHUNK_ROWS
+from src.v4.parallel_schema import extract_schema_parallel
 from src.v4.semantic_mapper import propose_mappings, confirm_mappings
-from src.v4.schema_adapter import build_canonical_dataframe, SchemaValidationError
+from src.v4.semantic_advisor import (
+    set_advisor_enabled,
+    set_backend,
+    warm_up,
+    BACKENDS,
+)
+from src.v4.schema_adapter import (
+    build_canonical_view,
+    canonical_sources,
+    validate_canonical_columns,
+    SchemaValidationError,
+)
 from src.v4.system_reasoner import reason_about_capabilities
-from src.v4.analytics_engine import (
-    run_summary,
-    run_rank,
-    run_trend,
-    run_compare,
+from src.v4.measure_aggregates import MeasureAggregates
+from src.v4.incremental import IncrementalDataset
+from src.v4.mapping_profiles import (
+    ProfileStore,
+    read_sample,
+    match_profile,
+    format_match,
+    schema_layout,
+    coarse_stats,
+    MATCH as PROFILE_MATCH,
 )
+from src.v4.time_buckets import BUCKETS as TIME_BUCKETS
+from src.v4.result_cache import ResultCache
 from src.explanation.explainer import explain
 from src.core.semantic_context import SemanticContext, SemanticMode
+from src.utils.loading import load_dataset, confirmed_columns
+from src.utils.timing import TIMINGS, span
 
 # --------------------------------------------------
 # Utilities
@@ -28,8 +53,58 @@ def print_header(title: str):
     print("=" * 50)
 
 
-def load_dataset(path: str) -> pd.DataFrame:
-    return pd.read_csv(path)
+def open_result_cache(
+    dataset_path: str,
+    fingerprint: Optional[str]
+) -> Optional[ResultCache]:
+    """
+    Open the persistent result cache and drop results of older file versions.
+    """
+    try:
+        results = ResultCache()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Result cache unavailable: {e}")
+        return None
+
+    if fingerprint:
+        results.invalidate_source(os.path.abspath(dataset_path), fingerprint)
+
+    return results
+
+
+def check_mapping_profile(dataset_path: str):
+    """
+    Open the profile store and match the file's layout against it.
+    Returns (store, sample, match), or Nones when profiles are unavailable.
+    """
+    try:
+        store = ProfileStore()
+        sample = read_sample(dataset_path)
+        return store, sample, match_profile(store, sample)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Mapping profiles unavailable: {e}")
+        return None, None, None
+
+
+def save_mapping_profile(
+    store: ProfileStore,
+    sample: pd.DataFrame,
+    confirmed: Dict,
+    dataset_path: str
+) -> None:
+    """
+    Remember the confirmed mappings for this file layout.
+    """
+    try:
+        store.save(
+            schema_layout(sample),
+            confirmed,
+            confirmed.get("active_measure"),
+            coarse_stats(sample, confirmed_columns(confirmed)),
+            source=os.path.abspath(dataset_path),
+        )
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Mapping profile not saved: {e}")
 
 
 def select_active_measure(measures: List[str]) -> str:
@@ -52,44 +127,271 @@ def select_active_measure(measures: List[str]) -> str:
         print("Invalid selection. Please try again.")
 
 
+def select_compare_depth(dimension_count: int) -> int:
+    """
+    Ask how many dimensions compare should combine (1 = per dimension).
+    """
+    if dimension_count < 2:
+        return 1
+
+    while True:
+        raw = input(
+            f"\nCombine up to how many dimensions? (1-{dimension_count}, Enter = 1): "
+        ).strip()
+        if not raw:
+            return 1
+        try:
+            depth = int(raw)
+            if 1 <= depth <= dimension_count:
+                return depth
+        except ValueError:
+            pass
+
+        print("Invalid selection. Please try again.")
+
+
+def select_rank_slice() -> Dict:
+    """
+    Ask how many ranked entities to show: top N, bottom N, or all.
+    """
+    while True:
+        raw = input(
+            "\nEntities to show (N = top N, -N = bottom N, Enter = all): "
+        ).strip()
+        if not raw:
+            return {}
+        try:
+            count = int(raw)
+            if count > 0:
+                return {"top_k": count}
+            if count < 0:
+                return {"bottom_k": -count}
+        except ValueError:
+            pass
+
+        print("Invalid selection. Please try again.")
+
+
+def select_time_bucket() -> Dict:
+    """
+    Ask for the trend granularity (raw time values by default).
+    """
+    options = ", ".join(TIME_BUCKETS)
+
+    while True:
+        raw = input(f"\nTime bucket ({options}, Enter = as recorded): ").strip().lower()
+        if not raw:
+            return {}
+        if raw in TIME_BUCKETS:
+            return {"bucket": raw}
+
+        print("Invalid selection. Please try again.")
+
+
+def analysis_params(intent: str, aggregates) -> Dict:
+    """
+    Ask for the intent's optional parameters (part of the result cache key).
+    """
+    if intent == "rank":
+        return select_rank_slice()
+
+    if intent == "trend":
+        return select_time_bucket()
+
+    if intent == "compare":
+        return {"depth": select_compare_depth(len(aggregates.dimensions))}
+
+    return {}
+
+
+def print_startup_timings():
+    """
+    Show where setup time went and how much the model warm-up overlap saved.
+    """
+    timings = TIMINGS.report()
+
+    print_header("STARTUP TIMINGS")
+    for name in ("load_dataset", "extract_schema", "propose_mappings"):
+        if name in timings:
+            print(f"{name:<22}: {timings[name] * 1000:8.1f} ms")
+
+    if "advisor_model_load" in timings:
+        load = timings["advisor_model_load"]
+        print(f"{'advisor_model_load':<22}: {load * 1000:8.1f} ms")
+
+        # No wait means every hint came from the cache: nothing was saved
+        if "advisor_model_wait" in timings:
+            wait = timings["advisor_model_wait"]
+            print(f"{'advisor_model_wait':<22}: {wait * 1000:8.1f} ms")
+            print(f"{'overlap saved':<22}: {max(load - wait, 0.0) * 1000:8.1f} ms")
+        else:
+            print(f"{'advisor_model_wait':<22}: {'unused':>8}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline AI Analytics Copilot")
+    parser.add_argument(
+        "dataset",
+        nargs="?",
+        default="data/curated/student_marks.csv",
+        help="CSV file to analyze",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Extract schema signals in bounded chunks and load only confirmed columns",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="Rows per chunk in streaming and incremental mode",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep aggregate state between runs and only read rows appended since the last run",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to profile columns (large frames only; 1 = serial)",
+    )
+    parser.add_argument(
+        "--approx-cardinality",
+        action="store_true",
+        help="Estimate unique counts with HyperLogLog above a small exact cutoff",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the CSV and recompute results instead of using the caches",
+    )
+    parser.add_argument(
+        "--no-profile",
+        action="store_true",
+        help="Ignore stored mapping profiles and always confirm mappings",
+    )
+    parser.add_argument(
+        "--deterministic-only",
+        action="store_true",
+        help="Skip the HF semantic advisor; torch and sentence-transformers are never imported",
+    )
+    parser.add_argument(
+        "--advisor-backend",
+        choices=BACKENDS,
+        default=None,
+        help="Inference backend for the HF advisor (default: COPILOT_ADVISOR_BACKEND or torch)",
+    )
+    return parser.parse_args(argv)
+
+
 # --------------------------------------------------
 # Main entry
 # --------------------------------------------------
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """
     Offline AI Analytics Copilot — V4.2
     Zero-rebuild, schema-driven analytics.
     """
+    args = parse_args(argv)
 
-    # -----------------------------
-    # Load dataset
-    # -----------------------------
-    dataset_path = "data/curated/student_marks.csv"
-    df = load_dataset(dataset_path)
+    if args.deterministic_only:
+        set_advisor_enabled(False)
+    if args.advisor_backend:
+        set_backend(args.advisor_backend)
+
+    dataset_path = args.dataset
 
     # -----------------------------
-    # Schema extraction
+    # Mapping profile (known layouts skip extraction + confirmation)
     # -----------------------------
-    schema_report = extract_schema(df)
+    profiles, sample, match = (
+        (None, None, None) if args.no_profile else check_mapping_profile(dataset_path)
+    )
+    profile = match["profile"] if match and match["status"] == PROFILE_MATCH else None
 
-    print_header("DATASET SCHEMA SIGNALS")
-    for col, info in schema_report.items():
-        print(f"{col}: {info}")
+    if match is not None:
+        print_header("MAPPING PROFILE")
+        for line in format_match(match):
+            print(line)
 
-    # -----------------------------
-    # Semantic mapping (V4.1)
-    # -----------------------------
-    proposals = propose_mappings(schema_report)
+    if profile is not None:
+        # Nothing to annotate: the advisor model is never loaded
+        set_advisor_enabled(False)
 
-    print_header("SEMANTIC MAPPING PROPOSALS")
-    for k, v in proposals.items():
-        print(f"{k} -> {v}")
+    # Load the advisor model while the CSV is parsed and profiled,
+    # unless every hint it could give is already cached (the profile
+    # sample names the columns; without it the check is skipped)
+    warm_up(list(sample.columns) if sample is not None else None)
 
     # -----------------------------
-    # Human confirmation (ONCE)
+    # Load dataset + schema extraction
     # -----------------------------
-    confirmed = confirm_mappings(proposals)
+    incremental = None
+
+    if args.incremental:
+        # Only rows appended since the last run are parsed
+        df = None
+        incremental = IncrementalDataset(
+            dataset_path,
+            args.chunk_rows,
+            approximate=args.approx_cardinality
+        )
+        with span("extract_schema"):
+            schema_report = incremental.refresh(
+                profile["mappings"] if profile is not None else None
+            )
+
+        print_header("INCREMENTAL STATE")
+        print(f"Status: {incremental.status} ({incremental.new_rows} new rows)")
+    elif args.streaming:
+        # Frame is loaded after confirmation, restricted to mapped columns
+        df = None
+        if profile is None:
+            with span("extract_schema"):
+                schema_report = extract_schema_streaming(
+                    dataset_path,
+                    args.chunk_rows,
+                    approximate=args.approx_cardinality
+                )
+    else:
+        with span("load_dataset"):
+            df = load_dataset(dataset_path, use_cache=not args.no_cache)
+        if profile is None:
+            with span("extract_schema"):
+                schema_report = extract_schema_parallel(
+                    df,
+                    workers=args.workers,
+                    approximate=args.approx_cardinality
+                )
+
+    if profile is None:
+        print_header("DATASET SCHEMA SIGNALS")
+        for col, info in schema_report.items():
+            print(f"{col}: {info}")
+
+        # -----------------------------
+        # Semantic mapping (V4.1)
+        # -----------------------------
+        with span("propose_mappings"):
+            proposals = propose_mappings(schema_report)
+
+        print_header("SEMANTIC MAPPING PROPOSALS")
+        for k, v in proposals.items():
+            print(f"{k} -> {v}")
+
+        print_startup_timings()
+
+        # -----------------------------
+        # Human confirmation (ONCE)
+        # -----------------------------
+        confirmed = confirm_mappings(proposals)
+    else:
+        print_startup_timings()
+        confirmed = json.loads(json.dumps(profile["mappings"]))
 
     # ✅ TASK 1: Explicit semantic context (TEMPORARY DEFAULT)
     semantic_context = SemanticContext(
@@ -109,39 +411,74 @@ def main():
         print("No numeric measures available. Exiting.")
         return
 
-    active_measure = select_active_measure(measures)
+    if profile is not None and profile["active_measure"] in measures:
+        active_measure = profile["active_measure"]
+    else:
+        active_measure = select_active_measure(measures)
     confirmed["active_measure"] = active_measure
 
+    if profiles is not None and profile is None:
+        save_mapping_profile(profiles, sample, confirmed, dataset_path)
+
+    if df is None and incremental is None:
+        df = load_dataset(
+            dataset_path,
+            usecols=confirmed_columns(confirmed),
+            use_cache=not args.no_cache
+        )
+
     print_header("ACTIVE MEASURE SELECTED")
     print(active_measure)
 
     # -----------------------------
-    # Canonical dataframe (BUILD ONCE)
+    # Canonical view (no copies; derived columns built on first use)
     # -----------------------------
     try:
-        canonical_df = build_canonical_dataframe(
-            df=df,
-            confirmed_mappings=confirmed,
-            semantic_context=semantic_context   # ✅ PASS CONTEXT
-        )
+        if incremental is None:
+            canonical_df = build_canonical_view(
+                df=df,
+                confirmed_mappings=confirmed,
+                semantic_context=semantic_context   # ✅ PASS CONTEXT
+            )
+        else:
+            # Incremental runs never hold the rows, only their sums
+            canonical_df = None
+            validate_canonical_columns(canonical_sources(confirmed))
     except SchemaValidationError as e:
         print_header("SCHEMA VALIDATION ERROR")
         print(str(e))
         return
 
-    print_header("CANONICAL DATAFRAME")
-    print(canonical_df.head())
+    if canonical_df is not None:
+        print_header("CANONICAL DATAFRAME")
+        print(canonical_df.head())
+
+        # All confirmed measures are aggregated together, so switching
+        # the active measure reuses the same grouping passes
+        aggregates = MeasureAggregates(canonical_df, df[measures])
+        fingerprint = df.attrs.get("fingerprint")
+        facts = None
+        shape = canonical_df.shape
+    else:
+        aggregates = incremental.aggregates(confirmed)
+        fingerprint = incremental.fingerprint
+        facts = aggregates.canonical_facts()
+        shape = (aggregates.state.rows, len(canonical_sources(confirmed)))
+
+    results = None if args.no_cache else open_result_cache(dataset_path, fingerprint)
 
     # -----------------------------
     # Capability reasoning (MEASURE-INDEPENDENT)
     # -----------------------------
     capabilities = reason_about_capabilities(
         canonical_df,
-        semantic_context   # ✅ PASS CONTEXT
+        semantic_context,   # ✅ PASS CONTEXT
+        approximate_cardinality=args.approx_cardinality,
+        facts=facts
     )
 
     print_header("SYSTEM REASONING")
-    print(f"Dataset shape: {canonical_df.shape}")
+    print(f"Dataset shape: {shape}")
 
     print("\nEnabled analyses:")
     for a in capabilities["enabled"]:
@@ -183,6 +520,8 @@ def main():
             continue
 
         if choice == 0:
+            if results is not None:
+                print(f"\nResult cache: {results.stats()}")
             print("\nExiting. Goodbye.")
             break
 
@@ -191,13 +530,11 @@ def main():
         # -----------------------------
         if choice == 9:
             active_measure = select_active_measure(measures)
-            canonical_df["measure"] = df[active_measure]
+            confirmed["active_measure"] = active_measure
+            if canonical_df is not None:
+                canonical_df.set_measure(active_measure)
 
-            # OPTIONAL but correct: recompute capabilities
-            capabilities = reason_about_capabilities(
-                canonical_df,
-                semantic_context
-            )
+            # Capabilities are measure-independent; aggregates are cached
 
             print_header("ACTIVE MEASURE UPDATED")
             print(active_measure)
@@ -233,18 +570,28 @@ def main():
         # -----------------------------
         # Execute analytics (ONLY AFTER CONFIRMATION)
         # -----------------------------
-        if intent == "summary":
-            result = run_summary(canonical_df)
-        elif intent == "rank":
-            result = run_rank(canonical_df)
-        elif intent == "trend":
-            result = run_trend(canonical_df)
-        elif intent == "compare":
-            result = run_compare(canonical_df)
-        else:
+        if intent not in ("summary", "rank", "trend", "compare"):
             print("Unsupported analysis.")
             continue
 
+        params = analysis_params(intent, aggregates)
+
+        def compute():
+            return aggregates.run(intent, active_measure, **params)
+
+        if results is None:
+            result = compute()
+        else:
+            result = results.get_or_compute(
+                fingerprint,
+                confirmed,
+                active_measure,
+                intent,
+                compute,
+                params=params,
+                source=os.path.abspath(dataset_path),
+            )
+
         explanation = explain(intent.upper(), result)
 
         print_header("RESULT")
@@ -0,0 +1,530 @@
+"""
+Local analytics service with warm in-memory sessions.
+
+An asyncio server on a Unix socket (default) or a localhost TCP port.
+The protocol is JSON Lines: every request is one JSON object on one
+line, every response echoes the request's "id". Requests on one
+connection run concurrently, so responses can come back out of order.
+
+    {"id": 1, "op": "open", "dataset": "data/curated/sales_data.csv"}
+    {"id": 2, "op": "analyze", "session": "<id>", "intent": "rank",
+     "measure": "revenue", "params": {"top_k": 5}}
+    {"id": 3, "op": "sessions"}
+    {"id": 4, "op": "close", "session": "<id>"}
+
+A session holds the loaded frame, the confirmed mappings, the canonical
+view, the measure aggregates and the capabilities. Opening the same
+file version with the same mappings again returns the warm session
+without loading or profiling the file again.
+Mappings come from the request, else from a matching mapping profile,
+else from the proposals above "min_confidence".
+
+Loading, grouping and analyses run on a thread pool, so the event loop
+only parses requests and writes responses. The sessions, the result
+cache, the profile store, the on-disk dataset cache and the advisor
+model are shared by every worker thread; each guards itself with a lock.
+
+    python -m src.service --socket /tmp/copilot.sock --workers 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from src.utils.fingerprint import file_fingerprint
+from src.utils.loading import load_dataset
+from src.batch_runner import json_safe
+from src.v4.parallel_schema import extract_schema_parallel
+from src.v4.semantic_mapper import propose_mappings, auto_confirm_mappings
+from src.v4.semantic_advisor import set_advisor_enabled, warm_up
+from src.v4.schema_adapter import build_canonical_view
+from src.v4.system_reasoner import reason_about_capabilities
+from src.v4.measure_aggregates import MeasureAggregates
+from src.v4.mapping_profiles import (
+    ProfileStore,
+    read_sample,
+    match_profile,
+    MATCH as PROFILE_MATCH,
+)
+from src.v4.result_cache import ResultCache
+from src.core.semantic_context import SemanticContext, SemanticMode
+
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/tmp/copilot-analytics.sock"
+DEFAULT_MAX_SESSIONS = 32
+
+# Requests and responses are single lines; allow large result payloads
+STREAM_LIMIT = 64 * 2 ** 20
+
+
+class ServiceError(Exception):
+    """Raised for requests the service cannot serve (reported to the client)."""
+    pass
+
+
+# -----------------------------
+# Sessions
+# -----------------------------
+
+class Session:
+    """
+    One warm dataset: frame, mappings, canonical view, aggregates.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        dataset: str,
+        df,
+        confirmed: Dict[str, Any],
+        fingerprint: Optional[str] = None
+    ):
+        self.id = session_id
+        self.dataset = dataset
+        self.df = df
+        self.confirmed = confirmed
+        self.fingerprint = fingerprint or df.attrs.get("fingerprint")
+
+        self.semantic_context = SemanticContext(mode=SemanticMode.SINGLE_MEASURE)
+        self.canonical = build_canonical_view(df, confirmed, self.semantic_context)
+        self.aggregates = MeasureAggregates(self.canonical, df[confirmed["measures"]])
+        self.capabilities = reason_about_capabilities(self.canonical, self.semantic_context)
+
+        # Group once up front; requests are then lookups
+        self.aggregates.precompute()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "session": self.id,
+            "dataset": self.dataset,
+            "rows": len(self.df),
+            "mappings": {k: v for k, v in self.confirmed.items() if k != "active_measure"},
+            "enabled": self.capabilities["enabled"],
+            "disabled": self.capabilities["disabled"],
+        }
+
+
+def session_key(dataset: str, fingerprint: Optional[str], mappings: Dict[str, Any]) -> str:
+    payload = json.dumps([dataset, fingerprint, mappings], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class AnalyticsService:
+    """
+    Session registry and request handlers (thread-safe).
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        use_cache: bool = True,
+        use_profiles: bool = True
+    ):
+        self.max_sessions = max_sessions
+        self.use_cache = use_cache
+        self.use_profiles = use_profiles
+        self.results = ResultCache() if use_cache else None
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One profile store (and SQLite connection) shared by all workers
+        self._profiles: Optional[ProfileStore] = None
+        self._profiles_lock = threading.Lock()
+        # Concurrent opens of the same dataset build it once
+        self._opening: Dict[str, threading.Lock] = {}
+        # Auto-confirmed mappings per (dataset, fingerprint, min_confidence)
+        self._proposed: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    # -----------------------------
+    # Mappings
+    # -----------------------------
+
+    def _profile_store(self) -> ProfileStore:
+        """
+        Profile store, opened by the first request that needs it.
+        """
+        with self._profiles_lock:
+            if self._profiles is None:
+                self._profiles = ProfileStore()
+            return self._profiles
+
+    def _known_mappings(
+        self,
+        dataset: str,
+        fingerprint: str,
+        request: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Mappings that need no load: from the request, a matching profile,
+        or proposals already confirmed for this file version.
+        """
+        if request.get("mappings"):
+            mappings = request["mappings"]
+            return {
+                "measures": list(mappings.get("measures", [])),
+                "entity": mappings.get("entity"),
+                "time": mappings.get("time"),
+                "dimensions": list(mappings.get("dimensions", [])),
+            }
+
+        if self.use_profiles:
+            match = match_profile(self._profile_store(), read_sample(dataset))
+            if match["status"] == PROFILE_MATCH:
+                return dict(match["profile"]["mappings"])
+
+        with self._lock:
+            proposed = self._proposed.get(self._proposed_key(dataset, fingerprint, request))
+        return dict(proposed) if proposed is not None else None
+
+    @staticmethod
+    def _proposed_key(dataset: str, fingerprint: str, request: Dict[str, Any]) -> tuple:
+        return dataset, fingerprint, request.get("min_confidence", 0.0)
+
+    def _propose(self, dataset: str, fingerprint: str, df, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Auto-confirmed proposals for the loaded frame, remembered per file version.
+        """
+        proposals = propose_mappings(extract_schema_parallel(df, workers=1))
+        confirmed = auto_confirm_mappings(proposals, request.get("min_confidence", 0.0))
+
+        with self._lock:
+            self._proposed[self._proposed_key(dataset, fingerprint, request)] = dict(confirmed)
+            while len(self._proposed) > self.max_sessions:
+                self._proposed.popitem(last=False)
+
+        return confirmed
+
+    # -----------------------------
+    # Handlers (run on worker threads)
+    # -----------------------------
+
+    def _warm(self, key: str) -> Optional[Session]:
+        with self._lock:
+            if key not in self._sessions:
+                return None
+            self._sessions.move_to_end(key)
+            return self._sessions[key]
+
+    def open(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        dataset = os.path.abspath(request["dataset"])
+        fingerprint = file_fingerprint(dataset)
+
+        # Warm sessions are found before any load or schema work
+        df = None
+        confirmed = self._known_mappings(dataset, fingerprint, request)
+        if confirmed is None:
+            df = load_dataset(dataset, use_cache=self.use_cache)
+            confirmed = self._propose(dataset, fingerprint, df, request)
+
+        if not confirmed["measures"]:
+            raise ServiceError("No measures confirmed")
+
+        key = session_key(dataset, fingerprint, confirmed)
+        session = self._warm(key)
+        if session is not None:
+            return session.describe()
+
+        with self._lock:
+            opening = self._opening.setdefault(key, threading.Lock())
+
+        try:
+            with opening:
+                # Another request may have built it meanwhile
+                session = self._warm(key)
+                if session is not None:
+                    return session.describe()
+
+                if df is None:
+                    df = load_dataset(dataset, use_cache=self.use_cache)
+                confirmed["active_measure"] = confirmed["measures"][0]
+                session = Session(key, dataset, df, confirmed, fingerprint)
+
+                with self._lock:
+                    self._sessions[key] = session
+                    while len(self._sessions) > self.max_sessions:
+                        self._sessions.popitem(last=False)
+        finally:
+            with self._lock:
+                self._opening.pop(key, None)
+
+        return session.describe()
+
+    def _session(self, session_id: str) -> Session:
+        with self._lock:
+            if session_id not in self._sessions:
+                raise ServiceError(f"Unknown session '{session_id}'")
+            self._sessions.move_to_end(session_id)
+            return self._sessions[session_id]
+
+    def analyze(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session(request["session"])
+        intent = request["intent"]
+        measure = request.get("measure") or session.confirmed["measures"][0]
+        params = dict(request.get("params") or {})
+
+        if intent not in session.capabilities["enabled"]:
+            raise ServiceError(
+                session.capabilities["disabled"].get(intent, f"Unsupported analysis '{intent}'")
+            )
+
+        def compute():
+            return session.aggregates.run(intent, measure, **params)
+
+        if self.results is None:
+            result = compute()
+        else:
+            result = self.results.get_or_compute(
+                session.fingerprint,
+                session.confirmed,
+                measure,
+                intent,
+                compute,
+                params=params,
+                source=session.dataset,
+            )
+
+        return {"measure": measure, "intent": intent, "result": json_safe(result)}
+
+    def close_session(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            closed = self._sessions.pop(request["session"], None) is not None
+        return {"closed": closed}
+
+    def sessions(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {"sessions": [s.describe() for s in sessions]}
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        handlers = {
+            "open": self.open,
+            "analyze": self.analyze,
+            "close": self.close_session,
+            "sessions": self.sessions,
+            "ping": lambda _: {"pong": True},
+        }
+
+        op = request.get("op")
+        if op not in handlers:
+            raise ServiceError(f"Unknown op '{op}'")
+
+        return handlers[op](request)
+
+
+# -----------------------------
+# Server
+# -----------------------------
+
+async def _serve_request(service, executor, line: bytes, writer, write_lock) -> None:
+    response: Dict[str, Any] = {}
+    try:
+        request = json.loads(line)
+        response["id"] = request.get("id")
+        loop = asyncio.get_running_loop()
+        response.update(await loop.run_in_executor(executor, service.handle, request))
+        response["ok"] = True
+    except (ServiceError, KeyError, ValueError, TypeError, OSError) as e:
+        response.update(ok=False, error=f"{type(e).__name__}: {e}")
+    except Exception as e:
+        _logger.exception("Request failed")
+        response.update(ok=False, error=f"{type(e).__name__}: {e}")
+
+    async with write_lock:
+        writer.write(json.dumps(response, default=str).encode("utf-8") + b"\n")
+        await writer.drain()
+
+
+def connection_handler(service: AnalyticsService, executor: ThreadPoolExecutor):
+    async def handle_connection(reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                task = asyncio.create_task(
+                    _serve_request(service, executor, line, writer, write_lock)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(
+    socket_path: Optional[str] = DEFAULT_SOCKET,
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+    workers: int = 4,
+    service: Optional[AnalyticsService] = None,
+    ready: Optional[asyncio.Event] = None
+) -> None:
+    """
+    Run the service until cancelled (TCP when port is given, else Unix socket).
+    """
+    service = service or AnalyticsService()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analytics")
+    handler = connection_handler(service, executor)
+
+    if port is not None:
+        server = await asyncio.start_server(handler, host, port, limit=STREAM_LIMIT)
+        where = f"{host}:{port}"
+    else:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(handler, socket_path, limit=STREAM_LIMIT)
+        where = socket_path
+
+    _logger.info(f"Analytics service listening on {where}")
+    if ready is not None:
+        ready.set()
+
+    # SIGTERM stops serving cleanly (the socket file is removed)
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+# -----------------------------
+# Client
+# -----------------------------
+
+class ServiceClient:
+    """
+    Minimal asyncio client; concurrent requests share one connection.
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(
+        cls,
+        socket_path: Optional[str] = DEFAULT_SOCKET,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None
+    ) -> "ServiceClient":
+        if port is not None:
+            reader, writer = await asyncio.open_connection(host, port, limit=STREAM_LIMIT)
+        else:
+            reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+        return cls(reader, writer)
+
+    async def _receive(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Service connection closed"))
+
+    async def request(self, op: str, **fields) -> Dict[str, Any]:
+        """
+        Send one request and wait for its response; raises ServiceError on failure.
+        """
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        self._writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode("utf-8") + b"\n")
+        await self._writer.drain()
+
+        response = await future
+        if not response.get("ok"):
+            raise ServiceError(response.get("error"))
+        return response
+
+    async def close(self) -> None:
+        self._writer.close()
+        self._receiver.cancel()
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local analytics service")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Listen on localhost TCP instead of the Unix socket")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Worker threads for loading and analyses")
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS,
+                        help="Warm sessions kept (least recently used are dropped)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the dataset and result caches")
+    parser.add_argument("--no-profile", action="store_true",
+                        help="Ignore stored mapping profiles")
+    parser.add_argument("--deterministic-only", action="store_true",
+                        help="Skip the HF semantic advisor")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.deterministic_only:
+        set_advisor_enabled(False)
+
+    # One model for all sessions, loaded in the background
+    warm_up()
+
+    service = AnalyticsService(
+        max_sessions=args.max_sessions,
+        use_cache=not args.no_cache,
+        use_profiles=not args.no_profile,
+    )
+
+    try:
+        asyncio.run(serve(args.socket, port=args.port, workers=args.workers, service=service))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import os
+
+
+CACHE_ENV_VAR = "COPILOT_CACHE_DIR"
+DEFAULT_CACHE_ROOT = os.path.join("~", ".cache", "offline-ai-analytics-copilot")
+
+
+def cache_root() -> str:
+    """
+    Root directory for all on-disk caches.
+    Override with the COPILOT_CACHE_DIR environment variable.
+    """
+    root = os.environ.get(CACHE_ENV_VAR) or DEFAULT_CACHE_ROOT
+    return os.path.abspath(os.path.expanduser(root))
+
+
+def cache_dir(name: str) -> str:
+    """
+    Return (and create) a named sub-directory of the cache root.
+    """
+    path = os.path.join(cache_root(), name)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,192 @@
+"""
+Approximate distinct counting.
+
+HyperLogLog keeps 2**p one-byte registers regardless of how many values
+it sees. Its relative standard error is about 1.04 / sqrt(2**p):
+
+    p = 10  ->  3.25 %   (1 KiB)
+    p = 12  ->  1.63 %   (4 KiB)
+    p = 14  ->  0.81 %   (16 KiB, default)
+    p = 16  ->  0.41 %   (64 KiB)
+
+so roughly 95 % of estimates fall within two standard errors of the
+true count. Sketches with the same precision merge by taking the
+register-wise maximum, which makes them safe to build per chunk or per
+partition and combine later.
+
+CardinalityCounter stays exact until it has seen more than
+exact_cutoff distinct values and only then switches to a sketch. Its
+count never drops to or below the cutoff once exceeded, so any
+threshold decision made against a value below the cutoff is exact.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PRECISION = 14
+DEFAULT_EXACT_CUTOFF = 1024
+
+# Hash at most this many values at a time to bound temporary memory
+_BLOCK = 1 << 20
+
+
+def hash_values(values) -> np.ndarray:
+    """
+    64-bit hashes of non-null values.
+
+    Numbers are hashed as float64 so 5 and 5.0 collide, as they would
+    in nunique over a column whose chunks were parsed with different
+    dtypes.
+    """
+    array = pd.Series(values).dropna().to_numpy()
+
+    if array.dtype.kind in "biu" or array.dtype.kind == "f":
+        array = array.astype(np.float64)
+
+    return pd.util.hash_array(array, categorize=False)
+
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """
+    Count leading zero bits of uint64 values (64 for zero).
+    """
+    x = x.copy()
+    zeros = np.zeros(x.shape, dtype=np.uint8)
+
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_clear = x < (np.uint64(1) << np.uint64(64 - shift))
+        zeros[top_clear] += shift
+        x[top_clear] <<= np.uint64(shift)
+
+    zeros[x == 0] = 64
+    return zeros
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch over 64-bit hashes.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes << p
+
+        rank = np.minimum(_leading_zeros(rest), 64 - self.precision) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def add(self, values) -> None:
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+
+        # Small-range correction (linear counting)
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and empty:
+            return m * np.log(m / empty)
+
+        return float(raw)
+
+
+class CardinalityCounter:
+    """
+    Distinct counter: exact below exact_cutoff, HyperLogLog above it.
+    """
+
+    def __init__(
+        self,
+        exact_cutoff: int = DEFAULT_EXACT_CUTOFF,
+        precision: int = DEFAULT_PRECISION
+    ):
+        self.exact_cutoff = exact_cutoff
+        self.precision = precision
+        self._exact: Optional[set] = set()
+        self._sketch: Optional[HyperLogLog] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self._sketch is None
+
+    def _switch_to_sketch(self) -> None:
+        self._sketch = HyperLogLog(self.precision)
+        self._sketch.add_hashes(np.fromiter(self._exact, dtype=np.uint64, count=len(self._exact)))
+        self._exact = None
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        for start in range(0, len(hashes), _BLOCK):
+            block = hashes[start:start + _BLOCK]
+
+            if self._sketch is not None:
+                self._sketch.add_hashes(block)
+                continue
+
+            distinct = pd.unique(block)
+            if len(distinct) > self.exact_cutoff:
+                self._switch_to_sketch()
+                self._sketch.add_hashes(distinct)
+                continue
+
+            self._exact.update(distinct.tolist())
+            if len(self._exact) > self.exact_cutoff:
+                self._switch_to_sketch()
+
+    def update(self, values) -> None:
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "CardinalityCounter") -> "CardinalityCounter":
+        if other.is_exact:
+            self.add_hashes(np.fromiter(other._exact, dtype=np.uint64, count=len(other._exact)))
+            return self
+
+        if self.is_exact:
+            self._switch_to_sketch()
+        self._sketch.merge(other._sketch)
+        return self
+
+    def count(self) -> int:
+        if self.is_exact:
+            return len(self._exact)
+
+        # Never report a value at or below the cutoff once it was exceeded
+        return max(int(round(self._sketch.estimate())), self.exact_cutoff + 1)
+
+
+def approx_nunique(
+    values,
+    exact_cutoff: int = DEFAULT_EXACT_CUTOFF,
+    precision: int = DEFAULT_PRECISION
+) -> int:
+    """
+    Distinct non-null values: exact up to exact_cutoff, estimated above.
+    """
+    counter = CardinalityCounter(exact_cutoff, precision)
+    counter.update(values)
+    return counter.count()
@@ -0,0 +1,268 @@
+"""
+Columnar on-disk cache of ingested CSV files.
+
+The first load of a file parses the CSV and writes every loaded column
+as a NumPy .npy file under a directory named after the file fingerprint
+(content hash, size and mtime). Later loads memory-map those files
+instead of re-parsing text. Numeric columns are mapped as-is; text
+columns are stored as int32 codes plus a JSON dictionary of values.
+
+Columns are cached individually, so a load restricted with usecols
+only parses the columns that are not cached yet. Threads loading the
+same file version fill its entry one at a time.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cache_paths import cache_dir
+from src.utils.fingerprint import file_fingerprint
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+MANIFEST = "manifest.json"
+
+# One lock per entry (file fingerprint), created on first use
+_entry_locks: Dict[str, threading.Lock] = {}
+_entry_locks_lock = threading.Lock()
+
+
+# -----------------------------
+# Manifest helpers
+# -----------------------------
+
+def _datasets_dir() -> str:
+    return cache_dir("datasets")
+
+
+def _read_manifest(entry_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(entry_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(entry_dir: str, manifest: Dict[str, Any]) -> None:
+    tmp = os.path.join(entry_dir, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(entry_dir, MANIFEST))
+
+
+# -----------------------------
+# Column encoding
+# -----------------------------
+
+def _is_plain_numpy(series: pd.Series) -> bool:
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufmM"
+
+
+def _write_column(entry_dir: str, stem: str, series: pd.Series) -> Dict[str, str]:
+    if _is_plain_numpy(series):
+        np.save(os.path.join(entry_dir, stem + ".npy"), series.to_numpy())
+        return {"kind": "array", "dtype": str(series.dtype)}
+
+    codes, uniques = pd.factorize(series)
+    np.save(os.path.join(entry_dir, stem + ".codes.npy"), codes.astype(np.int32))
+
+    with open(os.path.join(entry_dir, stem + ".values.json"), "w") as f:
+        json.dump(pd.Index(uniques).tolist(), f)
+
+    return {"kind": "dictionary", "dtype": str(series.dtype)}
+
+
+def _read_column(entry_dir: str, stem: str, meta: Dict[str, str], name: str) -> pd.Series:
+    if meta["kind"] == "array":
+        values = np.load(os.path.join(entry_dir, stem + ".npy"), mmap_mode="r")
+        # Plain ndarray view over the mapped buffer (no copy)
+        return pd.Series(values.view(np.ndarray), name=name, copy=False)
+
+    codes = np.load(os.path.join(entry_dir, stem + ".codes.npy"), mmap_mode="r")
+
+    with open(os.path.join(entry_dir, stem + ".values.json")) as f:
+        uniques = json.load(f)
+
+    # Trailing NaN so that code -1 decodes to missing
+    dictionary = np.empty(len(uniques) + 1, dtype=object)
+    dictionary[:-1] = uniques
+    dictionary[-1] = np.nan
+
+    series = pd.Series(dictionary[codes], name=name, copy=False)
+    if meta["dtype"] != "object":
+        series = series.astype(meta["dtype"])
+
+    return series
+
+
+def mapped_column_file(series: pd.Series) -> Optional[str]:
+    """
+    Path of the cached .npy file a loaded column is a zero-copy view of,
+    or None (text columns, derived or sliced columns, uncached frames).
+    """
+    if not _is_plain_numpy(series):
+        return None
+
+    values = series.to_numpy()
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+
+    if base is None or base.filename is None:
+        return None
+
+    same_buffer = (
+        values.dtype == base.dtype
+        and values.shape == base.shape
+        and values.strides == base.strides
+        and values.__array_interface__["data"][0] == base.__array_interface__["data"][0]
+    )
+    return base.filename if same_buffer else None
+
+
+# -----------------------------
+# Eviction
+# -----------------------------
+
+def _entry_size(entry_dir: str) -> int:
+    total = 0
+    for name in os.listdir(entry_dir):
+        try:
+            total += os.path.getsize(os.path.join(entry_dir, name))
+        except OSError:
+            pass
+    return total
+
+
+def cache_entries() -> List[Dict[str, Any]]:
+    """
+    List cache entries with their size and last-use time.
+    """
+    root = _datasets_dir()
+    entries = []
+
+    for name in os.listdir(root):
+        entry_dir = os.path.join(root, name)
+        manifest_path = os.path.join(entry_dir, MANIFEST)
+        if not os.path.isfile(manifest_path):
+            continue
+        entries.append({
+            "fingerprint": name,
+            "path": entry_dir,
+            "bytes": _entry_size(entry_dir),
+            "last_used": os.path.getmtime(manifest_path),
+        })
+
+    return entries
+
+
+def evict(max_bytes: int = DEFAULT_MAX_BYTES, keep: Optional[str] = None) -> List[str]:
+    """
+    Remove least recently used entries until the cache fits in max_bytes.
+    The entry named by keep is never removed.
+    """
+    entries = sorted(cache_entries(), key=lambda e: e["last_used"])
+    total = sum(e["bytes"] for e in entries)
+    removed = []
+
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        if entry["fingerprint"] == keep:
+            continue
+        shutil.rmtree(entry["path"], ignore_errors=True)
+        total -= entry["bytes"]
+        removed.append(entry["fingerprint"])
+
+    return removed
+
+
+def _drop_stale_entries(source: str, fingerprint: str) -> None:
+    """
+    Remove entries built from an earlier version of the same file.
+    """
+    for entry in cache_entries():
+        if entry["fingerprint"] == fingerprint:
+            continue
+        manifest = _read_manifest(entry["path"])
+        if manifest and manifest.get("source") == source:
+            shutil.rmtree(entry["path"], ignore_errors=True)
+
+
+def clear_cache() -> None:
+    shutil.rmtree(_datasets_dir(), ignore_errors=True)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def _entry_lock(fingerprint: str) -> threading.Lock:
+    with _entry_locks_lock:
+        return _entry_locks.setdefault(fingerprint, threading.Lock())
+
+
+def load_csv_cached(
+    path: str,
+    usecols: Optional[List[str]] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES
+) -> pd.DataFrame:
+    """
+    Load a CSV through the columnar cache.
+
+    Equivalent to pd.read_csv(path, usecols=usecols) with columns in
+    file order. The returned frame carries the file fingerprint in
+    df.attrs["fingerprint"].
+    """
+    source = os.path.abspath(path)
+    fingerprint = file_fingerprint(path)
+    entry_dir = os.path.join(_datasets_dir(), fingerprint)
+
+    # Concurrent first loads would parse the file and write the same
+    # column files twice; the second waits and maps the first's columns
+    with _entry_lock(fingerprint):
+        manifest = _read_manifest(entry_dir)
+        if manifest is None:
+            header = pd.read_csv(path, nrows=0).columns.tolist()
+            manifest = {"source": source, "header": header, "rows": None, "columns": {}}
+
+        header = manifest["header"]
+        wanted = [c for c in header if usecols is None or c in usecols]
+        missing = [c for c in wanted if c not in manifest["columns"]]
+
+        parsed = None
+        if missing:
+            parsed = pd.read_csv(path, usecols=missing)
+            os.makedirs(entry_dir, exist_ok=True)
+
+            for column in missing:
+                stem = f"c{header.index(column)}"
+                manifest["columns"][column] = _write_column(entry_dir, stem, parsed[column])
+
+            manifest["rows"] = len(parsed)
+            _write_manifest(entry_dir, manifest)
+            _drop_stale_entries(source, fingerprint)
+            evict(max_bytes, keep=fingerprint)
+        else:
+            # Touch the manifest: its mtime is the LRU timestamp
+            os.utime(os.path.join(entry_dir, MANIFEST), (time.time(), time.time()))
+
+        columns = {}
+        for column in wanted:
+            if parsed is not None and column in parsed.columns:
+                columns[column] = parsed[column]
+            else:
+                stem = f"c{header.index(column)}"
+                columns[column] = _read_column(entry_dir, stem, manifest["columns"][column], column)
+
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs["fingerprint"] = fingerprint
+
+    return df
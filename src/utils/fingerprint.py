@@ -0,0 +1,30 @@
+import hashlib
+import os
+
+
+SAMPLE_BYTES = 64 * 1024
+READ_BLOCK_BYTES = 1024 * 1024
+
+
+def file_fingerprint(path: str, full_hash: bool = False) -> str:
+    """
+    Identify a dataset file by its content.
+
+    Combines size and modification time with a hash of the content.
+    By default only the first and last 64 KiB are hashed, which is
+    cheap on multi-GB files; full_hash=True hashes every byte.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    with open(path, "rb") as f:
+        if full_hash or stat.st_size <= 2 * SAMPLE_BYTES:
+            for block in iter(lambda: f.read(READ_BLOCK_BYTES), b""):
+                digest.update(block)
+        else:
+            digest.update(f.read(SAMPLE_BYTES))
+            f.seek(-SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(SAMPLE_BYTES))
+
+    return digest.hexdigest()[:32]
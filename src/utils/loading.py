@@ -0,0 +1,41 @@
+"""
+Dataset loading helpers shared by the CLI, batch runner, catalog and service.
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.utils.dataset_cache import load_csv_cached
+from src.utils.fingerprint import file_fingerprint
+
+
+def load_dataset(
+    path: str,
+    usecols: Optional[List[str]] = None,
+    use_cache: bool = True
+) -> pd.DataFrame:
+    """
+    Load a CSV, through the columnar on-disk cache unless disabled.
+    """
+    if use_cache:
+        return load_csv_cached(path, usecols=usecols)
+
+    df = pd.read_csv(path, usecols=usecols)
+    df.attrs["fingerprint"] = file_fingerprint(path)
+    return df
+
+
+def confirmed_columns(confirmed: Dict) -> List[str]:
+    """
+    Source columns referenced by the confirmed mappings.
+    """
+    columns = list(confirmed.get("measures", []))
+
+    for key in ("entity", "time"):
+        if confirmed.get(key):
+            columns.append(confirmed[key])
+
+    columns.extend(confirmed.get("dimensions", []))
+
+    return list(dict.fromkeys(columns))
@@ -0,0 +1,47 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class Timings:
+    """
+    Thread-safe registry of named wall-clock spans (seconds).
+    Repeated spans with the same name accumulate.
+    """
+
+    def __init__(self):
+        self._spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    def get(self, name: str, default: float = 0.0) -> float:
+        with self._lock:
+            return self._spans.get(name, default)
+
+    def report(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._spans)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+# Process-wide registry used by the pipeline stages
+TIMINGS = Timings()
+
+
+def span(name: str):
+    return TIMINGS.span(name)
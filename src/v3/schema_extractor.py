@@ -1,11 +1,17 @@
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from src.v4.date_parsing import parse_dates, is_text_series
+from src.utils.cardinality import approx_nunique
 
-def infer_column_type(series: pd.Series) -> str:
+
+def infer_column_type(series: pd.Series, fingerprint: Optional[str] = None) -> str:
     """
     Infer high-level data type of a column.
     Includes safe detection of date-like strings.
+
+    Parsed dates are memoized under the dataset fingerprint so the
+    canonical build can reuse them.
     """
     # Already datetime
     if pd.api.types.is_datetime64_any_dtype(series):
@@ -16,8 +22,8 @@ def infer_column_type(series: pd.Series) -> str:
         return "numeric"
 
     # Try parsing strings as dates (SAFE check)
-    if series.dtype == object:
-        parsed = pd.to_datetime(series, errors="coerce")
+    if is_text_series(series):
+        parsed = parse_dates(series, fingerprint)
         non_null_ratio = parsed.notna().mean()
 
         # If most values parse correctly, treat as date
@@ -28,7 +34,30 @@ def infer_column_type(series: pd.Series) -> str:
 
 
 
-def numeric_signals(series: pd.Series) -> Dict[str, Any]:
+def unique_count(clean: pd.Series, approximate: bool = False) -> int:
+    """
+    Distinct values of a null-free series.
+    approximate=True uses a HyperLogLog sketch above a small exact cutoff.
+    """
+    if approximate:
+        return approx_nunique(clean)
+    return int(clean.nunique())
+
+
+def first_unique_values(clean: pd.Series, n: int = 5) -> list:
+    """
+    First n distinct values in order of appearance, scanning only as far as needed.
+    """
+    window = 1024
+
+    while True:
+        uniques = clean.iloc[:window].unique()
+        if len(uniques) >= n or window >= len(clean):
+            return uniques[:n].tolist()
+        window *= 8
+
+
+def numeric_signals(series: pd.Series, approximate: bool = False) -> Dict[str, Any]:
     """
     Extract behavioral signals for numeric columns.
     """
@@ -39,43 +68,57 @@ def numeric_signals(series: pd.Series) -> Dict[str, Any]:
         "max": float(clean.max()),
         "mean": float(clean.mean()),
         "is_integer_like": bool((clean % 1 == 0).all()),
-        "unique_count": int(clean.nunique())
+        "unique_count": unique_count(clean, approximate)
     }
 
 
-def categorical_signals(series: pd.Series) -> Dict[str, Any]:
+def categorical_signals(series: pd.Series, approximate: bool = False) -> Dict[str, Any]:
     """
     Extract behavioral signals for categorical columns.
     """
     clean = series.dropna()
 
     return {
-        "unique_count": int(clean.nunique()),
-        "sample_values": clean.unique()[:5].tolist()
+        "unique_count": unique_count(clean, approximate),
+        "sample_values": first_unique_values(clean, 5)
     }
 
 
-def extract_schema(df: pd.DataFrame) -> Dict[str, Any]:
+def profile_column(
+    series: pd.Series,
+    fingerprint: Optional[str] = None,
+    approximate: bool = False
+) -> Dict[str, Any]:
     """
-    Extract dataset schema with behavioral signals.
+    Build the schema entry (type, missing count, signals) for one column.
     """
-    schema = {}
+    col_type = infer_column_type(series, fingerprint)
 
-    for column in df.columns:
-        series = df[column]
-        col_type = infer_column_type(series)
+    entry = {
+        "type": col_type,
+        "missing_count": int(series.isna().sum())
+    }
 
-        entry = {
-            "type": col_type,
-            "missing_count": int(series.isna().sum())
-        }
+    if col_type == "numeric":
+        entry["signals"] = numeric_signals(series, approximate)
 
-        if col_type == "numeric":
-            entry["signals"] = numeric_signals(series)
+    elif col_type == "categorical":
+        entry["signals"] = categorical_signals(series, approximate)
 
-        elif col_type == "categorical":
-            entry["signals"] = categorical_signals(series)
+    return entry
 
-        schema[column] = entry
+
+def extract_schema(df: pd.DataFrame, approximate: bool = False) -> Dict[str, Any]:
+    """
+    Extract dataset schema with behavioral signals.
+
+    approximate=True estimates unique counts with HyperLogLog; counts up
+    to the exact cutoff (and so the mapper's small thresholds) stay exact.
+    """
+    schema = {}
+    fingerprint = df.attrs.get("fingerprint")
+
+    for column in df.columns:
+        schema[column] = profile_column(df[column], fingerprint, approximate)
 
     return schema
@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
-from typing import Dict
+from itertools import combinations
+from typing import Dict, Optional
+
+from src.v4.time_buckets import epoch_days, rollup_to_bucket, with_timestamps
 
 
 # -----------------------------
@@ -15,14 +19,142 @@ class SummaryResult(TypedDict):
 
 class RankResult(TypedDict):
     ranking: dict
+    total_entities: int
+    order: str
 
 
 class TrendResult(TypedDict):
     trend: dict
+    bucket: str
 class CompareResult(TypedDict):
     comparison: dict
 
 
+class GroupingSetsResult(TypedDict):
+    grouping_sets: dict
+
+
+# -----------------------------
+# Shared grouping helpers
+# -----------------------------
+
+def group_sum(frame: pd.DataFrame, key, values="measure"):
+    """
+    Sum values per key, keeping missing keys as their own group.
+    key may be a column name or an aligned Series; values may be a
+    column name (Series result) or a list of names (DataFrame result).
+
+    Categorical keys are grouped on their codes; only observed labels
+    appear in the result. When key is a name only the key and value
+    columns are selected, so a CanonicalView derives nothing else.
+    """
+    if isinstance(key, str):
+        value_cols = values if isinstance(values, list) else [values]
+        frame = frame[[key] + value_cols]
+
+    return frame.groupby(key, dropna=False, observed=True)[values].sum()
+
+
+def select_ranked(
+    sums: pd.Series,
+    start: int,
+    stop: int,
+    ascending: bool = False
+) -> pd.Series:
+    """
+    Rows start..stop of sums ordered by value (descending unless
+    ascending), ties in key order, missing values last.
+
+    Partial selection: only values that can land in the first stop
+    positions are sorted.
+    """
+    if start < 0 or stop < 0:
+        raise ValueError(f"Ranking slice {start}:{stop} must not be negative")
+
+    n = len(sums)
+    stop = min(stop, n)
+    if start >= stop:
+        return sums.iloc[:0]
+
+    values = sums.to_numpy()
+    if values.dtype.kind in "bu":
+        values = values.astype(np.int64)
+
+    missing = pd.isna(values)
+    keyed = values if ascending else -values
+    if missing.any():
+        keyed = np.where(missing, np.inf, keyed)
+
+    candidates = np.arange(n)
+    if stop < n:
+        kth = np.partition(keyed, stop - 1)[stop - 1]
+        candidates = np.flatnonzero(keyed <= kth)
+
+    order = candidates[np.lexsort((candidates, keyed[candidates], missing[candidates]))]
+    return sums.iloc[order[start:stop]]
+
+
+def ranking_from_sums(sums: pd.Series) -> dict:
+    return select_ranked(sums, 0, len(sums)).to_dict()
+
+
+def rank_from_sums(
+    sums: pd.Series,
+    top_k: Optional[int] = None,
+    bottom_k: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> RankResult:
+    """
+    Requested slice of the entity ranking plus the total entity count.
+
+    top_k is shorthand for offset=0, limit=top_k. bottom_k returns the
+    lowest entities, lowest first, and cannot be combined with paging.
+    """
+    slice_params = {"top_k": top_k, "bottom_k": bottom_k, "offset": offset, "limit": limit}
+    for name, value in slice_params.items():
+        if value is not None and value < 0:
+            raise ValueError(f"{name} must not be negative, got {value}")
+
+    if bottom_k is not None and (top_k is not None or offset or limit is not None):
+        raise ValueError("bottom_k cannot be combined with top_k, offset or limit")
+
+    if top_k is not None:
+        if offset or limit is not None:
+            raise ValueError("top_k cannot be combined with offset or limit")
+        limit = top_k
+
+    if bottom_k is not None:
+        ranked = select_ranked(sums, 0, bottom_k, ascending=True)
+    else:
+        stop = len(sums) if limit is None else offset + limit
+        ranked = select_ranked(sums, offset, stop)
+
+    return {
+        "ranking": ranked.to_dict(),
+        "total_entities": len(sums),
+        "order": "ascending" if bottom_k is not None else "descending",
+    }
+
+
+def trend_from_sums(sums: pd.Series) -> dict:
+    return sums.sort_index().to_dict()
+
+
+def bucketed_trend(day_sums: pd.Series, bucket: str) -> TrendResult:
+    """
+    Trend result for a bucket, derived from day-level sums (epoch-day index).
+    """
+    return {
+        "trend": trend_from_sums(with_timestamps(rollup_to_bucket(day_sums, bucket))),
+        "bucket": bucket,
+    }
+
+
+# -----------------------------
+# SUMMARY (active measure)
+# -----------------------------
+
 def run_summary(canonical_df: pd.DataFrame) -> SummaryResult:
     """
     Compute summary statistics for the active measure.
@@ -44,45 +176,52 @@ def run_summary(canonical_df: pd.DataFrame) -> SummaryResult:
 # RANK
 # -----------------------------
 
-def run_rank(canonical_df: pd.DataFrame) -> RankResult:
+def run_rank(
+    canonical_df: pd.DataFrame,
+    top_k: Optional[int] = None,
+    bottom_k: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> RankResult:
     """
     Rank entities by the active measure.
+
+    Without arguments every entity is returned; top_k / bottom_k /
+    offset + limit return only that slice (see rank_from_sums).
     """
     if "measure" not in canonical_df.columns or "entity" not in canonical_df.columns:
         return {}
 
-    ranking = (
-        canonical_df
-        .groupby("entity", dropna=False)["measure"]
-        .sum()
-        .sort_values(ascending=False)
+    return rank_from_sums(
+        group_sum(canonical_df, "entity"),
+        top_k=top_k,
+        bottom_k=bottom_k,
+        offset=offset,
+        limit=limit,
     )
 
-    return {
-        "ranking": ranking.to_dict()
-    }
-
 
 # -----------------------------
 # TREND
 # -----------------------------
 
-def run_trend(canonical_df: pd.DataFrame) -> TrendResult:
+def run_trend(canonical_df: pd.DataFrame, bucket: Optional[str] = None) -> TrendResult:
     """
     Compute trend of the active measure over time.
+
+    Without a bucket every distinct time value is a point. With a bucket
+    (day / week / month / quarter / year) rows are summed per epoch day
+    once and the bucket is rolled up from those day totals.
     """
     if "measure" not in canonical_df.columns or "time" not in canonical_df.columns:
         return {}
 
-    trend = (
-        canonical_df
-        .groupby("time", dropna=False)["measure"]
-        .sum()
-        .sort_index()
-    )
+    if bucket is not None:
+        days = epoch_days(canonical_df["time"])
+        return bucketed_trend(group_sum(canonical_df[["measure"]], days), bucket)
 
     return {
-        "trend": trend.to_dict()
+        "trend": trend_from_sums(group_sum(canonical_df, "time"))
     }
 
 
@@ -107,14 +246,140 @@ def run_compare(canonical_df: pd.DataFrame) -> CompareResult:
     comparisons = {}
 
     for dim in dimension_cols:
-        grouped = (
-            canonical_df
-            .groupby(dim, dropna=False)["measure"]
-            .sum()
-            .sort_values(ascending=False)
-        )
-        comparisons[dim] = grouped.to_dict()
+        comparisons[dim] = ranking_from_sums(group_sum(canonical_df, dim))
 
     return {
         "comparisons": comparisons
     }
+
+
+# -----------------------------
+# COMPARE (grouping sets)
+# -----------------------------
+
+def _key_codes(series: pd.Series):
+    """
+    Integer codes (missing -> len(labels)) and the decode table for a key.
+    """
+    categorical = (
+        series.array if isinstance(series.dtype, pd.CategoricalDtype)
+        else pd.Categorical(series)
+    )
+    labels = np.append(categorical.categories.to_numpy(dtype=object), np.nan)
+    codes = categorical.codes.astype(np.int64)
+    codes[codes < 0] = len(labels) - 1
+
+    return codes, labels
+
+
+def _sum_by_code(codes: np.ndarray, weights: np.ndarray):
+    """
+    One hash pass: distinct codes (first-seen order) and their sums.
+    Integer weights are summed in int64, so large totals stay exact.
+    """
+    group, uniques = pd.factorize(codes)
+
+    if weights.dtype.kind in "biu":
+        sums = np.zeros(len(uniques), dtype=np.int64)
+        np.add.at(sums, group, weights.astype(np.int64, copy=False))
+        return uniques, sums
+
+    return uniques, np.bincount(group, weights=weights, minlength=len(uniques))
+
+
+def run_compare_grouping_sets(
+    canonical_df: pd.DataFrame,
+    depth: Optional[int] = 2,
+    dimensions: Optional[List[str]] = None
+) -> GroupingSetsResult:
+    """
+    Compare the active measure across every combination of up to depth
+    dimensions (1 = per dimension, 2 = also pairs, None = full cube).
+
+    All dimension codes are packed into one integer key and the rows are
+    summed in a single hash pass at the finest grain. Every grouping set
+    is then rolled up from those (much smaller) partial sums. Integer
+    measures are exact; float totals may differ from run_compare in the
+    last bits because of the different summation order.
+
+    The result is columnar: one list per dimension (None where the set
+    rolls that dimension up), a "set" list indexing into "sets", and a
+    "measure" list. Rows of each set are sorted by measure, descending,
+    ties in a fixed label order.
+    """
+    if "measure" not in canonical_df.columns:
+        return {}
+
+    dims = dimensions or [
+        c for c in canonical_df.columns if c.startswith("dimension_")
+    ]
+
+    if not dims:
+        return {}
+
+    depth = len(dims) if depth is None else max(1, min(depth, len(dims)))
+
+    measure = canonical_df["measure"]
+    if measure.dtype.kind in "biu":
+        weights = measure.to_numpy(dtype=np.int64, na_value=0)
+    else:
+        weights = np.nan_to_num(measure.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    # ---- Finest grain: mixed-radix key over all dimensions ----
+    codes, labels, strides = {}, {}, {}
+    stride = 1
+    for d in dims:
+        codes[d], labels[d] = _key_codes(canonical_df[d])
+        strides[d] = stride
+        stride *= len(labels[d])
+
+    if stride >= 2 ** 62:
+        raise ValueError("Too many dimension combinations for grouping sets")
+
+    packed = np.zeros(len(measure), dtype=np.int64)
+    for d in dims:
+        packed += codes[d] * strides[d]
+
+    finest_keys, finest_sums = _sum_by_code(packed, weights)
+    finest_codes = {
+        d: (finest_keys // strides[d]) % len(labels[d]) for d in dims
+    }
+
+    # ---- Roll up each grouping set ----
+    sets = [
+        list(subset)
+        for size in range(1, depth + 1)
+        for subset in combinations(dims, size)
+    ]
+
+    columns = {d: [] for d in dims}
+    set_ids = []
+    values = []
+
+    for set_id, subset in enumerate(sets):
+        set_key = np.zeros(len(finest_keys), dtype=np.int64)
+        for d in subset:
+            set_key += finest_codes[d] * strides[d]
+
+        keys, sums = _sum_by_code(set_key, finest_sums)
+
+        # Descending measure, ties in label order
+        order = np.lexsort((keys, -sums))
+        keys, sums = keys[order], sums[order]
+
+        for d in dims:
+            if d in subset:
+                columns[d].extend(labels[d][(keys // strides[d]) % len(labels[d])].tolist())
+            else:
+                columns[d].extend([None] * len(keys))
+
+        set_ids.extend([set_id] * len(keys))
+        values.extend(sums.tolist())
+
+    return {
+        "grouping_sets": {
+            "dimensions": dims,
+            "sets": sets,
+            "columns": {"set": set_ids, **columns, "measure": values},
+        }
+    }
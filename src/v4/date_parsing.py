@@ -0,0 +1,181 @@
+# src/v4/date_parsing.py
+"""
+Format-inferring, memoized date parsing.
+
+Date columns repeat the same few thousand strings millions of times.
+Instead of parsing every row, the column is factorized, candidate
+formats are screened on a sample of the distinct strings and confirmed
+on all of them, only the distinct strings are parsed, and the result is
+mapped back through the codes.
+
+Parsed columns are cached per (dataset fingerprint, column) so schema
+extraction and canonical build parse each column at most once.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+import threading
+import warnings
+import pandas as pd
+
+
+# -----------------------------
+# Configuration
+# -----------------------------
+
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%b %d, %Y",
+    "%d %b %Y",
+]
+
+# Formats that read the same strings month-first and day-first; values
+# fitting both are left to pandas' own inference
+AMBIGUOUS_FORMATS = {
+    "%m/%d/%Y": "%d/%m/%Y",
+    "%d/%m/%Y": "%m/%d/%Y",
+    "%m-%d-%Y": "%d-%m-%Y",
+    "%d-%m-%Y": "%m-%d-%Y",
+}
+
+FORMAT_SAMPLE_SIZE = 200
+
+# Share of values that must parse for a column to count as a date
+# (the infer_column_type threshold)
+DATE_RATIO_THRESHOLD = 0.8
+CACHE_MAX_ENTRIES = 16
+
+_cache: "OrderedDict[Tuple[str, str], pd.Series]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def is_text_series(series: pd.Series) -> bool:
+    """
+    True for columns holding strings (object or pandas string dtype).
+    """
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def _parse_format(values, fmt: str) -> Optional[pd.DatetimeIndex]:
+    """
+    values parsed with fmt, or None unless every value parses.
+    """
+    try:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    except (ValueError, TypeError):
+        return None
+    return parsed if parsed.notna().all() else None
+
+
+def detect_date_format(values) -> Tuple[Optional[str], Optional[pd.DatetimeIndex]]:
+    """
+    Return the candidate format that parses every value, with the parsed
+    values, or (None, None) when no single format fits or the values read
+    both month-first and day-first.
+
+    Formats are screened on the first FORMAT_SAMPLE_SIZE values and only
+    those fitting the sample are tried on all of them.
+    """
+    values = pd.Index(values)
+    sample = values[:FORMAT_SAMPLE_SIZE]
+    if len(sample) == 0:
+        return None, None
+
+    fitting = [fmt for fmt in CANDIDATE_FORMATS if _parse_format(sample, fmt) is not None]
+
+    for fmt in fitting:
+        parsed = _parse_format(values, fmt)
+        if parsed is None:
+            continue
+
+        other = AMBIGUOUS_FORMATS.get(fmt)
+        if other in fitting and _parse_format(values, other) is not None:
+            return None, None
+        return fmt, parsed
+
+    return None, None
+
+
+def _parse_text(series: pd.Series) -> pd.Series:
+    codes, uniques = pd.factorize(series)
+
+    fmt, parsed_uniques = detect_date_format(uniques)
+    if fmt is None:
+        # Probing non-date columns is expected; pandas warns on every one
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            # dateutil parses one value at a time: probe a sample first
+            # so high-cardinality text (ids, names) is not parsed in full
+            sample = pd.to_datetime(uniques[:FORMAT_SAMPLE_SIZE], errors="coerce")
+            if len(sample) and sample.notna().mean() < DATE_RATIO_THRESHOLD:
+                return pd.Series(
+                    pd.NaT, index=series.index, name=series.name, dtype=sample.dtype
+                )
+            parsed_uniques = pd.to_datetime(uniques, errors="coerce")
+
+    parsed = pd.DatetimeIndex(parsed_uniques).take(
+        codes, allow_fill=True, fill_value=pd.NaT
+    )
+
+    return pd.Series(parsed, index=series.index, name=series.name)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def parse_dates(
+    series: pd.Series,
+    fingerprint: Optional[str] = None
+) -> pd.Series:
+    """
+    Parse a column to datetimes with errors coerced to NaT.
+
+    Equivalent to pd.to_datetime(series, errors="coerce"), except that
+    text columns in no known format whose sampled values mostly fail to
+    parse are returned as all NaT without parsing every value. When a
+    dataset fingerprint is given the result is memoized under
+    (fingerprint, column name); callers must not mutate it.
+    """
+    key = (fingerprint, str(series.name)) if fingerprint else None
+
+    if key is not None:
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key]
+
+    if is_text_series(series):
+        try:
+            parsed = _parse_text(series)
+        except (ValueError, TypeError):
+            # e.g. mixed time zones: defer to pandas' row-wise parser
+            parsed = pd.to_datetime(series, errors="coerce")
+    else:
+        parsed = pd.to_datetime(series, errors="coerce")
+
+    # Columns where nothing parsed are not date candidates; don't pin them
+    if key is not None and parsed.notna().any():
+        with _cache_lock:
+            _cache[key] = parsed
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+
+    return parsed
+
+
+def clear_date_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
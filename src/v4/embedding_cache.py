@@ -0,0 +1,149 @@
+# src/v4/embedding_cache.py
+"""
+Persistent embedding store for column names and semantic labels.
+
+Embeddings are stored in SQLite as float32 blobs keyed by
+(model name, text). The store is bounded by entry count and evicts the
+least recently used rows. Hit / miss / eviction counters are kept per
+process.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.utils.cache_paths import cache_dir
+
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    Size-bounded LRU embedding store backed by SQLite.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.path = path or os.path.join(cache_dir("embeddings"), "embeddings.sqlite")
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    # -----------------------------
+    # Lookup / store
+    # -----------------------------
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Return cached embeddings for the texts that are present.
+        """
+        unique = list(dict.fromkeys(texts))
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for start in range(0, len(unique), _QUERY_BATCH):
+                batch = unique[start:start + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text, vector FROM embeddings"
+                    f" WHERE model = ? AND text IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for text, blob in rows:
+                    found[text] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text = ?",
+                    [(now, model, text) for text in found],
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+
+        return found
+
+    def put_many(self, model: str, texts: List[str], vectors: np.ndarray) -> None:
+        """
+        Store embeddings (one row of vectors per text), then evict if over budget.
+        """
+        now = time.time()
+        rows = [
+            (model, text, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text, vector, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                " SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    # -----------------------------
+    # Introspection
+    # -----------------------------
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
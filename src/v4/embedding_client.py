@@ -0,0 +1,112 @@
+# src/v4/embedding_client.py
+"""
+Client for the shared embedding server (src.v4.embedding_server).
+
+When COPILOT_EMBEDDING_SOCKET names the Unix socket of a running
+server, the semantic advisor sends texts there instead of loading the
+model in-process. Every failure (no server, wrong model, timeout)
+returns None, and the caller falls back to its own model.
+
+Wire format: one JSON object per line each way. Vectors travel as
+base64-encoded float32 bytes, row-major.
+"""
+
+import base64
+import json
+import logging
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+SOCKET_ENV_VAR = "COPILOT_EMBEDDING_SOCKET"
+
+# The first request may wait for the server's model load
+REQUEST_TIMEOUT_S = 60.0
+CONNECT_TIMEOUT_S = 0.5
+
+_logger = logging.getLogger(__name__)
+
+
+def socket_path() -> Optional[str]:
+    return os.environ.get(SOCKET_ENV_VAR) or None
+
+
+def encode_vectors(vectors: np.ndarray) -> Dict[str, Any]:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return {
+        "shape": list(vectors.shape),
+        "vectors": base64.b64encode(vectors.tobytes()).decode("ascii"),
+    }
+
+
+def decode_vectors(payload: Dict[str, Any]) -> np.ndarray:
+    data = base64.b64decode(payload["vectors"])
+    return np.frombuffer(data, dtype=np.float32).reshape(payload["shape"])
+
+
+def _call(path: str, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT_S)
+        sock.connect(path)
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+
+    return json.loads(b"".join(chunks))
+
+
+def server_info(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Model and batching stats of the running server, or None.
+    """
+    path = path or socket_path()
+    if not path:
+        return None
+
+    try:
+        response = _call(path, {"op": "info"}, CONNECT_TIMEOUT_S)
+    except (OSError, ValueError):
+        return None
+
+    return response if response.get("ok") else None
+
+
+def remote_encode(
+    texts: List[str],
+    model: str,
+    path: Optional[str] = None
+) -> Optional[np.ndarray]:
+    """
+    L2-normalized float32 embeddings from the server, or None when no
+    compatible server answers. model is the caller's model_key().
+    """
+    path = path or socket_path()
+    if not path or not texts:
+        return None
+
+    try:
+        response = _call(
+            path,
+            {"op": "encode", "model": model, "texts": list(texts)},
+            REQUEST_TIMEOUT_S,
+        )
+    except (OSError, ValueError) as e:
+        _logger.debug(f"Embedding server unavailable: {e}")
+        return None
+
+    if not response.get("ok"):
+        _logger.warning(f"Embedding server refused request: {response.get('error')}")
+        return None
+
+    return decode_vectors(response)
@@ -0,0 +1,247 @@
+# src/v4/embedding_server.py
+"""
+Shared embedding server: one model for many copilot processes.
+
+Loads the advisor model once and serves encode requests over a Unix
+socket (see src.v4.embedding_client for the wire format). Requests that
+arrive while a batch is being encoded, or within max_wait of each
+other, are coalesced: their texts are de-duplicated and encoded in one
+model call, then split back per request.
+
+    python -m src.v4.embedding_server --socket /tmp/copilot-embed.sock
+    export COPILOT_EMBEDDING_SOCKET=/tmp/copilot-embed.sock
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.v4 import semantic_advisor
+from src.v4.embedding_client import encode_vectors
+
+
+DEFAULT_SOCKET = "/tmp/copilot-embed.sock"
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT_MS = 5.0
+
+STREAM_LIMIT = 64 * 2 ** 20
+
+_logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Request coalescing
+# -----------------------------
+
+class Coalescer:
+    """
+    Queues encode requests and runs them as de-duplicated batches,
+    one model call at a time.
+    """
+
+    def __init__(
+        self,
+        encode,
+        executor: ThreadPoolExecutor,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS
+    ):
+        self._encode = encode
+        self._executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: List[Tuple[List[str], asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.encoded = 0
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((texts, future))
+        self.requests += 1
+        self._wakeup.set()
+        return await future
+
+    def _take_batch(self) -> List[Tuple[List[str], asyncio.Future]]:
+        batch, size = [], 0
+        while self._queue and (not batch or size + len(self._queue[0][0]) <= self.max_batch):
+            texts, future = self._queue.pop(0)
+            batch.append((texts, future))
+            size += len(texts)
+
+        if not self._queue:
+            self._wakeup.clear()
+        return batch
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._wakeup.wait()
+            # Give concurrent callers a moment to join this batch
+            await asyncio.sleep(self.max_wait)
+
+            batch = self._take_batch()
+            unique = list(dict.fromkeys(t for texts, _ in batch for t in texts))
+
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode, unique)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += sum(len(texts) for texts, _ in batch)
+            self.encoded += len(unique)
+
+            row = {text: i for i, text in enumerate(unique)}
+            for texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[[row[t] for t in texts]])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "encoded": self.encoded,
+            "mean_batch_requests": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# -----------------------------
+# Server
+# -----------------------------
+
+def _encode_texts(texts: List[str]) -> np.ndarray:
+    model = semantic_advisor._load_model()
+    if model is None:
+        raise RuntimeError("Advisor model unavailable on the embedding server")
+    return semantic_advisor._encode(model, texts).astype(np.float32)
+
+
+async def _respond(coalescer: Coalescer, request: Dict[str, Any]) -> Dict[str, Any]:
+    op = request.get("op")
+
+    if op == "info":
+        return {"ok": True, "model": semantic_advisor.model_key(), "stats": coalescer.stats()}
+
+    if op != "encode":
+        return {"ok": False, "error": f"Unknown op '{op}'"}
+
+    model = semantic_advisor.model_key()
+    if request.get("model") != model:
+        return {"ok": False, "error": f"Server runs '{model}', request is for '{request.get('model')}'"}
+
+    texts = request.get("texts") or []
+    vectors = await coalescer.submit([str(t) for t in texts])
+    return {"ok": True, **encode_vectors(vectors)}
+
+
+def connection_handler(coalescer: Coalescer):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await _respond(coalescer, json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(
+    socket_path: str = DEFAULT_SOCKET,
+    max_batch: int = DEFAULT_MAX_BATCH,
+    max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ready: Optional[asyncio.Event] = None
+) -> None:
+    """
+    Serve encode requests on socket_path until cancelled.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+    coalescer = Coalescer(_encode_texts, executor, max_batch, max_wait_ms)
+    batcher = asyncio.create_task(coalescer.run())
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = await asyncio.start_unix_server(
+        connection_handler(coalescer), socket_path, limit=STREAM_LIMIT
+    )
+
+    _logger.info(f"Embedding server ({semantic_advisor.model_key()}) listening on {socket_path}")
+    if ready is not None:
+        ready.set()
+
+    # SIGTERM stops serving cleanly (the socket file is removed)
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Shared embedding server")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--backend", choices=semantic_advisor.BACKENDS, default=None,
+                        help="Inference backend (default: COPILOT_ADVISOR_BACKEND or torch)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help="Texts per coalesced model call")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="How long a batch waits for more requests")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    semantic_advisor.set_advisor_enabled(True)
+    if args.backend:
+        semantic_advisor.set_backend(args.backend)
+
+    # Fail fast instead of refusing every request later
+    if semantic_advisor._load_model() is None:
+        _logger.error("Advisor model could not be loaded")
+        return 1
+
+    try:
+        asyncio.run(serve(args.socket, args.max_batch, args.max_wait_ms))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
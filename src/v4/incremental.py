@@ -0,0 +1,604 @@
+# src/v4/incremental.py
+"""
+Incremental append mode for CSV files that only grow.
+
+After each run the state of a file is saved under the cache directory:
+the byte offset processed so far, the file's size and modification
+time, SHA-256 hashes of a few blocks of the processed prefix, the schema
+accumulators, and per-key sums of every confirmed measure (per entity,
+per raw time value, and per combination of dimensions). The next run
+checks the header and those blocks (the head and tail of the prefix and
+evenly spaced blocks in between), parses only the bytes after the
+offset and folds them into the saved state. The check reads the same
+few blocks whatever the size of the file; a rewrite that leaves all of
+them intact goes unnoticed (clear_incremental_state() forces a rebuild).
+
+Each run consumes complete lines up to the size the file had when it
+started, so rows appended during a run are picked up by the next one.
+A last line without a newline is counted once the file has stopped
+growing, but stays out of the saved state: its start offset remains
+pending, so a later append that completes it reads it again.
+Measure sums are folded while the new bytes stream; nothing is buffered.
+
+Anything other than a pure append (a rewritten prefix, a truncated
+file or a new header) falls back to a full rebuild; different confirmed
+mappings re-read the consumed bytes for their sums.
+
+Time sums are kept per raw time value in first-appearance order, so
+dates are parsed at query time exactly as a full load parses them.
+Integer measures match a full recompute exactly; float sums can differ
+in the last bits because rows are added in a different order.
+"""
+
+import copy
+import hashlib
+import io
+import os
+import pickle
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.cache_paths import cache_dir
+from src.utils.fingerprint import file_fingerprint
+from src.v4.analytics_engine import (
+    group_sum,
+    rank_from_sums,
+    ranking_from_sums,
+    trend_from_sums,
+    bucketed_trend,
+    run_compare_grouping_sets,
+    SummaryResult,
+    RankResult,
+    TrendResult,
+)
+from src.v4.date_parsing import parse_dates
+from src.v4.streaming_schema import (
+    DEFAULT_CHUNK_ROWS,
+    ColumnAccumulator,
+    accumulate_chunks,
+    schema_from_accumulators,
+)
+from src.v4.time_buckets import epoch_days
+
+
+STATE_VERSION = 4
+
+_HASH_BLOCK = 1 << 20
+
+# Blocks of the processed prefix hashed to detect a rewrite
+_CHECK_BLOCK = 64 << 10
+_CHECK_SAMPLES = 8
+
+# Status of the source file relative to the saved state
+NEW = "new"
+UNCHANGED = "unchanged"
+APPENDED = "appended"
+MODIFIED = "modified"
+
+
+# -----------------------------
+# State file helpers
+# -----------------------------
+
+def _state_path(source: str) -> str:
+    name = hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(cache_dir("incremental"), f"{name}.pkl")
+
+
+def _load_state(source: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_state_path(source), "rb") as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if state.get("version") != STATE_VERSION or state.get("source") != source:
+        return None
+    return state
+
+
+def _save_state(state: Dict[str, Any]) -> None:
+    path = _state_path(state["source"])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _hash_range(f, start: int, stop: int, hasher) -> None:
+    f.seek(start)
+    remaining = stop - start
+    while remaining > 0:
+        block = f.read(min(_HASH_BLOCK, remaining))
+        if not block:
+            break
+        hasher.update(block)
+        remaining -= len(block)
+
+
+def _check_blocks(f, offset: int) -> List[Tuple[int, int, str]]:
+    """
+    (start, stop, sha256) of the head, the tail and evenly spaced blocks
+    of bytes [0, offset); the whole range when it is small.
+    """
+    if offset <= _CHECK_BLOCK * _CHECK_SAMPLES:
+        starts = [0]
+        size = offset
+    else:
+        last = offset - _CHECK_BLOCK
+        starts = [last * i // (_CHECK_SAMPLES - 1) for i in range(_CHECK_SAMPLES)]
+        size = _CHECK_BLOCK
+
+    blocks = []
+    for start in starts:
+        hasher = hashlib.sha256()
+        _hash_range(f, start, start + size, hasher)
+        blocks.append((start, start + size, hasher.hexdigest()))
+    return blocks
+
+
+def _merge_sums(old: Optional[pd.DataFrame], new: pd.DataFrame, sort: bool = True) -> pd.DataFrame:
+    """
+    Add two per-key sum tables. sort=False keeps first-appearance order.
+    """
+    if old is None:
+        return new
+
+    levels = list(range(new.index.nlevels))
+    return pd.concat([old, new]).groupby(level=levels, dropna=False, sort=sort).sum()
+
+
+# -----------------------------
+# Mergeable aggregate state
+# -----------------------------
+
+class AggregateState:
+    """
+    Per-key sums of all confirmed measures, folded chunk by chunk.
+    """
+
+    def __init__(self, mappings: Dict[str, Any]):
+        self.mappings = mappings
+        self.measures: List[str] = list(mappings["measures"])
+        self.rows = 0
+        self.totals: Optional[pd.Series] = None
+        self.entity_sums: Optional[pd.DataFrame] = None
+        self.time_sums: Optional[pd.DataFrame] = None
+        self.dimension_sums: Optional[pd.DataFrame] = None
+
+    def fold(self, chunk: pd.DataFrame) -> None:
+        values = chunk[self.measures]
+        self.rows += len(chunk)
+
+        totals = values.sum()
+        self.totals = totals if self.totals is None else self.totals + totals
+
+        entity = self.mappings.get("entity")
+        if entity:
+            self.entity_sums = _merge_sums(
+                self.entity_sums, group_sum(values, chunk[entity], self.measures)
+            )
+
+        time = self.mappings.get("time")
+        if time:
+            # Raw values in first-appearance order (parsed at query time)
+            sums = values.groupby(chunk[time], dropna=False, sort=False).sum()
+            self.time_sums = _merge_sums(self.time_sums, sums, sort=False)
+
+        dimensions = self.mappings.get("dimensions") or []
+        if dimensions:
+            keys = [chunk[d] for d in dimensions]
+            self.dimension_sums = _merge_sums(
+                self.dimension_sums, group_sum(values, keys, self.measures)
+            )
+
+
+def mapping_signature(confirmed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parts of the confirmed mappings that determine the aggregate state.
+    """
+    return {
+        "measures": list(confirmed.get("measures", [])),
+        "entity": confirmed.get("entity"),
+        "time": confirmed.get("time"),
+        "dimensions": list(confirmed.get("dimensions", [])),
+    }
+
+
+# -----------------------------
+# Queries (same shapes as MeasureAggregates)
+# -----------------------------
+
+class IncrementalAggregates:
+    """
+    Analysis results served from an AggregateState.
+    """
+
+    def __init__(self, state: AggregateState):
+        self.state = state
+        self.measures = state.measures
+        self._parsed_time: Optional[pd.Series] = None
+
+        dims = state.mappings.get("dimensions") or []
+        self.dimensions = [f"dimension_{i}" for i in range(1, len(dims) + 1)]
+
+    def _check(self, measure: str) -> None:
+        if measure not in self.measures:
+            raise KeyError(f"Unknown measure '{measure}'. Expected one of {self.measures}")
+
+    def _time(self) -> pd.Series:
+        """
+        Parsed time for each raw time key, parsed once.
+        """
+        if self._parsed_time is None:
+            raw = self.state.time_sums.index.to_series(index=range(len(self.state.time_sums)))
+            self._parsed_time = parse_dates(raw.rename("time"))
+        return self._parsed_time
+
+    def canonical_facts(self) -> Dict[str, Any]:
+        """
+        Same facts extract_canonical_facts derives from a canonical frame.
+        """
+        has_time = self.state.time_sums is not None
+        return {
+            "has_measure": True,
+            "has_entity": self.state.entity_sums is not None,
+            "has_time": has_time,
+            "has_dimensions": bool(self.dimensions),
+            "time_cardinality": self._time().nunique() if has_time else 0,
+        }
+
+    def summary(self, measure: str) -> SummaryResult:
+        self._check(measure)
+
+        result = {"total_measure": float(self.state.totals[measure])}
+        if self.state.entity_sums is not None:
+            result["entity_count"] = int(self.state.entity_sums.index.notna().sum())
+
+        return result
+
+    def rank(self, measure: str, **slice_params) -> RankResult:
+        self._check(measure)
+        if self.state.entity_sums is None:
+            return {}
+
+        return rank_from_sums(self.state.entity_sums[measure], **slice_params)
+
+    def trend(self, measure: str, bucket: Optional[str] = None) -> TrendResult:
+        self._check(measure)
+        if self.state.time_sums is None:
+            return {}
+
+        sums = self.state.time_sums[measure].reset_index(drop=True)
+        time = self._time()
+
+        if bucket is not None:
+            day_sums = sums.groupby(epoch_days(time), dropna=False).sum()
+            return bucketed_trend(day_sums, bucket)
+
+        return {"trend": trend_from_sums(sums.groupby(time, dropna=False).sum())}
+
+    def compare(self, measure: str, depth: int = 1):
+        self._check(measure)
+        if self.state.dimension_sums is None:
+            return {}
+
+        sums = self.state.dimension_sums[measure]
+
+        if depth > 1:
+            frame = sums.rename("measure").reset_index()
+            frame.columns = self.dimensions + ["measure"]
+            return run_compare_grouping_sets(frame, depth=depth)
+
+        return {
+            "comparisons": {
+                dim: ranking_from_sums(sums.groupby(level=i, dropna=False).sum())
+                for i, dim in enumerate(self.dimensions)
+            }
+        }
+
+    def run(self, intent: str, measure: str, **params):
+        handlers = {
+            "summary": self.summary,
+            "rank": self.rank,
+            "trend": self.trend,
+            "compare": self.compare,
+        }
+
+        if intent not in handlers:
+            raise ValueError(f"Unsupported analysis '{intent}'")
+
+        return handlers[intent](measure, **params)
+
+
+# -----------------------------
+# Dataset driver
+# -----------------------------
+
+class _ByteRange(io.RawIOBase):
+    """
+    Read-only view of bytes [start, stop) of an open binary file.
+    """
+
+    def __init__(self, f, start: int, stop: int):
+        self._f = f
+        self._f.seek(start)
+        self._remaining = stop - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def _last_line_end(f, start: int, stop: int) -> int:
+    """
+    Offset just past the last newline in [start, stop), or start if none.
+    """
+    position = stop
+    while position > start:
+        block_start = max(start, position - _HASH_BLOCK)
+        f.seek(block_start)
+        block = f.read(position - block_start)
+        index = block.rfind(b"\n")
+        if index >= 0:
+            return block_start + index + 1
+        position = block_start
+    return start
+
+
+class IncrementalDataset:
+    """
+    A growing CSV file with saved schema and aggregate state.
+
+    refresh() reads only what was appended since the last run, folds it
+    into the schema accumulators (and into the measure sums of the
+    expected mappings) and returns the schema_report; aggregates(confirmed)
+    returns the sums for the confirmed mappings and saves the new state.
+
+    Each run consumes complete lines up to the file size seen at its
+    start; rows appended while it runs are left for the next run. A last
+    line without a newline is added to this run's results only, if the
+    file has not grown meanwhile.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        approximate: bool = False
+    ):
+        self.path = os.path.abspath(path)
+        self.chunk_rows = chunk_rows
+        self.approximate = approximate
+
+        self.status: Optional[str] = None
+        self.new_rows = 0
+        self.fingerprint: Optional[str] = None
+
+        self._state = _load_state(self.path)
+        self._next_state: Optional[Dict[str, Any]] = None
+        # Trailing line without a newline, counted in this run only
+        self._tail: Optional[pd.DataFrame] = None
+
+    # -----------------------------
+    # Change detection
+    # -----------------------------
+
+    def _check_source(self, size: int, mtime_ns: int, header: bytes) -> str:
+        state = self._state
+        if state is None:
+            return NEW
+
+        if state["header"] != header or size < state["offset"]:
+            return MODIFIED
+
+        # An append always changes the size
+        if size == state["size"] and mtime_ns != state["mtime_ns"]:
+            return MODIFIED
+
+        with open(self.path, "rb") as f:
+            for start, stop, digest in state["blocks"]:
+                hasher = hashlib.sha256()
+                _hash_range(f, start, stop, hasher)
+                if hasher.hexdigest() != digest:
+                    return MODIFIED
+
+        return UNCHANGED if size == state["size"] else APPENDED
+
+    # -----------------------------
+    # Reading
+    # -----------------------------
+
+    def _read_range(self, start: int, stop: int, columns: List[str]):
+        """
+        Chunks of the complete lines in bytes [start, stop).
+        """
+        if stop <= start:
+            return
+
+        with open(self.path, "rb") as f:
+            reader = io.BufferedReader(_ByteRange(f, start, stop))
+            yield from pd.read_csv(reader, header=None, names=columns, chunksize=self.chunk_rows)
+
+    def _prepared_aggregates(
+        self,
+        columns: List[str],
+        expected: Optional[Dict[str, Any]]
+    ) -> Optional[AggregateState]:
+        """
+        Aggregate state to fold new rows into while they stream, or None.
+        Saved sums are extended on an append; on a rebuild, sums for the
+        expected mappings (or the previous ones) are started from scratch.
+        """
+        saved = self._state.get("aggregates") if self._state else None
+
+        if self.status in (UNCHANGED, APPENDED):
+            if saved is not None and (expected is None or saved.mappings == expected):
+                return saved
+            return None
+
+        signature = expected or (saved.mappings if saved is not None else None)
+        if signature is None:
+            return None
+
+        mapped = signature["measures"] + signature["dimensions"] + [
+            signature[key] for key in ("entity", "time") if signature[key]
+        ]
+        if not set(mapped) <= set(columns):
+            return None
+
+        return AggregateState(signature)
+
+    def refresh(self, mappings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Fold new rows into the schema accumulators and return the schema_report.
+
+        mappings are the mappings expected to be confirmed (e.g. from a
+        matched profile); their sums are folded in the same pass. By
+        default the mappings of the saved state are assumed.
+        """
+        stat = os.stat(self.path)
+        size = stat.st_size
+        with open(self.path, "rb") as f:
+            header = f.readline(size)
+
+        self.status = self._check_source(size, stat.st_mtime_ns, header)
+        rebuilt = self.status in (NEW, MODIFIED)
+
+        # Digest chained over the consumed ranges: extended, never re-read
+        prefix_hasher = hashlib.sha256()
+        if rebuilt:
+            columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns) if header.strip() else []
+            accumulators: Dict[str, ColumnAccumulator] = {}
+            start = len(header)
+            prefix_hasher.update(header)
+        else:
+            columns = self._state["columns"]
+            accumulators = self._state["accumulators"]
+            start = self._state["offset"]
+            prefix_hasher.update(bytes.fromhex(self._state["prefix_digest"]))
+
+        # Only complete lines within the size seen above are consumed
+        with open(self.path, "rb") as f:
+            offset = _last_line_end(f, start, size)
+            _hash_range(f, start, offset, prefix_hasher)
+            blocks = _check_blocks(f, offset)
+
+        expected = mapping_signature(mappings) if mappings is not None else None
+        aggregates = self._prepared_aggregates(columns, expected)
+
+        self.new_rows = 0
+        for chunk in self._read_range(start, offset, columns):
+            self.new_rows += len(chunk)
+            accumulate_chunks([chunk], self.approximate, accumulators)
+            if aggregates is not None:
+                aggregates.fold(chunk)
+
+        if not accumulators:
+            for column in columns:
+                accumulators[column] = ColumnAccumulator(self.approximate)
+                accumulators[column].text_seen = True
+
+        if rebuilt or offset > start:
+            prefix_digest = prefix_hasher.hexdigest()
+        else:
+            prefix_digest = self._state["prefix_digest"]
+
+        # Identifies exactly the bytes the results are computed from
+        results_hasher = hashlib.sha256(prefix_digest.encode())
+        end = offset
+        report_accumulators = accumulators
+
+        self._tail = None
+        if offset < size and os.path.getsize(self.path) == size:
+            # The file stopped growing without a final newline: count the
+            # last line now, on copies, so the saved state excludes it
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                tail = f.read(size - offset)
+            self._tail = pd.read_csv(io.BytesIO(tail), header=None, names=columns)
+            results_hasher.update(tail)
+            end = size
+
+            report_accumulators = copy.deepcopy(accumulators)
+            accumulate_chunks([self._tail], self.approximate, report_accumulators)
+
+        tail_rows = len(self._tail) if self._tail is not None else 0
+        if not rebuilt:
+            # The pending line of the last run was already counted
+            self.new_rows -= self._state["tail_rows"]
+        self.new_rows += tail_rows
+
+        self.fingerprint = hashlib.sha256(
+            f"{end}:{results_hasher.hexdigest()}".encode()
+        ).hexdigest()[:32]
+
+        self._next_state = {
+            "version": STATE_VERSION,
+            "source": self.path,
+            "header": header,
+            "columns": columns,
+            "data_start": len(header) if rebuilt else self._state["data_start"],
+            "offset": offset,
+            "size": end,
+            "mtime_ns": stat.st_mtime_ns,
+            "tail_rows": tail_rows,
+            "blocks": blocks,
+            "prefix_digest": prefix_digest,
+            "accumulators": accumulators,
+            "aggregates": aggregates,
+        }
+
+        return schema_from_accumulators(report_accumulators)
+
+    # -----------------------------
+    # Aggregates
+    # -----------------------------
+
+    def aggregates(self, confirmed: Dict[str, Any]) -> IncrementalAggregates:
+        """
+        Measure sums for the confirmed mappings over the rows consumed by
+        refresh(); saves the state and returns the query object. When the
+        sums folded during refresh() are for other mappings, the consumed
+        bytes are read again. A trailing line without a newline is folded
+        into the returned sums only, never into the saved ones.
+        """
+        signature = mapping_signature(confirmed)
+        state: Optional[AggregateState] = self._next_state["aggregates"]
+
+        if state is None or state.mappings != signature:
+            state = AggregateState(signature)
+            for chunk in self._read_range(
+                self._next_state["data_start"],
+                self._next_state["offset"],
+                self._next_state["columns"],
+            ):
+                state.fold(chunk)
+
+        self._next_state["aggregates"] = state
+        _save_state(self._next_state)
+
+        if self._tail is not None:
+            state = copy.deepcopy(state)
+            state.fold(self._tail)
+
+        return IncrementalAggregates(state)
+
+
+def clear_incremental_state(path: str) -> None:
+    """
+    Forget the saved state of a file (the next run rebuilds).
+    """
+    try:
+        os.remove(_state_path(os.path.abspath(path)))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,333 @@
+# src/v4/mapping_profiles.py
+"""
+Confirmed mappings remembered per file layout.
+
+A layout is the ordered list of (column name, coarse type) read from the
+first rows of a CSV; its SHA-256 is the schema fingerprint. A profile
+stores the confirmed mappings and active measure for a fingerprint,
+plus coarse stats (null rate, distinct ratio, order of magnitude) of the
+mapped columns.
+
+When a new file has a stored fingerprint, only those stats are
+recomputed on the sample. If none drifted beyond the tolerances the
+profile is reused and schema extraction, advisor inference and
+confirmation are skipped. When only part of the layout matches, the
+closest profile is reported with the added, removed and retyped columns.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.cache_paths import cache_dir
+
+
+SAMPLE_ROWS = 1_000
+
+# Drift tolerances for the coarse stats of mapped columns
+NULL_RATE_TOLERANCE = 0.2
+DISTINCT_RATIO_TOLERANCE = 0.5
+MAGNITUDE_TOLERANCE = 2
+
+# match_profile statuses
+MATCH = "match"
+DRIFT = "drift"
+PARTIAL = "partial"
+NONE = "none"
+
+
+# -----------------------------
+# Layout + fingerprint
+# -----------------------------
+
+def read_sample(path: str, rows: int = SAMPLE_ROWS) -> pd.DataFrame:
+    return pd.read_csv(path, nrows=rows)
+
+
+def column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    return "text"
+
+
+def schema_layout(sample: pd.DataFrame) -> List[Tuple[str, str]]:
+    """
+    Ordered (column, coarse type) pairs of a sample.
+    """
+    return [(str(column), column_kind(sample[column])) for column in sample.columns]
+
+
+def schema_fingerprint(layout: List[Tuple[str, str]]) -> str:
+    payload = json.dumps([list(pair) for pair in layout])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def mapped_columns(mappings: Dict[str, Any]) -> List[str]:
+    columns = list(mappings.get("measures", []))
+    columns += [mappings[k] for k in ("entity", "time") if mappings.get(k)]
+    columns += list(mappings.get("dimensions", []))
+    return list(dict.fromkeys(columns))
+
+
+# -----------------------------
+# Coarse stats + drift
+# -----------------------------
+
+def coarse_stats(sample: pd.DataFrame, columns: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Cheap per-column stats used to catch drift in a known layout.
+    """
+    stats = {}
+
+    for column in columns:
+        series = sample[column]
+        present = series.dropna()
+        entry = {
+            "null_rate": round(1 - len(present) / len(series), 4) if len(series) else 0.0,
+            "distinct_ratio": round(present.nunique() / len(present), 4) if len(present) else 0.0,
+        }
+
+        if column_kind(series) == "numeric" and len(present):
+            peak = float(present.abs().max())
+            entry["magnitude"] = math.floor(math.log10(peak)) if peak > 0 else 0
+
+        stats[column] = entry
+
+    return stats
+
+
+def stats_drift(
+    stored: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]]
+) -> List[Dict[str, Any]]:
+    """
+    Stats that moved beyond their tolerance, one entry per (column, stat).
+    """
+    tolerances = {
+        "null_rate": NULL_RATE_TOLERANCE,
+        "distinct_ratio": DISTINCT_RATIO_TOLERANCE,
+        "magnitude": MAGNITUDE_TOLERANCE,
+    }
+    drifted = []
+
+    for column, before in stored.items():
+        after = current.get(column, {})
+        for stat, tolerance in tolerances.items():
+            if stat in before and stat in after and abs(after[stat] - before[stat]) >= tolerance:
+                drifted.append({
+                    "column": column,
+                    "stat": stat,
+                    "stored": before[stat],
+                    "current": after[stat],
+                })
+
+    return drifted
+
+
+def layout_drift(
+    stored: List[Tuple[str, str]],
+    current: List[Tuple[str, str]]
+) -> Dict[str, Any]:
+    """
+    Columns added, removed or retyped between two layouts.
+    """
+    before, after = dict(stored), dict(current)
+
+    return {
+        "added": [c for c in after if c not in before],
+        "removed": [c for c in before if c not in after],
+        "retyped": {
+            c: [before[c], after[c]]
+            for c in after if c in before and before[c] != after[c]
+        },
+    }
+
+
+# -----------------------------
+# Store
+# -----------------------------
+
+class ProfileStore:
+    """
+    SQLite store of mapping profiles, one per schema fingerprint.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_dir("profiles"), "profiles.sqlite")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " fingerprint TEXT PRIMARY KEY,"
+            " layout TEXT NOT NULL,"
+            " mappings TEXT NOT NULL,"
+            " active_measure TEXT,"
+            " stats TEXT NOT NULL,"
+            " source TEXT,"
+            " updated REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _decode(row) -> Dict[str, Any]:
+        fingerprint, layout, mappings, active_measure, stats, source, updated = row
+        return {
+            "fingerprint": fingerprint,
+            "layout": [tuple(pair) for pair in json.loads(layout)],
+            "mappings": json.loads(mappings),
+            "active_measure": active_measure,
+            "stats": json.loads(stats),
+            "source": source,
+            "updated": updated,
+        }
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM profiles WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return None if row is None else self._decode(row)
+
+    def save(
+        self,
+        layout: List[Tuple[str, str]],
+        mappings: Dict[str, Any],
+        active_measure: Optional[str],
+        stats: Dict[str, Dict[str, float]],
+        source: Optional[str] = None
+    ) -> str:
+        """
+        Store (or replace) the profile of a layout; returns its fingerprint.
+        """
+        fingerprint = schema_fingerprint(layout)
+        mappings = {k: v for k, v in mappings.items() if k != "active_measure"}
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles"
+                " (fingerprint, layout, mappings, active_measure, stats, source, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    fingerprint,
+                    json.dumps([list(pair) for pair in layout]),
+                    json.dumps(mappings),
+                    active_measure,
+                    json.dumps(stats),
+                    source,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+        return fingerprint
+
+    def closest(self, layout: List[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        """
+        Stored profile sharing the most column names with layout (None if none share any).
+        """
+        names = {name for name, _ in layout}
+        best, best_overlap = None, 0
+
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM profiles").fetchall()
+
+        for row in rows:
+            profile = self._decode(row)
+            overlap = len(names & {name for name, _ in profile["layout"]})
+            if overlap > best_overlap:
+                best, best_overlap = profile, overlap
+
+        return best
+
+    def delete(self, fingerprint: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM profiles WHERE fingerprint = ?", (fingerprint,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# -----------------------------
+# Matching
+# -----------------------------
+
+def match_profile(store: ProfileStore, sample: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Look up the profile for a sample's layout.
+
+    status:
+    - "match":   same layout, no stat drift; profile can be reused
+    - "drift":   same layout, mapped-column stats drifted (stats_drift)
+    - "partial": no profile for this layout; closest one and layout_drift
+    - "none":    nothing comparable stored
+    """
+    layout = schema_layout(sample)
+    fingerprint = schema_fingerprint(layout)
+    result = {"fingerprint": fingerprint, "layout": layout, "profile": None}
+
+    profile = store.get(fingerprint)
+    if profile is not None:
+        current = coarse_stats(sample, list(profile["stats"]))
+        drifted = stats_drift(profile["stats"], current)
+        result.update(
+            status=DRIFT if drifted else MATCH,
+            profile=profile,
+            stats_drift=drifted,
+        )
+        return result
+
+    closest = store.closest(layout)
+    if closest is None:
+        result["status"] = NONE
+        return result
+
+    drift = layout_drift(closest["layout"], layout)
+    drift["mapped_missing"] = [
+        c for c in mapped_columns(closest["mappings"]) if c in drift["removed"]
+    ]
+    result.update(status=PARTIAL, profile=closest, layout_drift=drift)
+    return result
+
+
+def format_match(match: Dict[str, Any]) -> List[str]:
+    """
+    Human-readable lines describing a match_profile result.
+    """
+    status = match["status"]
+    if status == NONE:
+        return ["No stored mapping profile for this layout"]
+
+    if status == MATCH:
+        return [f"Reusing mapping profile {match['fingerprint'][:12]}"]
+
+    if status == DRIFT:
+        lines = [f"Mapping profile {match['fingerprint'][:12]} found, but stats drifted:"]
+        lines += [
+            f"  {d['column']}: {d['stat']} {d['stored']} -> {d['current']}"
+            for d in match["stats_drift"]
+        ]
+        return lines
+
+    drift = match["layout_drift"]
+    lines = [f"Layout partially matches profile {match['profile']['fingerprint'][:12]}:"]
+    if drift["added"]:
+        lines.append(f"  added columns: {drift['added']}")
+    if drift["removed"]:
+        lines.append(f"  removed columns: {drift['removed']}")
+    for column, (before, after) in drift["retyped"].items():
+        lines.append(f"  {column}: {before} -> {after}")
+    if drift["mapped_missing"]:
+        lines.append(f"  mapped columns missing: {drift['mapped_missing']}")
+    return lines
@@ -0,0 +1,176 @@
+# src/v4/measure_aggregates.py
+"""
+Aggregates for every confirmed measure, computed once per grouping key.
+
+The single-measure analytics (run_rank, run_trend, run_compare) group
+the canonical frame again for every request. MeasureAggregates groups
+all confirmed measure columns together in one pass per key (entity,
+time, each dimension) the first time that key is needed and keeps the
+result, so switching the active measure is a dictionary lookup.
+
+Results are shaped by the same helpers as the single-measure functions
+and match them exactly.
+"""
+
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from src.v4.time_buckets import epoch_days, rollup_to_bucket, with_timestamps
+from src.v4.analytics_engine import (
+    group_sum,
+    rank_from_sums,
+    run_compare_grouping_sets,
+    ranking_from_sums,
+    trend_from_sums,
+    SummaryResult,
+    RankResult,
+    TrendResult,
+    CompareResult,
+    GroupingSetsResult,
+)
+
+
+class MeasureAggregates:
+    """
+    Lazily computed per-key sums for all measures of a canonical frame.
+    """
+
+    def __init__(self, canonical_df, measure_df: pd.DataFrame):
+        """
+        canonical_df: canonical frame or CanonicalView (entity / time / dimension_N keys)
+        measure_df:   source measure columns, aligned with canonical_df
+
+        Key columns are only read when first grouped on.
+        """
+        self.measures: List[str] = list(measure_df.columns)
+        self._measure_df = measure_df
+        self._canonical = canonical_df
+        self._keys = [
+            c for c in canonical_df.columns
+            if c in ("entity", "time") or c.startswith("dimension_")
+        ]
+        self.dimensions = [k for k in self._keys if k.startswith("dimension_")]
+
+        self._totals: Dict[str, float] = {}
+        self._entity_count = None
+        self._sums: Dict[str, pd.DataFrame] = {}
+        self._time_rollups: Dict[str, pd.DataFrame] = {}
+
+    # -----------------------------
+    # Cached passes
+    # -----------------------------
+
+    def _check(self, measure: str) -> None:
+        if measure not in self.measures:
+            raise KeyError(f"Unknown measure '{measure}'. Expected one of {self.measures}")
+
+    def _grouped(self, key: str) -> pd.DataFrame:
+        """
+        Sums of every measure per value of key (one groupby, cached).
+        """
+        if key not in self._sums:
+            self._sums[key] = group_sum(self._measure_df, self._canonical[key], self.measures)
+        return self._sums[key]
+
+    def _measure_sums(self, key: str, measure: str) -> pd.Series:
+        return self._grouped(key)[measure]
+
+    def _time_rollup(self, bucket: str) -> pd.DataFrame:
+        """
+        Sums of every measure per time bucket (epoch-day index).
+
+        Only the day rollup reads the rows; coarser buckets are derived
+        from it, and every bucket is cached.
+        """
+        if "day" not in self._time_rollups:
+            days = epoch_days(self._canonical["time"])
+            self._time_rollups["day"] = group_sum(self._measure_df, days, self.measures)
+
+        if bucket not in self._time_rollups:
+            self._time_rollups[bucket] = rollup_to_bucket(self._time_rollups["day"], bucket)
+
+        return self._time_rollups[bucket]
+
+    def precompute(self) -> None:
+        """
+        Run every grouping pass up front (e.g. before an interactive session).
+        """
+        for key in self._keys:
+            self._grouped(key)
+
+    # -----------------------------
+    # Lookups (same shapes as run_*)
+    # -----------------------------
+
+    def summary(self, measure: str) -> SummaryResult:
+        self._check(measure)
+
+        if measure not in self._totals:
+            self._totals[measure] = float(self._measure_df[measure].sum())
+
+        result = {"total_measure": self._totals[measure]}
+        if "entity" in self._keys:
+            if self._entity_count is None:
+                self._entity_count = self._canonical["entity"].nunique()
+            result["entity_count"] = self._entity_count
+
+        return result
+
+    def rank(self, measure: str, **slice_params) -> RankResult:
+        """
+        slice_params: top_k, bottom_k, offset, limit (as for run_rank).
+        """
+        self._check(measure)
+        if "entity" not in self._keys:
+            return {}
+
+        return rank_from_sums(self._measure_sums("entity", measure), **slice_params)
+
+    def trend(self, measure: str, bucket: Optional[str] = None) -> TrendResult:
+        self._check(measure)
+        if "time" not in self._keys:
+            return {}
+
+        if bucket is not None:
+            sums = with_timestamps(self._time_rollup(bucket)[measure])
+            return {"trend": trend_from_sums(sums), "bucket": bucket}
+
+        return {"trend": trend_from_sums(self._measure_sums("time", measure))}
+
+    def compare(self, measure: str, depth: int = 1) -> Union[CompareResult, GroupingSetsResult]:
+        """
+        depth 1 compares per dimension; depth > 1 adds combinations of up
+        to depth dimensions (see run_compare_grouping_sets).
+        """
+        self._check(measure)
+        if not self.dimensions:
+            return {}
+
+        if depth > 1:
+            frame = self._canonical[self.dimensions].assign(measure=self._measure_df[measure])
+            return run_compare_grouping_sets(frame, depth=depth)
+
+        return {
+            "comparisons": {
+                dim: ranking_from_sums(self._measure_sums(dim, measure))
+                for dim in self.dimensions
+            }
+        }
+
+    def run(self, intent: str, measure: str, **params):
+        """
+        Dispatch an analysis intent ("summary", "rank", "trend", "compare").
+        params are passed to the intent (e.g. top_k for rank).
+        """
+        handlers = {
+            "summary": self.summary,
+            "rank": self.rank,
+            "trend": self.trend,
+            "compare": self.compare,
+        }
+
+        if intent not in handlers:
+            raise ValueError(f"Unsupported analysis '{intent}'")
+
+        return handlers[intent](measure, **params)
@@ -0,0 +1,122 @@
+# src/v4/onnx_encoder.py
+"""
+Torch-free sentence encoder on ONNX Runtime.
+
+Reproduces the all-MiniLM-L6-v2 sentence-transformers pipeline
+(tokenize -> transformer -> mean pooling -> optional L2 normalize)
+using the ONNX export published in the model repository. With
+quantize=True the export is quantized to int8 weights with
+onnxruntime.quantization.quantize_dynamic on first use, and the
+quantized file is kept under the cache directory.
+
+Requires onnxruntime, tokenizers and huggingface_hub (plus onnx for
+quantization); all are imported only when an encoder is created.
+"""
+
+import hashlib
+import os
+from typing import List, Union
+
+import numpy as np
+
+from src.utils.cache_paths import cache_dir
+
+
+DEFAULT_MAX_LENGTH = 256
+DEFAULT_BATCH_SIZE = 64
+
+
+def quantized_model(model_path: str) -> str:
+    """
+    Path of a dynamically int8-quantized copy of model_path, created once.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    stat = os.stat(model_path)
+    source = f"{model_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    target = os.path.join(cache_dir("onnx"), f"model-int8-{key}.onnx")
+
+    if not os.path.exists(target):
+        tmp = f"{target}.{os.getpid()}.tmp"
+        quantize_dynamic(model_path, tmp, weight_type=QuantType.QInt8)
+        os.replace(tmp, target)
+
+    return target
+
+
+class OnnxEncoder:
+    """
+    Minimal stand-in for SentenceTransformer.encode on ONNX Runtime.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        file_name: str = "onnx/model.onnx",
+        max_length: int = DEFAULT_MAX_LENGTH,
+        quantize: bool = False
+    ):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        model_path = hf_hub_download(model_name, file_name)
+        if quantize:
+            model_path = quantized_model(model_path)
+        tokenizer_path = hf_hub_download(model_name, "tokenizer.json")
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        self.session = ort.InferenceSession(
+            model_path,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **_
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        batches = [
+            self._encode_batch(texts[start:start + batch_size], normalize_embeddings)
+            for start in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.vstack(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str], normalize: bool) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real (non-padding) tokens
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+
+        return pooled.astype(np.float32)
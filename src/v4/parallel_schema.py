@@ -0,0 +1,163 @@
+# src/v4/parallel_schema.py
+"""
+Process-pool schema extraction for large datasets.
+
+Columns are profiled in worker processes and the per-column entries are
+merged back into the same schema_report extract_schema produces.
+The DataFrame itself is never pickled: numeric columns loaded through
+the dataset cache are memory-mapped by the workers from the cached .npy
+files, other numeric buffers are written once to a RAM-backed scratch
+directory (/dev/shm where available) and mapped from there, and text
+columns (which have no flat buffer) are shipped one column at a time.
+When /dev/shm lacks the room the system temp directory is used, and
+when neither has it the frame is profiled serially.
+
+Small frames are profiled serially; pool start-up would dominate.
+Dates parsed inside workers do not populate the parent's memoized date
+cache, so the canonical build parses the confirmed time column once more.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.dataset_cache import mapped_column_file
+from src.v3.schema_extractor import extract_schema, profile_column
+
+
+# -----------------------------
+# Configuration
+# -----------------------------
+
+# Below this many cells (rows x columns) the serial path is used
+PARALLEL_MIN_CELLS = 2_000_000
+
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# Free space kept in reserve on the scratch filesystem
+SCRATCH_HEADROOM_BYTES = 64 * 2 ** 20
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+def _profile_mapped(
+    column: str,
+    path: str,
+    approximate: bool
+) -> Tuple[str, Dict[str, Any]]:
+    values = np.load(path, mmap_mode="r").view(np.ndarray)
+    series = pd.Series(values, name=column, copy=False)
+    return column, profile_column(series, approximate=approximate)
+
+
+def _profile_values(
+    column: str,
+    series: pd.Series,
+    approximate: bool
+) -> Tuple[str, Dict[str, Any]]:
+    return column, profile_column(series, approximate=approximate)
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+
+def _shareable(series: pd.Series) -> bool:
+    return (
+        isinstance(series.dtype, np.dtype)
+        and series.dtype.kind in "biufmM"
+        and len(series) > 0
+    )
+
+
+def _scratch_dir(needed: int) -> Optional[str]:
+    """
+    First of /dev/shm and the temp directory with room for needed bytes.
+    """
+    candidates = [SHARED_MEMORY_DIR, tempfile.gettempdir()]
+
+    for candidate in candidates:
+        if not os.path.isdir(candidate):
+            continue
+        try:
+            free = shutil.disk_usage(candidate).free
+        except OSError:
+            continue
+        if free >= needed + SCRATCH_HEADROOM_BYTES:
+            return candidate
+
+    return None
+
+
+def extract_schema_parallel(
+    df: pd.DataFrame,
+    workers: Optional[int] = None,
+    min_cells: int = PARALLEL_MIN_CELLS,
+    approximate: bool = False
+) -> Dict[str, Any]:
+    """
+    Extract the schema_report with column profiling spread over processes.
+
+    Falls back to extract_schema when workers <= 1 or the frame is small.
+    """
+    workers = workers or default_workers()
+
+    if workers <= 1 or df.shape[0] * df.shape[1] < min_cells:
+        return extract_schema(df, approximate)
+
+    # Columns already mapped from the dataset cache need no scratch copy
+    cached = {}
+    for column in df.columns:
+        if _shareable(df[column]):
+            path = mapped_column_file(df[column])
+            if path is not None:
+                cached[column] = path
+
+    needed = sum(
+        df[column].nbytes for column in df.columns
+        if _shareable(df[column]) and column not in cached
+    )
+    scratch_root = _scratch_dir(needed)
+    if scratch_root is None:
+        # No room to share buffers; pickling every column costs as much
+        return extract_schema(df, approximate)
+
+    scratch = tempfile.mkdtemp(prefix="copilot-schema-", dir=scratch_root)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = []
+
+            for idx, column in enumerate(df.columns):
+                series = df[column]
+
+                if column in cached:
+                    futures.append(pool.submit(_profile_mapped, column, cached[column], approximate))
+                elif _shareable(series):
+                    path = os.path.join(scratch, f"c{idx}.npy")
+                    try:
+                        np.save(path, series.to_numpy())
+                    except OSError:
+                        # Scratch filled up meanwhile: ship this column instead
+                        futures.append(pool.submit(_profile_values, column, series, approximate))
+                        continue
+                    futures.append(pool.submit(_profile_mapped, column, path, approximate))
+                else:
+                    futures.append(pool.submit(_profile_values, column, series, approximate))
+
+            entries = dict(f.result() for f in futures)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return {column: entries[column] for column in df.columns}
@@ -0,0 +1,266 @@
+# src/v4/result_cache.py
+"""
+Two-tier cache of analytics results.
+
+Results are keyed by (dataset fingerprint, confirmed mappings, active
+measure, intent, parameters). A small in-memory LRU serves repeats
+within a session; a SQLite store under the cache directory serves them
+across processes. Entries remember their source file, and entries whose
+fingerprint no longer matches the file are dropped when it is opened
+again.
+
+Payloads are pickled in both tiers, so every hit returns a fresh copy
+that callers may mutate. The store belongs in the per-user cache
+directory and is never shared.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.cache_paths import cache_dir
+
+
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Part of every key; bump when the shape of an analysis result changes
+RESULT_FORMAT_VERSION = 2
+
+
+def result_key(
+    fingerprint: str,
+    mappings: Dict[str, Any],
+    measure: str,
+    intent: str,
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Stable cache key for one analysis request.
+    The active measure is keyed separately, so it is ignored in mappings.
+    """
+    payload = json.dumps(
+        [
+            RESULT_FORMAT_VERSION,
+            fingerprint,
+            {k: v for k, v in mappings.items() if k != "active_measure"},
+            measure,
+            intent,
+            params or {},
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    In-memory LRU in front of a size-bounded SQLite result store.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.path = path or os.path.join(cache_dir("results"), "results.sqlite")
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        # key -> (source, fingerprint, pickled result)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " source TEXT,"
+            " fingerprint TEXT NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_source ON results (source)"
+        )
+        self._conn.commit()
+
+    # -----------------------------
+    # Lookup / store
+    # -----------------------------
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Cached result for key, or None.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return pickle.loads(self._memory[key][2])
+
+            row = self._conn.execute(
+                "SELECT source, fingerprint, payload FROM results WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            source, fingerprint, blob = row
+            try:
+                result = pickle.loads(blob)
+            except Exception:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+
+            self._remember(key, (source, fingerprint, blob))
+            self.disk_hits += 1
+            return result
+
+    def put(
+        self,
+        key: str,
+        result: Any,
+        fingerprint: str,
+        source: Optional[str] = None
+    ) -> None:
+        """
+        Store a result in both tiers, then evict from disk if over budget.
+        """
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._remember(key, (source, fingerprint, blob))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, source, fingerprint, payload, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, source, fingerprint, blob, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def get_or_compute(
+        self,
+        fingerprint: Optional[str],
+        mappings: Dict[str, Any],
+        measure: str,
+        intent: str,
+        compute: Callable[[], Any],
+        params: Optional[Dict[str, Any]] = None,
+        source: Optional[str] = None
+    ) -> Any:
+        """
+        Return the cached result, computing and storing it on a miss.
+        Without a fingerprint nothing is cached.
+        """
+        if not fingerprint:
+            return compute()
+
+        key = result_key(fingerprint, mappings, measure, intent, params)
+        result = self.get(key)
+
+        if result is None:
+            result = compute()
+            self.put(key, result, fingerprint, source)
+
+        return result
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.max_entries
+
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM results WHERE rowid IN ("
+                " SELECT rowid FROM results ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.disk_evictions += excess
+
+    # -----------------------------
+    # Invalidation
+    # -----------------------------
+
+    def invalidate_source(self, source: str, fingerprint: str) -> int:
+        """
+        Drop results computed from an older version of source.
+        Returns the number of disk entries removed.
+        """
+        with self._lock:
+            stale = [
+                key for key, (src, fp, _) in self._memory.items()
+                if src == source and fp != fingerprint
+            ]
+            for key in stale:
+                del self._memory[key]
+
+            removed = self._conn.execute(
+                "DELETE FROM results WHERE source = ? AND fingerprint != ?",
+                (source, fingerprint),
+            ).rowcount
+            self._conn.commit()
+
+        return removed
+
+    # -----------------------------
+    # Introspection
+    # -----------------------------
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+
+        return {
+            "memory_entries": len(self._memory),
+            "disk_entries": entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,7 @@
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+
+from src.v4.date_parsing import parse_dates
 
 CANONICAL_COLUMNS = {
     "measure",
@@ -13,29 +15,32 @@ class SchemaValidationError(Exception):
     pass
 
 
-def build_canonical_dataframe(
-    df: pd.DataFrame,
-    confirmed_mappings: Dict,
-    semantic_context
-) -> pd.DataFrame:
+def dictionary_encode(series: pd.Series) -> pd.Series:
     """
-    Build canonical dataframe using a runtime-selected active measure.
+    Store a grouping key as a categorical: integer codes plus one shared
+    dictionary of labels. Groupbys then hash small ints instead of strings.
 
-    Canonical columns:
-    - measure        (required, selected at runtime)
-    - entity         (optional)
-    - time           (optional)
-    - dimension_1..N (optional)
+    Columns whose values cannot be ordered are kept as-is.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
 
-    Parameters:
-        df: original dataframe
-        confirmed_mappings: output of semantic mapper (measures, entity, time, dimensions)
-        semantic_context: frozen semantic context (not used yet in Task 1)
+    try:
+        return series.astype("category")
+    except TypeError:
+        return series
 
-    Returns:
-        Canonical pandas DataFrame
+
+# -----------------------
+# Shared mapping + validation
+# -----------------------
+
+def canonical_sources(confirmed_mappings: Dict) -> Dict[str, str]:
     """
+    Map canonical column names to source columns, in canonical order.
 
+    Raises SchemaValidationError when no valid active measure is confirmed.
+    """
     measures: List[str] = confirmed_mappings.get("measures", [])
 
     if not measures:
@@ -52,40 +57,28 @@ def build_canonical_dataframe(
             f"Active measure '{active_measure}' not in confirmed measures: {measures}"
         )
 
-    canonical_df = pd.DataFrame()
+    sources = {"measure": active_measure}
 
-    # -----------------------
-    # Measure (required)
-    # -----------------------
-    canonical_df["measure"] = df[active_measure]
-
-    # -----------------------
-    # Entity (optional)
-    # -----------------------
     if confirmed_mappings.get("entity"):
-        canonical_df["entity"] = df[confirmed_mappings["entity"]]
+        sources["entity"] = confirmed_mappings["entity"]
 
-    # -----------------------
-    # Time (optional)
-    # -----------------------
     if confirmed_mappings.get("time"):
-        canonical_df["time"] = pd.to_datetime(
-            df[confirmed_mappings["time"]],
-            errors="coerce"
-        )
+        sources["time"] = confirmed_mappings["time"]
 
-    # -----------------------
-    # Dimensions (0..N)
-    # -----------------------
     dimensions = confirmed_mappings.get("dimensions", [])
 
     for idx, dim in enumerate(dimensions, start=1):
-        canonical_df[f"dimension_{idx}"] = df[dim]
-    # -----------------------
-    # Canonical schema enforcement
-    # -----------------------
-    unexpected_cols = set(canonical_df.columns) - {
-        col for col in canonical_df.columns
+        sources[f"dimension_{idx}"] = dim
+
+    return sources
+
+
+def validate_canonical_columns(columns) -> None:
+    """
+    Canonical schema enforcement: only measure / entity / time / dimension_N.
+    """
+    unexpected_cols = set(columns) - {
+        col for col in columns
         if col.startswith("dimension_") or col in CANONICAL_COLUMNS
     }
 
@@ -93,22 +86,194 @@ def build_canonical_dataframe(
         raise SchemaValidationError(
             f"Non-canonical columns detected: {unexpected_cols}"
         )
-    # -----------------------
-    # Canonical schema enforcement
-    # -----------------------
+
     allowed_columns = set()
 
-    for col in canonical_df.columns:
+    for col in columns:
         if col.startswith("dimension_"):
             allowed_columns.add(col)
         elif col in CANONICAL_BASE_COLUMNS:
             allowed_columns.add(col)
 
-    unexpected = set(canonical_df.columns) - allowed_columns
+    unexpected = set(columns) - allowed_columns
 
     if unexpected:
         raise SchemaValidationError(
             f"Non-canonical columns detected in canonical dataframe: {unexpected}"
         )
 
-    return canonical_df
+
+def derive_canonical_column(df: pd.DataFrame, name: str, source: str) -> pd.Series:
+    """
+    Build canonical column `name` from its source column: measure as-is,
+    parsed time, dictionary-encoded entity and dimensions.
+    """
+    if name == "time":
+        # Reuses the column parsed during schema extraction when cached
+        return parse_dates(df[source], df.attrs.get("fingerprint"))
+
+    if name == "measure":
+        return df[source]
+
+    return dictionary_encode(df[source])
+
+
+# -----------------------
+# Lazy canonical view
+# -----------------------
+
+class CanonicalView:
+    """
+    Canonical columns over a source frame, without copying it.
+
+    The measure and raw keys reference the source frame's buffers.
+    Derived columns (parsed time, encoded entity / dimensions) are built
+    on first access and cached. Validation runs at construction, exactly
+    as for build_canonical_dataframe.
+    """
+
+    def __init__(self, df: pd.DataFrame, confirmed_mappings: Dict, semantic_context=None):
+        self._df = df
+        self._measures: List[str] = list(confirmed_mappings.get("measures", []))
+        self._sources = canonical_sources(confirmed_mappings)
+        self.semantic_context = semantic_context
+        self._derived: Dict[str, pd.Series] = {}
+
+        missing = [s for s in self._sources.values() if s not in df.columns]
+        if missing:
+            raise SchemaValidationError(f"Mapped columns missing from dataset: {missing}")
+
+        validate_canonical_columns(self._sources)
+
+    # -----------------------
+    # DataFrame-like access
+    # -----------------------
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(list(self._sources))
+
+    @property
+    def index(self) -> pd.Index:
+        return self._df.index
+
+    @property
+    def shape(self):
+        return (len(self._df), len(self._sources))
+
+    @property
+    def source(self) -> pd.DataFrame:
+        return self._df
+
+    @property
+    def active_measure(self) -> str:
+        return self._sources["measure"]
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sources
+
+    def __getitem__(self, key: Union[str, List[str]]):
+        if isinstance(key, list):
+            return pd.DataFrame({name: self._column(name) for name in key}, copy=False)
+        return self._column(key)
+
+    def _column(self, name: str) -> pd.Series:
+        if name not in self._sources:
+            raise KeyError(name)
+
+        if name == "measure":
+            series = self._df[self._sources[name]]
+        else:
+            if name not in self._derived:
+                self._derived[name] = derive_canonical_column(
+                    self._df, name, self._sources[name]
+                )
+            series = self._derived[name]
+
+        return series.rename(name)
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """
+        First n canonical rows. Only those rows are derived; the cached
+        full columns are used if already built.
+        """
+        top = self._df.head(n)
+        columns = {}
+
+        for name, source in self._sources.items():
+            if name in self._derived:
+                columns[name] = self._derived[name].head(n)
+            elif name == "time":
+                # No fingerprint: a partial parse must not enter the date cache
+                columns[name] = parse_dates(top[source])
+            else:
+                columns[name] = derive_canonical_column(top, name, source)
+
+        return pd.DataFrame(columns)
+
+    # -----------------------
+    # Measure switching
+    # -----------------------
+
+    def set_measure(self, measure: str) -> None:
+        """
+        Point the canonical measure at another confirmed measure column.
+        """
+        if measure not in self._measures:
+            raise SchemaValidationError(
+                f"Active measure '{measure}' not in confirmed measures: {self._measures}"
+            )
+        self._sources["measure"] = measure
+
+    # -----------------------
+    # Materialization
+    # -----------------------
+
+    def materialize(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Canonical DataFrame with all (or the given) canonical columns.
+        """
+        return self[list(columns or self._sources)]
+
+    def __repr__(self) -> str:
+        mapped = ", ".join(f"{k}<-{v}" for k, v in self._sources.items())
+        return f"CanonicalView({len(self._df)} rows: {mapped})"
+
+
+def build_canonical_view(
+    df: pd.DataFrame,
+    confirmed_mappings: Dict,
+    semantic_context=None
+) -> CanonicalView:
+    """
+    Validated, lazily materialized canonical view over df (no copies).
+    """
+    return CanonicalView(df, confirmed_mappings, semantic_context)
+
+
+def build_canonical_dataframe(
+    df: pd.DataFrame,
+    confirmed_mappings: Dict,
+    semantic_context
+) -> pd.DataFrame:
+    """
+    Build canonical dataframe using a runtime-selected active measure.
+
+    Canonical columns:
+    - measure        (required, selected at runtime)
+    - entity         (optional, dictionary-encoded)
+    - time           (optional)
+    - dimension_1..N (optional, dictionary-encoded)
+
+    Parameters:
+        df: original dataframe
+        confirmed_mappings: output of semantic mapper (measures, entity, time, dimensions)
+        semantic_context: frozen semantic context (not used yet in Task 1)
+
+    Returns:
+        Canonical pandas DataFrame
+    """
+    return build_canonical_view(df, confirmed_mappings, semantic_context).materialize()
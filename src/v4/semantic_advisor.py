@@ -1,13 +1,19 @@
 # src/v4/semantic_advisor.py
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, TYPE_CHECKING
 import logging
+import os
+import threading
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-except ImportError:
-    SentenceTransformer = None
-    util = None
+import numpy as np
+
+from src.utils.timing import span
+from src.v4.embedding_cache import EmbeddingCache
+from src.v4.embedding_client import remote_encode, server_info, socket_path
+
+# sentence-transformers pulls in torch; it is imported on first real use
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
 # -----------------------------
@@ -16,90 +22,345 @@ except ImportError:
 
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+# Set to "1" to run without the HF advisor (torch is never imported)
+DETERMINISTIC_ONLY_ENV_VAR = "COPILOT_DETERMINISTIC_ONLY"
+
+# Inference backend: "torch" (reference), "onnx" or "onnx-int8"
+BACKEND_ENV_VAR = "COPILOT_ADVISOR_BACKEND"
+DEFAULT_BACKEND = "torch"
+
+# ONNX export shipped in the model repository, and whether the backend
+# quantizes it dynamically to int8 (once; the result is cached)
+ONNX_MODEL_FILE = "onnx/model.onnx"
+ONNX_BACKENDS = {
+    "onnx": False,
+    "onnx-int8": True,
+}
+
+BACKENDS = ("torch",) + tuple(ONNX_BACKENDS)
+
+# Candidate semantic labels (controlled vocabulary)
+SEMANTIC_LABELS = [
+    "revenue",
+    "sales amount",
+    "academic score",
+    "quantity",
+    "count",
+    "date",
+    "timestamp",
+    "person name",
+    "product name",
+    "category",
+    "geographic region",
+    "department",
+]
+
 _logger = logging.getLogger(__name__)
 _model = None
+_model_unavailable = False
+_advisor_enabled = os.environ.get(DETERMINISTIC_ONLY_ENV_VAR, "") not in ("1", "true", "yes")
+_backend = os.environ.get(BACKEND_ENV_VAR, DEFAULT_BACKEND)
+_label_matrix: Optional[np.ndarray] = None
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_failed = False
+
+# Guards model creation; held by the warm-up thread while it loads
+_model_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_label_lock = threading.Lock()
+# One model instance is shared by all threads; encode calls are serialized
+_encode_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
 
 
 # -----------------------------
 # Model Loader (lazy + safe)
 # -----------------------------
 
-def _load_model() -> Optional[SentenceTransformer]:
+def set_advisor_enabled(enabled: bool) -> None:
+    """
+    Enable or disable the HF advisor for this process.
+    When disabled, hints are empty and torch is never imported.
+    """
+    global _advisor_enabled
+    _advisor_enabled = enabled
+
+
+def advisor_enabled() -> bool:
+    return _advisor_enabled
+
+
+def set_backend(backend: str) -> None:
+    """
+    Select the inference backend. Drops any model already loaded.
     """
-    Lazy-load the HF sentence transformer model.
+    global _backend, _model, _model_unavailable, _label_matrix
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown advisor backend '{backend}'. Expected one of {BACKENDS}")
+
+    with _model_lock:
+        _backend = backend
+        _model = None
+        _model_unavailable = False
+        _label_matrix = None
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def model_key() -> str:
+    """
+    Identity of the active model for the embedding cache.
+    Quantized or exported backends produce slightly different vectors.
+    """
+    if _backend == DEFAULT_BACKEND:
+        return MODEL_NAME
+    if ONNX_BACKENDS.get(_backend):
+        # Quantized locally; vectors differ from the prebuilt quantized exports
+        return f"{MODEL_NAME}#{_backend}-dynamic"
+    return f"{MODEL_NAME}#{_backend}"
+
+
+def _create_model(backend: str):
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(MODEL_NAME)
+
+    if backend in ONNX_BACKENDS:
+        from src.v4.onnx_encoder import OnnxEncoder
+        return OnnxEncoder(MODEL_NAME, ONNX_MODEL_FILE, quantize=ONNX_BACKENDS[backend])
+
+    raise ValueError(f"Unknown advisor backend '{backend}'. Expected one of {BACKENDS}")
+
+
+def _load_model() -> Optional["SentenceTransformer"]:
+    """
+    Lazy-load the HF sentence transformer model on the configured backend.
     Returns None if unavailable.
+
+    Thread-safe: concurrent callers (including the warm-up thread)
+    share a single load and block until it finishes.
     """
-    global _model
+    global _model, _model_unavailable
 
     if _model is not None:
         return _model
 
-    if SentenceTransformer is None:
-        _logger.warning("sentence-transformers not installed. HF advisor disabled.")
+    with _model_lock:
+        if _model is not None:
+            return _model
+
+        if _model_unavailable or not _advisor_enabled:
+            return None
+
+        try:
+            with span("advisor_model_load"):
+                _model = _create_model(_backend)
+            return _model
+        except ImportError as e:
+            _logger.warning(
+                f"Dependencies for the '{_backend}' advisor backend are not installed ({e}). "
+                "HF advisor disabled."
+            )
+        except Exception as e:
+            _logger.warning(f"Failed to load HF model: {e}")
+
+        _model_unavailable = True
         return None
 
-    try:
-        _model = SentenceTransformer(MODEL_NAME)
-        return _model
-    except Exception as e:
-        _logger.warning(f"Failed to load HF model: {e}")
+
+def _all_cached(texts: List[str]) -> bool:
+    cache = get_embedding_cache()
+    if cache is None:
+        return False
+    return len(cache.get_many(model_key(), texts)) == len(set(texts))
+
+
+def warm_up(columns: Optional[List[str]] = None, context: str = "") -> Optional[threading.Thread]:
+    """
+    Start loading the model on a background thread.
+
+    The first hint request then blocks only for whatever part of the
+    load is still outstanding. No-op when the advisor is disabled, the
+    model is already loaded, or the columns about to be hinted and the
+    labels are all in the embedding cache (the model would go unused).
+    """
+    global _warmup_thread
+
+    if not _advisor_enabled or _model is not None or _model_unavailable:
+        return None
+
+    if columns is not None and _all_cached(
+        SEMANTIC_LABELS + [f"{column}. {context}".strip() for column in columns]
+    ):
+        return None
+
+    # A shared embedding server holds the model; don't load a copy
+    if socket_path() and server_info() is not None:
         return None
 
+    if _warmup_thread is None:
+        _warmup_thread = threading.Thread(
+            target=_load_model,
+            name="advisor-warm-up",
+            daemon=True,
+        )
+        _warmup_thread.start()
+
+    return _warmup_thread
+
+
+def _encode(model, texts: List[str]) -> np.ndarray:
+    """
+    Encode texts as L2-normalized rows, so dot products are cosine similarities.
+    """
+    with _encode_lock:
+        return model.encode(
+            texts,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Process-wide persistent embedding cache (None if it cannot be opened).
+    """
+    global _embedding_cache, _embedding_cache_failed
+
+    with _cache_lock:
+        if _embedding_cache is None and not _embedding_cache_failed:
+            try:
+                _embedding_cache = EmbeddingCache()
+            except Exception as e:
+                _logger.warning(f"Embedding cache unavailable: {e}")
+                _embedding_cache_failed = True
+
+    return _embedding_cache
+
+
+def _embed(texts: List[str], extra: Optional[List[str]] = None) -> Optional[np.ndarray]:
+    """
+    Embeddings for texts, served from the persistent cache where possible.
+
+    Uncached texts go to the shared embedding server when one is
+    configured (COPILOT_EMBEDDING_SOCKET) and answering; otherwise the
+    model is loaded in-process, only when at least one text is not cached.
+    Uncached extra texts are encoded and cached in the same batch, but
+    only when a batch is encoded anyway.
+    Returns None if uncached texts exist and the model is unavailable.
+    """
+    cache = get_embedding_cache()
+    found = cache.get_many(model_key(), texts + (extra or [])) if cache else {}
+
+    missing = [t for t in dict.fromkeys(texts) if t not in found]
+    if missing:
+        missing += [t for t in dict.fromkeys(extra or []) if t not in found and t not in missing]
+        vectors = remote_encode(missing, model_key()) if _model is None else None
+
+        if vectors is None:
+            # Time actually spent waiting for the model on the critical path
+            with span("advisor_model_wait"):
+                model = _load_model()
+            if model is None:
+                return None
+
+            # float32 like the stored blobs, so cached and fresh scores agree
+            vectors = _encode(model, missing).astype(np.float32)
+
+        if cache:
+            cache.put_many(model_key(), missing, vectors)
+        found.update(zip(missing, vectors))
+
+    return np.vstack([found[t] for t in texts])
+
+
+def _label_embeddings() -> Optional[np.ndarray]:
+    """
+    Label embedding matrix, computed once per process.
+    """
+    global _label_matrix
+
+    with _label_lock:
+        if _label_matrix is None:
+            _label_matrix = _embed(SEMANTIC_LABELS)
+
+    return _label_matrix
+
 
 # -----------------------------
 # Public API
 # -----------------------------
 
-def semantic_hint(
-    column_name: str,
-    context: str = ""
-) -> Dict[str, Optional[float]]:
+def semantic_hints(
+    columns: List[str],
+    context: str = "",
+    other_columns: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Optional[float]]]:
     """
-    Provide a semantic suggestion for a column using HF embeddings.
+    Provide semantic suggestions for many columns at once.
+
+    Column texts missing from the persistent embedding cache are encoded
+    in a single batch; all columns are then scored against the label
+    matrix with one matrix multiply. When every text is cached the
+    model is never loaded.
+
+    other_columns (the rest of the dataset's columns) ride along in that
+    batch into the cache, so warm_up() can tell the model will not be
+    needed the next time the same columns are seen.
 
     Returns:
         {
-          "suggestion": str | None,
-          "confidence": float | None
+          column: {"suggestion": str | None, "confidence": float | None}
         }
     """
+    unique_columns = list(dict.fromkeys(columns))
+    empty = {
+        column: {"suggestion": None, "confidence": None}
+        for column in unique_columns
+    }
 
-    model = _load_model()
-    if model is None:
-        return {"suggestion": None, "confidence": None}
-
-    # Candidate semantic labels (controlled vocabulary)
-    semantic_labels = [
-        "revenue",
-        "sales amount",
-        "academic score",
-        "quantity",
-        "count",
-        "date",
-        "timestamp",
-        "person name",
-        "product name",
-        "category",
-        "geographic region",
-        "department",
-    ]
+    if not unique_columns or not _advisor_enabled:
+        return empty
 
     try:
-        column_text = f"{column_name}. {context}".strip()
-
-        col_emb = model.encode(column_text, convert_to_tensor=True)
-        label_embs = model.encode(semantic_labels, convert_to_tensor=True)
+        texts = [f"{column}. {context}".strip() for column in unique_columns]
+        extra = [f"{column}. {context}".strip() for column in other_columns or []]
 
-        scores = util.cos_sim(col_emb, label_embs)[0]
+        column_matrix = _embed(texts, extra)
+        label_matrix = _label_embeddings()
+        if column_matrix is None or label_matrix is None:
+            return empty
 
-        best_idx = int(scores.argmax())
-        best_score = float(scores[best_idx])
+        scores = column_matrix @ label_matrix.T
+        best = scores.argmax(axis=1)
 
         return {
-            "suggestion": semantic_labels[best_idx],
-            "confidence": round(best_score, 2)
+            column: {
+                "suggestion": SEMANTIC_LABELS[int(best[row])],
+                "confidence": round(float(scores[row, best[row]]), 2)
+            }
+            for row, column in enumerate(unique_columns)
         }
 
     except Exception as e:
         _logger.warning(f"HF semantic hint failed: {e}")
-        return {"suggestion": None, "confidence": None}
+        return empty
+
+
+def semantic_hint(
+    column_name: str,
+    context: str = ""
+) -> Dict[str, Optional[float]]:
+    """
+    Provide a semantic suggestion for a column using HF embeddings.
+
+    Returns:
+        {
+          "suggestion": str | None,
+          "confidence": float | None
+        }
+    """
+    return semantic_hints([column_name], context)[column_name]
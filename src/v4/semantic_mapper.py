@@ -1,6 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Union
+import re
 
-from src.v4.semantic_advisor import semantic_hint
+import numpy as np
+
+from src.v4.semantic_advisor import semantic_hints
 
 
 """
@@ -23,6 +26,10 @@ ENTITY_SCORE_THRESHOLD = 0.4
 TIME_SCORE_THRESHOLD = 0.4
 DIMENSION_SCORE_THRESHOLD = 0.3
 
+ENTITY_KEYWORDS = ["name", "student", "user", "employee", "person"]
+TIME_KEYWORDS = ["date", "time", "year", "month"]
+DIMENSION_KEYWORDS = ["category", "subject", "region", "type", "group"]
+
 
 # -------------------------------
 # Deterministic scorers
@@ -51,7 +58,7 @@ def score_entity(column: str, info: Dict[str, Any]) -> float:
     if info["type"] == "categorical":
         score += 0.3
 
-    if any(k in name for k in ["name", "student", "user", "employee", "person"]):
+    if any(k in name for k in ENTITY_KEYWORDS):
         score += 0.3
 
     return round(score, 2)
@@ -64,7 +71,7 @@ def score_time(column: str, info: Dict[str, Any]) -> float:
     if info["type"] == "date":
         score += 0.4
 
-    if any(k in name for k in ["date", "time", "year", "month"]):
+    if any(k in name for k in TIME_KEYWORDS):
         score += 0.2
 
     return round(score, 2)
@@ -77,16 +84,116 @@ def score_dimension(column: str, info: Dict[str, Any]) -> float:
     if info["type"] == "categorical":
         score += 0.2
 
-    if any(k in name for k in ["category", "subject", "region", "type", "group"]):
+    if any(k in name for k in DIMENSION_KEYWORDS):
         score += 0.2
 
     return round(score, 2)
 
 
+# -------------------------------
+# Vectorized scoring
+# -------------------------------
+
+# Role columns of the score matrix
+MEASURE, ENTITY, TIME, DIMENSION = range(4)
+
+# Feature rows, in the order _feature_matrix builds them
+FEATURES = [
+    "numeric_type",
+    "unique_count_above_3",
+    "max_above_mean",
+    "categorical_type",
+    "date_type",
+    "entity_keyword",
+    "time_keyword",
+    "dimension_keyword",
+]
+
+# Feature -> role weights in tenths, mirroring the scorers above.
+# Integer sums divided by 10 equal the scorers' round(score, 2) exactly.
+ROLE_WEIGHTS = np.array([
+    # measure, entity, time, dimension
+    [4, 0, 0, 0],   # numeric_type
+    [2, 0, 0, 0],   # unique_count_above_3
+    [2, 0, 0, 0],   # max_above_mean
+    [0, 3, 0, 2],   # categorical_type
+    [0, 0, 4, 0],   # date_type
+    [0, 3, 0, 0],   # entity_keyword
+    [0, 0, 2, 0],   # time_keyword
+    [0, 0, 0, 2],   # dimension_keyword
+], dtype=np.int32)
+
+
+def _keyword_mask(names: List[str], keywords: List[str]) -> np.ndarray:
+    pattern = re.compile("|".join(re.escape(k) for k in keywords))
+    return np.fromiter(
+        (pattern.search(name) is not None for name in names),
+        dtype=bool,
+        count=len(names),
+    )
+
+
+def _feature_matrix(schema_report: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    """
+    Build the column x feature matrix (0/1) from the schema report.
+    """
+    columns = list(schema_report)
+    infos = list(schema_report.values())
+    n = len(columns)
+
+    types = np.array([info["type"] for info in infos], dtype=object)
+    signals = [info.get("signals", {}) for info in infos]
+
+    def signal(key: str) -> np.ndarray:
+        return np.fromiter((s.get(key, 0) for s in signals), dtype=float, count=n)
+
+    names = [column.lower() for column in columns]
+
+    features = np.column_stack([
+        types == "numeric",
+        signal("unique_count") > 3,
+        signal("max") > signal("mean"),
+        types == "categorical",
+        types == "date",
+        _keyword_mask(names, ENTITY_KEYWORDS),
+        _keyword_mask(names, TIME_KEYWORDS),
+        _keyword_mask(names, DIMENSION_KEYWORDS),
+    ]) if n else np.zeros((0, len(FEATURES)), dtype=bool)
+
+    return columns, features
+
+
+def score_matrix(schema_report: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    """
+    Score every column for every role in one matrix product.
+
+    Returns the column names and a (columns x 4) score matrix indexed by
+    MEASURE, ENTITY, TIME and DIMENSION. Row i equals the deterministic
+    scorers applied to column i.
+    """
+    columns, features = _feature_matrix(schema_report)
+    tenths = features.astype(np.int32) @ ROLE_WEIGHTS
+    return columns, tenths / 10
+
+
 # -------------------------------
 # Proposal generation
 # -------------------------------
 
+def ranking_score(m: Dict[str, Any]) -> float:
+    """
+    HF-aware ranking score of a measure candidate.
+    """
+    hf_conf = 0.0
+    if m.get("hf_hint") and m["hf_hint"].get("confidence") is not None:
+        hf_conf = m["hf_hint"]["confidence"]
+
+    return round(
+        (m["confidence"] * 0.7) + (hf_conf * 0.3),
+        3
+    )
+
+
 def propose_mappings(schema_report: Dict[str, Any]) -> Dict[str, Any]:
     proposals = {
         "measures": [],
@@ -95,72 +202,63 @@ def propose_mappings(schema_report: Dict[str, Any]) -> Dict[str, Any]:
         "dimensions": [],
     }
 
-    for column, info in schema_report.items():
-
-        # ---- Measure candidates ----
-        m_score = score_numeric_measure(info)
-        if m_score >= MEASURE_SCORE_THRESHOLD:
-            hf = semantic_hint(column)
-            proposals["measures"].append({
-                "column": column,
-                "confidence": m_score,
-                "evidence": ["numeric_type", "numeric_behavior"],
-                "hf_hint": hf
-            })
-
-        # ---- Entity ----
-        if proposals["entity"] is None:
-            e_score = score_entity(column, info)
-            if e_score >= ENTITY_SCORE_THRESHOLD:
-                hf = semantic_hint(column)
-                proposals["entity"] = {
-                    "column": column,
-                    "confidence": e_score,
-                    "evidence": ["entity_signal"],
-                    "hf_hint": hf
-                }
-
-        # ---- Time ----
-        if proposals["time"] is None:
-            t_score = score_time(column, info)
-            if t_score >= TIME_SCORE_THRESHOLD:
-                hf = semantic_hint(column)
-                proposals["time"] = {
-                    "column": column,
-                    "confidence": t_score,
-                    "evidence": ["date_type"],
-                    "hf_hint": hf
-                }
-
-        # ---- Dimensions ----
-        d_score = score_dimension(column, info)
-        if d_score >= DIMENSION_SCORE_THRESHOLD:
-            hf = semantic_hint(column)
-            proposals["dimensions"].append({
-                "column": column,
-                "confidence": d_score,
-                "evidence": ["categorical_grouping"],
-                "hf_hint": hf
-            })
-        # ----------------------------------
-        # HF-aware ranking of measure candidates
-        # ----------------------------------
-
-        def ranking_score(m):
-            hf_conf = 0.0
-            if m.get("hf_hint") and m["hf_hint"].get("confidence") is not None:
-                hf_conf = m["hf_hint"]["confidence"]
-
-            return round(
-                (m["confidence"] * 0.7) + (hf_conf * 0.3),
-                3
-            )
-
-        proposals["measures"] = sorted(
-            proposals["measures"],
-            key=ranking_score,
-            reverse=True
-        )
+    columns, scores = score_matrix(schema_report)
+
+    # ---- Measure candidates ----
+    for idx in np.flatnonzero(scores[:, MEASURE] >= MEASURE_SCORE_THRESHOLD):
+        proposals["measures"].append({
+            "column": columns[idx],
+            "confidence": float(scores[idx, MEASURE]),
+            "evidence": ["numeric_type", "numeric_behavior"],
+        })
+
+    # ---- Entity (first match) ----
+    matches = np.flatnonzero(scores[:, ENTITY] >= ENTITY_SCORE_THRESHOLD)
+    if len(matches):
+        idx = matches[0]
+        proposals["entity"] = {
+            "column": columns[idx],
+            "confidence": float(scores[idx, ENTITY]),
+            "evidence": ["entity_signal"],
+        }
+
+    # ---- Time (first match) ----
+    matches = np.flatnonzero(scores[:, TIME] >= TIME_SCORE_THRESHOLD)
+    if len(matches):
+        idx = matches[0]
+        proposals["time"] = {
+            "column": columns[idx],
+            "confidence": float(scores[idx, TIME]),
+            "evidence": ["date_type"],
+        }
+
+    # ---- Dimensions ----
+    for idx in np.flatnonzero(scores[:, DIMENSION] >= DIMENSION_SCORE_THRESHOLD):
+        proposals["dimensions"].append({
+            "column": columns[idx],
+            "confidence": float(scores[idx, DIMENSION]),
+            "evidence": ["categorical_grouping"],
+        })
+
+    # ----------------------------------
+    # HF hints: one batch for every proposed column
+    # ----------------------------------
+    candidates = proposals["measures"] + proposals["dimensions"] + [
+        p for p in (proposals["entity"], proposals["time"]) if p is not None
+    ]
+
+    hints = semantic_hints([c["column"] for c in candidates], other_columns=columns)
+    for candidate in candidates:
+        candidate["hf_hint"] = dict(hints[candidate["column"]])
+
+    # ----------------------------------
+    # HF-aware ranking of measure candidates
+    # ----------------------------------
+    proposals["measures"] = sorted(
+        proposals["measures"],
+        key=ranking_score,
+        reverse=True
+    )
 
     return proposals
 
@@ -243,3 +341,44 @@ def confirm_mappings(proposed: Dict[str, Any]) -> Dict[str, Any]:
             confirmed["dimensions"].append(d["column"])
 
     return confirmed
+
+
+# -------------------------------
+# Unattended confirmation
+# -------------------------------
+
+def auto_confirm_mappings(
+    proposed: Dict[str, Any],
+    min_confidence: Union[float, Dict[str, float]] = 0.0
+) -> Dict[str, Any]:
+    """
+    Non-interactive counterpart of confirm_mappings: accept every proposal
+    whose confidence reaches min_confidence.
+
+    min_confidence is one threshold for all roles or a dict keyed by
+    "measure", "entity", "time", "dimension" (missing roles accept all).
+    """
+    def threshold(role: str) -> float:
+        if isinstance(min_confidence, dict):
+            return float(min_confidence.get(role, 0.0))
+        return float(min_confidence)
+
+    def accepted(proposal, role: str) -> bool:
+        return proposal is not None and proposal["confidence"] >= threshold(role)
+
+    return {
+        "measures": [
+            m["column"] for m in proposed.get("measures", []) if accepted(m, "measure")
+        ],
+        "entity": (
+            proposed["entity"]["column"]
+            if accepted(proposed.get("entity"), "entity") else None
+        ),
+        "time": (
+            proposed["time"]["column"]
+            if accepted(proposed.get("time"), "time") else None
+        ),
+        "dimensions": [
+            d["column"] for d in proposed.get("dimensions", []) if accepted(d, "dimension")
+        ],
+    }
@@ -0,0 +1,259 @@
+# src/v4/streaming_schema.py
+"""
+Streaming schema extraction.
+
+Reads a CSV in bounded chunks and folds every chunk into mergeable
+per-column accumulators. The result is the same schema_report that
+src.v3.schema_extractor.extract_schema builds from a fully loaded
+DataFrame, but peak memory is bounded by the chunk size (plus the
+distinct values of each column) instead of the file size.
+"""
+
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+from src.v4.date_parsing import parse_dates, is_text_series, DATE_RATIO_THRESHOLD
+from src.utils.cardinality import CardinalityCounter
+
+
+# -----------------------------
+# Configuration
+# -----------------------------
+
+DEFAULT_CHUNK_ROWS = 100_000
+SAMPLE_SIZE = 5
+
+
+# -----------------------------
+# Per-column accumulator
+# -----------------------------
+
+class ColumnAccumulator:
+    """
+    Mergeable running statistics for one column.
+
+    Tracks everything extract_schema needs: row and missing counts,
+    numeric min / max / mean / integer-likeness, distinct values,
+    the first few sample values and how many values parse as dates.
+
+    With approximate=True distinct values are counted by a mergeable
+    HyperLogLog-backed counter instead of a set, so memory no longer
+    grows with column cardinality.
+    """
+
+    def __init__(self, approximate: bool = False):
+        self.rows = 0
+        self.missing = 0
+        self.numeric_seen = False
+        self.text_seen = False
+        self.date_parsed = 0
+
+        # numeric signals
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.is_integer_like = True
+
+        # shared
+        self.approximate = approximate
+        self.uniques = CardinalityCounter() if approximate else set()
+        self.samples: List[Any] = []
+
+    # -----------------------------
+    # Update / merge
+    # -----------------------------
+
+    def update(self, series: pd.Series) -> None:
+        """
+        Fold one chunk of the column into the accumulator.
+        """
+        self.rows += len(series)
+        self.missing += int(series.isna().sum())
+
+        clean = series.dropna()
+
+        if pd.api.types.is_numeric_dtype(series):
+            self.numeric_seen = True
+            if len(clean):
+                self._update_numeric(clean)
+        else:
+            self.text_seen = True
+            if is_text_series(series):
+                parsed = parse_dates(series)
+                self.date_parsed += int(parsed.notna().sum())
+
+        uniques = clean.unique()
+        if self.approximate:
+            self.uniques.update(uniques)
+        else:
+            self.uniques.update(uniques.tolist())
+
+        if len(self.samples) < SAMPLE_SIZE:
+            for value in uniques[:SAMPLE_SIZE].tolist():
+                if value not in self.samples:
+                    self.samples.append(value)
+                if len(self.samples) == SAMPLE_SIZE:
+                    break
+
+    def _update_numeric(self, clean: pd.Series) -> None:
+        chunk_min = float(clean.min())
+        chunk_max = float(clean.max())
+
+        self.count += len(clean)
+        self.total += float(clean.sum())
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+        if self.is_integer_like:
+            self.is_integer_like = bool((clean % 1 == 0).all())
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        """
+        Merge another accumulator (a later part of the same column) into this one.
+        """
+        self.rows += other.rows
+        self.missing += other.missing
+        self.numeric_seen = self.numeric_seen or other.numeric_seen
+        self.text_seen = self.text_seen or other.text_seen
+        self.date_parsed += other.date_parsed
+
+        if other.count:
+            self.count += other.count
+            self.total += other.total
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.is_integer_like = self.is_integer_like and other.is_integer_like
+
+        if self.approximate and other.approximate:
+            self.uniques.merge(other.uniques)
+        elif self.approximate or other.approximate:
+            raise ValueError("Cannot merge exact and approximate accumulators")
+        else:
+            self.uniques |= other.uniques
+
+        for value in other.samples:
+            if len(self.samples) == SAMPLE_SIZE:
+                break
+            if value not in self.samples:
+                self.samples.append(value)
+
+        return self
+
+    # -----------------------------
+    # Finalize
+    # -----------------------------
+
+    def inferred_type(self) -> str:
+        """
+        Same decision rules as infer_column_type, applied to the whole column.
+        """
+        if self.numeric_seen and not self.text_seen:
+            return "numeric"
+
+        if self.rows and self.date_parsed / self.rows > DATE_RATIO_THRESHOLD:
+            return "date"
+
+        return "categorical"
+
+    def _unique_count(self, as_text: bool) -> int:
+        if self.approximate:
+            return self.uniques.count()
+        if as_text:
+            return len({str(v) for v in self.uniques})
+        return len(self.uniques)
+
+    def to_entry(self) -> Dict[str, Any]:
+        """
+        Build the schema_report entry for this column.
+        """
+        col_type = self.inferred_type()
+
+        entry = {
+            "type": col_type,
+            "missing_count": self.missing
+        }
+
+        if col_type == "numeric":
+            entry["signals"] = {
+                "min": self.min if self.min is not None else float("nan"),
+                "max": self.max if self.max is not None else float("nan"),
+                "mean": self.total / self.count if self.count else float("nan"),
+                "is_integer_like": self.is_integer_like,
+                "unique_count": self._unique_count(as_text=False)
+            }
+
+        elif col_type == "categorical":
+            samples = self.samples
+
+            # Mixed columns: a full read would see every value as text
+            if self.numeric_seen:
+                samples = list(dict.fromkeys(str(v) for v in samples))
+
+            entry["signals"] = {
+                "unique_count": self._unique_count(as_text=self.numeric_seen),
+                "sample_values": samples[:SAMPLE_SIZE]
+            }
+
+        return entry
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def accumulate_chunks(
+    chunks,
+    approximate: bool = False,
+    accumulators: Optional[Dict[str, ColumnAccumulator]] = None
+) -> Dict[str, ColumnAccumulator]:
+    """
+    Fold an iterable of DataFrame chunks into per-column accumulators,
+    continuing from existing accumulators when given.
+    """
+    accumulators = {} if accumulators is None else accumulators
+
+    for chunk in chunks:
+        for column in chunk.columns:
+            if column not in accumulators:
+                accumulators[column] = ColumnAccumulator(approximate)
+            accumulators[column].update(chunk[column])
+
+    return accumulators
+
+
+def schema_from_accumulators(
+    accumulators: Dict[str, ColumnAccumulator]
+) -> Dict[str, Any]:
+    """
+    Convert accumulators into a schema_report.
+    """
+    return {
+        column: acc.to_entry() for column, acc in accumulators.items()
+    }
+
+
+def extract_schema_streaming(
+    path: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    approximate: bool = False
+) -> Dict[str, Any]:
+    """
+    Extract the schema_report of a CSV file without loading it fully.
+
+    approximate=True bounds per-column memory by estimating unique
+    counts above a small exact cutoff (see src.utils.cardinality).
+    """
+    chunks = pd.read_csv(path, chunksize=chunk_rows)
+    accumulators = accumulate_chunks(chunks, approximate)
+
+    # Header-only files yield no chunks
+    if not accumulators:
+        header = pd.read_csv(path, nrows=0)
+        accumulators = {
+            column: ColumnAccumulator(approximate) for column in header.columns
+        }
+        for column in header.columns:
+            accumulators[column].text_seen = True
+
+    return schema_from_accumulators(accumulators)
@@ -1,11 +1,20 @@
-from typing import Dict
+from typing import Dict, Optional
 import pandas as pd
 
+from src.utils.cardinality import approx_nunique
+
 
 # --------------------------------------------------
 # Step 1: Canonical fact extraction (NO DECISIONS)
 # --------------------------------------------------
-def extract_canonical_facts(canonical_df: pd.DataFrame) -> Dict[str, bool | int]:
+def extract_canonical_facts(
+    canonical_df: pd.DataFrame,
+    approximate: bool = False
+) -> Dict[str, bool | int]:
+    # time_cardinality is only compared against tiny thresholds, which
+    # stay exact under the sketch's exact cutoff
+    count_unique = approx_nunique if approximate else pd.Series.nunique
+
     return {
         "has_measure": "measure" in canonical_df.columns,
         "has_entity": "entity" in canonical_df.columns,
@@ -14,7 +23,7 @@ def extract_canonical_facts(canonical_df: pd.DataFrame) -> Dict[str, bool | int]
             col.startswith("dimension_") for col in canonical_df.columns
         ),
         "time_cardinality": (
-            canonical_df["time"].nunique()
+            count_unique(canonical_df["time"])
             if "time" in canonical_df.columns
             else 0
         ),
@@ -43,17 +52,26 @@ CAPABILITY_MATRIX = {
 # --------------------------------------------------
 # Step 3: Reasoner (FACTS + RULES → DECISIONS)
 # --------------------------------------------------
-def reason_about_capabilities(canonical_df: pd.DataFrame, semantic_context):
+def reason_about_capabilities(
+    canonical_df: pd.DataFrame,
+    semantic_context,
+    approximate_cardinality: bool = False,
+    facts: Optional[Dict[str, bool | int]] = None
+):
     """
     Determine which analytics are safe based on the canonical dataframe.
 
+    facts: precomputed canonical facts (e.g. from incremental aggregates);
+    canonical_df is not read when given.
+
     IMPORTANT:
     - No raw dataframe access
     - No implicit inference
     - All decisions come from CAPABILITY_MATRIX
     """
 
-    facts = extract_canonical_facts(canonical_df)
+    if facts is None:
+        facts = extract_canonical_facts(canonical_df, approximate_cardinality)
 
     enabled = []
     disabled = {}
@@ -0,0 +1,123 @@
+# src/v4/time_buckets.py
+"""
+Calendar buckets over integer epoch days.
+
+Time is reduced to whole days since 1970-01-01 (nullable Int64, missing
+as <NA>). A day-level rollup is built once from the rows; week, month,
+quarter and year totals are re-aggregated from that rollup by mapping
+each day to the first day of its bucket, so changing granularity never
+touches the raw rows again.
+
+Weeks start on Monday. Quarters start in January, April, July, October.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+BUCKETS = ("day", "week", "month", "quarter", "year")
+
+# 1970-01-01 was a Thursday (Monday = 0)
+_EPOCH_WEEKDAY = 3
+
+
+def _naive_datetimes(time: pd.Series) -> pd.Series:
+    """
+    time as naive datetime64. Time zone-aware values keep their local
+    wall-clock time; other dtypes are parsed (unparseable -> NaT).
+    """
+    if isinstance(time.dtype, pd.DatetimeTZDtype):
+        return time.dt.tz_localize(None)
+
+    if pd.api.types.is_datetime64_dtype(time.dtype):
+        return time
+
+    # Mixed time zones fail (or coerce to NaT) unless converted to UTC
+    in_utc = pd.to_datetime(time, errors="coerce", utc=True)
+    try:
+        parsed = pd.to_datetime(time, errors="coerce")
+    except (ValueError, TypeError):
+        parsed = in_utc
+
+    if parsed.isna().sum() > in_utc.isna().sum():
+        parsed = in_utc
+
+    return _naive_datetimes(parsed)
+
+
+def epoch_days(time: pd.Series) -> pd.Series:
+    """
+    Whole days since 1970-01-01 for a datetime Series (missing -> <NA>).
+    Time zone-aware and object columns are accepted; days are local
+    calendar days.
+    """
+    days = _naive_datetimes(time).to_numpy().astype("datetime64[D]")
+    missing = np.isnat(days)
+
+    values = days.astype(np.int64)
+    values[missing] = 0
+
+    return pd.Series(
+        pd.arrays.IntegerArray(values, missing),
+        index=time.index,
+        name=time.name,
+    )
+
+
+def bucket_start(days: np.ndarray, bucket: str) -> np.ndarray:
+    """
+    Epoch day of the first day of each day's bucket.
+    """
+    if bucket == "day":
+        return days
+
+    if bucket == "week":
+        return days - (days + _EPOCH_WEEKDAY) % 7
+
+    dates = days.astype("datetime64[D]")
+
+    if bucket == "month":
+        starts = dates.astype("datetime64[M]")
+    elif bucket == "quarter":
+        months = dates.astype("datetime64[M]").astype(np.int64)
+        starts = (months - months % 3).astype("datetime64[M]")
+    elif bucket == "year":
+        starts = dates.astype("datetime64[Y]")
+    else:
+        raise ValueError(f"Unknown time bucket '{bucket}'. Expected one of {BUCKETS}")
+
+    return starts.astype("datetime64[D]").astype(np.int64)
+
+
+def _split(index: pd.Index):
+    array = index.array
+    missing = np.asarray(array.isna())
+    return np.asarray(array.to_numpy(dtype=np.int64, na_value=0)), missing
+
+
+def rollup_to_bucket(day_sums, bucket: str):
+    """
+    Re-aggregate day-level sums (Series or DataFrame indexed by epoch
+    day) to bucket. Missing days stay a separate group, last.
+
+    Integer sums are exact; float sums can differ from grouping the raw
+    rows in the last bits (different summation order).
+    """
+    if bucket == "day":
+        return day_sums
+
+    days, missing = _split(day_sums.index)
+    key = pd.arrays.IntegerArray(bucket_start(days, bucket), missing)
+
+    return day_sums.groupby(key, dropna=False).sum()
+
+
+def with_timestamps(sums):
+    """
+    Replace an epoch-day index by the matching timestamps (<NA> -> NaT).
+    """
+    days, missing = _split(sums.index)
+    stamps = days.astype("datetime64[D]").astype("datetime64[s]")
+    stamps[missing] = np.datetime64("NaT")
+
+    return sums.set_axis(pd.DatetimeIndex(stamps, name=sums.index.name))
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_sales, write_csv
+from src.v4.date_parsing import clear_date_cache
+from src.v4.semantic_advisor import set_advisor_enabled
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """
+    Every test gets its own cache directory and no HF advisor.
+    """
+    monkeypatch.setenv("COPILOT_CACHE_DIR", str(tmp_path / "cache"))
+    set_advisor_enabled(False)
+    clear_date_cache()
+    yield
+    clear_date_cache()
+
+
+@pytest.fixture
+def sales_df() -> pd.DataFrame:
+    return generate_sales(5_000, entities=200, days=120, null_rate=0.02)
+
+
+@pytest.fixture
+def sales_csv(tmp_path, sales_df) -> str:
+    return write_csv(sales_df, str(tmp_path / "sales.csv"))
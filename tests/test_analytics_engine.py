@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.v4.analytics_engine import (
+    rank_from_sums,
+    run_compare_grouping_sets,
+    run_trend,
+    select_ranked,
+)
+
+
+def _full_sort(sums: pd.Series, ascending: bool = False) -> pd.Series:
+    """
+    Reference ranking: stable full sort (ties keep their order), missing last.
+    """
+    return sums.sort_values(ascending=ascending, kind="stable", na_position="last")
+
+
+@pytest.fixture
+def sums() -> pd.Series:
+    rng = np.random.default_rng(3)
+    values = rng.integers(0, 50, 500).astype(float)
+    values[rng.random(500) < 0.05] = np.nan
+    # Sorted keys, as group_sum returns them
+    return pd.Series(values, index=[f"e{i:03d}" for i in range(500)])
+
+
+# -----------------------------
+# Ranking
+# -----------------------------
+
+@pytest.mark.parametrize(
+    "start,stop", [(0, 1), (0, 10), (5, 25), (490, 500), (0, 500), (0, 900)]
+)
+@pytest.mark.parametrize("ascending", [False, True])
+def test_partial_selection_matches_full_sort(sums, start, stop, ascending):
+    expected = _full_sort(sums, ascending).iloc[start:stop]
+    result = select_ranked(sums, start, stop, ascending=ascending)
+    assert result.index.tolist() == expected.index.tolist()
+
+
+def test_top_bottom_and_pages(sums):
+    ranking = list(_full_sort(sums).index)
+
+    assert list(rank_from_sums(sums, top_k=7)["ranking"]) == ranking[:7]
+    assert list(rank_from_sums(sums, offset=20, limit=10)["ranking"]) == ranking[20:30]
+    lowest = list(_full_sort(sums, ascending=True).index)
+    assert list(rank_from_sums(sums, bottom_k=4)["ranking"]) == lowest[:4]
+    assert rank_from_sums(sums)["total_entities"] == len(sums)
+
+
+@pytest.mark.parametrize("params", [{"top_k": -3}, {"bottom_k": -1}, {"offset": -1}, {"limit": -2}])
+def test_negative_slice_rejected(sums, params):
+    with pytest.raises(ValueError):
+        rank_from_sums(sums, **params)
+
+
+# -----------------------------
+# Grouping sets
+# -----------------------------
+
+def _frame(measure) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    n = len(measure)
+    return pd.DataFrame({
+        "measure": measure,
+        "dimension_1": rng.choice(["a", "b", "c"], n),
+        "dimension_2": pd.Series(rng.choice(["x", "y", None], n), dtype=object),
+    })
+
+
+def _grouping_set(result, dims):
+    grouping = result["grouping_sets"]
+    set_id = grouping["sets"].index(dims)
+    columns = grouping["columns"]
+    rows = [i for i, s in enumerate(columns["set"]) if s == set_id]
+
+    def label(value):
+        return None if isinstance(value, float) and np.isnan(value) else value
+
+    return {
+        tuple(label(columns[d][i]) for d in dims): columns["measure"][i]
+        for i in rows
+    }
+
+
+@pytest.mark.parametrize(
+    "dims", [["dimension_1"], ["dimension_2"], ["dimension_1", "dimension_2"]]
+)
+def test_grouping_sets_match_groupby(dims):
+    df = _frame(np.random.default_rng(1).integers(0, 1_000, 2_000))
+    result = run_compare_grouping_sets(df, depth=2)
+
+    expected = {}
+    for key, value in df.groupby(dims, dropna=False)["measure"].sum().items():
+        key = key if isinstance(key, tuple) else (key,)
+        expected[tuple(None if pd.isna(v) else v for v in key)] = value
+    assert _grouping_set(result, dims) == expected
+
+
+def test_grouping_sets_exact_above_2_53():
+    big = 2 ** 53 + 1
+    df = _frame(np.array([big, 1, 1, 1], dtype=np.int64))
+    df["dimension_1"] = "a"
+
+    result = run_compare_grouping_sets(df, depth=1)
+    assert _grouping_set(result, ["dimension_1"]) == {("a",): big + 3}
+
+
+# -----------------------------
+# Bucketed trends
+# -----------------------------
+
+def _baseline_trend(df: pd.DataFrame) -> dict:
+    """
+    run_trend as it was before buckets: one point per distinct time value.
+    """
+    return df.groupby("time", dropna=False)["measure"].sum().sort_index().to_dict()
+
+
+def _by_label(trend: dict) -> dict:
+    return {str(key): value for key, value in trend.items()}
+
+
+@pytest.fixture
+def timed() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    n = 3_000
+    hours = pd.to_timedelta(rng.integers(0, 200 * 24, n), unit="h")
+    time = pd.Series(pd.Timestamp("2023-11-20") + hours)
+    time[rng.random(n) < 0.02] = pd.NaT
+    return pd.DataFrame({"time": time, "measure": rng.integers(0, 100, n)})
+
+
+@pytest.mark.parametrize("bucket,period", [
+    ("day", "D"), ("week", "W-SUN"), ("month", "M"), ("quarter", "Q"), ("year", "Y"),
+])
+def test_bucketed_trend_matches_baseline(timed, bucket, period):
+    # Weeks ending Sunday start on Monday
+    floored = timed["time"].dt.to_period(period).dt.start_time
+
+    expected = _baseline_trend(timed.assign(time=floored))
+    result = run_trend(timed, bucket)
+
+    assert result["bucket"] == bucket
+    # Keyed by label: NaT keys never compare equal
+    assert _by_label(result["trend"]) == _by_label(expected)
+
+
+def test_unbucketed_trend_matches_baseline(timed):
+    assert run_trend(timed)["trend"] == _baseline_trend(timed)
+
+
+def test_bucketed_trend_accepts_time_zones(timed):
+    aware = timed.assign(time=timed["time"].dt.tz_localize("America/New_York"))
+    assert run_trend(aware, "month") == run_trend(timed, "month")
+    as_objects = aware.assign(time=aware["time"].astype(object))
+    assert run_trend(as_objects, "day") == run_trend(timed, "day")
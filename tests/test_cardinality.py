@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from src.utils.cardinality import CardinalityCounter, HyperLogLog, approx_nunique
+
+
+@pytest.mark.parametrize("true_count", [5_000, 100_000, 1_000_000])
+@pytest.mark.parametrize("precision", [12, 14])
+def test_estimate_within_error_bound(true_count, precision):
+    sketch = HyperLogLog(precision)
+    sketch.add(np.arange(true_count))
+
+    # Deterministic hashes: allow three standard errors
+    error = abs(sketch.estimate() - true_count) / true_count
+    assert error < 3 * sketch.relative_error
+
+
+def test_merged_chunks_equal_one_pass():
+    values = np.arange(200_000)
+
+    whole = HyperLogLog()
+    whole.add(values)
+
+    merged = HyperLogLog()
+    for chunk in np.array_split(values, 7):
+        part = HyperLogLog()
+        part.add(chunk)
+        merged.merge(part)
+
+    assert np.array_equal(merged.registers, whole.registers)
+
+
+def test_exact_below_cutoff():
+    values = np.repeat(np.arange(1_000), 3)
+    assert approx_nunique(values, exact_cutoff=1_024) == 1_000
+
+    counter = CardinalityCounter(exact_cutoff=1_024)
+    counter.update(values)
+    assert counter.is_exact
+
+
+def test_never_reports_cutoff_once_exceeded():
+    counter = CardinalityCounter(exact_cutoff=100)
+    counter.update(np.arange(101))
+    assert not counter.is_exact
+    assert counter.count() > 100
+
+
+def test_numbers_hash_by_value():
+    assert approx_nunique(np.array([5, 5.0, 6])) == 2
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from src.v4.date_parsing import parse_dates
+
+
+def test_parse_dates_matches_pandas_for_dates():
+    series = pd.Series(["2024-01-05", "2024-02-10", None, "2024-01-05"], name="d")
+    expected = pd.to_datetime(series, errors="coerce")
+    assert parse_dates(series).tolist() == expected.tolist()
+
+
+def test_parse_dates_skips_high_cardinality_text():
+    series = pd.Series([f"ORD{i:06d}" for i in range(5_000)], name="order_id")
+    assert parse_dates(series).isna().all()
+
+
+def _day_first(days):
+    return [day.strftime("%d/%m/%Y") for day in days]
+
+
+def test_format_is_confirmed_beyond_the_sample():
+    # 288 uniques with day <= 12 before the first unambiguous one
+    days = [d for d in pd.date_range("2023-01-01", "2024-12-31") if d.day <= 12]
+    days += list(pd.date_range("2025-01-13", periods=30))
+    series = pd.Series(_day_first(days), name="d")
+
+    parsed = parse_dates(series)
+    assert parsed.notna().all()
+    assert parsed.tolist() == days
+
+
+def test_ambiguous_values_defer_to_pandas():
+    days = [d for d in pd.date_range("2024-01-01", "2024-06-30") if d.day <= 12]
+    series = pd.Series(_day_first(days), name="d")
+    expected = pd.to_datetime(series, errors="coerce")
+    assert parse_dates(series).tolist() == expected.tolist()
@@ -0,0 +1,229 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from src.v4 import incremental
+from src.v4.incremental import IncrementalDataset
+from src.v4.measure_aggregates import MeasureAggregates
+from src.v4.schema_adapter import build_canonical_view
+from src.core.semantic_context import SemanticContext, SemanticMode
+
+
+MAPPINGS = {
+    "measures": ["revenue", "units_sold"],
+    "entity": "salesperson",
+    "time": "order_date",
+    "dimensions": ["region", "product"],
+    "active_measure": "revenue",
+}
+
+QUERIES = [
+    ("summary", "revenue", {}),
+    ("rank", "revenue", {}),
+    ("rank", "units_sold", {"top_k": 5}),
+    ("trend", "revenue", {}),
+    ("trend", "units_sold", {"bucket": "month"}),
+    ("compare", "revenue", {}),
+    ("compare", "revenue", {"depth": 2}),
+]
+
+
+def _full(path: str, upto: int):
+    """
+    MeasureAggregates over the first upto bytes of the file, loaded whole.
+    """
+    with open(path, "rb") as f:
+        df = pd.read_csv(io.BytesIO(f.read(upto)))
+
+    semantic_context = SemanticContext(mode=SemanticMode.SINGLE_MEASURE)
+    canonical = build_canonical_view(df, MAPPINGS, semantic_context)
+    return MeasureAggregates(canonical, df[MAPPINGS["measures"]])
+
+
+def _normalized(value):
+    """
+    Result with missing values (NaN / NaT / None) made comparable.
+    """
+    if isinstance(value, dict):
+        return {_normalized(k): _normalized(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalized(v) for v in value]
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "<missing>"
+    return value
+
+
+def _run(path: str, mappings=None):
+    dataset = IncrementalDataset(path, chunk_rows=700)
+    dataset.refresh(mappings)
+    return dataset, dataset.aggregates(MAPPINGS)
+
+
+def _assert_matches_full(path: str, dataset: IncrementalDataset, aggregates):
+    full = _full(path, dataset._next_state["size"])
+    for intent, measure, params in QUERIES:
+        expected = full.run(intent, measure, **params)
+        result = aggregates.run(intent, measure, **params)
+        assert _normalized(result) == _normalized(expected), intent
+
+
+@pytest.fixture
+def lines(sales_df):
+    text = sales_df.to_csv(index=False)
+    return text.splitlines(keepends=True)
+
+
+def _write(path, lines, mode="w"):
+    with open(path, mode) as f:
+        f.write("".join(lines))
+
+
+def test_append_matches_full_recompute(tmp_path, lines):
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:2_001])
+
+    dataset, aggregates = _run(path)
+    assert dataset.status == incremental.NEW
+    _assert_matches_full(path, dataset, aggregates)
+
+    dataset, aggregates = _run(path)
+    assert (dataset.status, dataset.new_rows) == (incremental.UNCHANGED, 0)
+
+    _write(path, lines[2_001:3_500], "a")
+    dataset, aggregates = _run(path)
+    assert (dataset.status, dataset.new_rows) == (incremental.APPENDED, 1_499)
+    _assert_matches_full(path, dataset, aggregates)
+
+
+def test_partial_last_line_is_read_again_when_completed(tmp_path, lines):
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:1_001])
+    _run(path)
+
+    # A writer stopped half-way through a line
+    _write(path, lines[1_001:1_100] + [lines[1_100][:7]], "a")
+    dataset, aggregates = _run(path)
+    assert dataset.new_rows == 100
+    assert dataset._next_state["offset"] < os.path.getsize(path)
+    _assert_matches_full(path, dataset, aggregates)
+
+    _write(path, [lines[1_100][7:]], "a")
+    dataset, aggregates = _run(path)
+    assert dataset.new_rows == 0
+    _assert_matches_full(path, dataset, aggregates)
+    assert aggregates.state.rows == 1_100
+
+
+def test_no_trailing_newline_matches_full_read(tmp_path, lines):
+    path = str(tmp_path / "no_newline.csv")
+    _write(path, lines[:1_001])
+    with open(path, "rb+") as f:
+        f.truncate(os.path.getsize(path) - 1)
+
+    for status in (incremental.NEW, incremental.UNCHANGED):
+        dataset, aggregates = _run(path)
+        assert dataset.status == status
+        _assert_matches_full(path, dataset, aggregates)
+        assert aggregates.summary("revenue")["total_measure"] == pytest.approx(
+            pd.read_csv(path)["revenue"].sum()
+        )
+    assert dataset.new_rows == 0
+
+    _write(path, ["\n"] + lines[1_001:1_500], "a")
+    dataset, aggregates = _run(path)
+    assert (dataset.status, dataset.new_rows) == (incremental.APPENDED, 499)
+    _assert_matches_full(path, dataset, aggregates)
+    assert aggregates.state.rows == 1_499
+
+
+def test_rows_appended_during_a_run_are_counted_once(tmp_path, lines, monkeypatch):
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:1_001])
+    _run(path)
+    _write(path, lines[1_001:2_001], "a")
+
+    accumulate = incremental.accumulate_chunks
+    raced = []
+
+    def racing_append(*args, **kwargs):
+        if not raced:
+            raced.append(True)
+            _write(path, lines[2_001:2_501], "a")
+        return accumulate(*args, **kwargs)
+
+    monkeypatch.setattr(incremental, "accumulate_chunks", racing_append)
+    dataset, aggregates = _run(path)
+    assert dataset.new_rows == 1_000
+    _assert_matches_full(path, dataset, aggregates)
+
+    monkeypatch.setattr(incremental, "accumulate_chunks", accumulate)
+    dataset, aggregates = _run(path)
+    assert dataset.new_rows == 500
+    _assert_matches_full(path, dataset, aggregates)
+    assert aggregates.state.rows == 2_500
+
+
+@pytest.mark.parametrize("change", ["rewrite", "truncate"])
+def test_other_changes_rebuild(tmp_path, lines, change):
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:2_001])
+    _run(path)
+
+    if change == "rewrite":
+        _write(path, [lines[0]] + lines[2:2_001] + [lines[1]])
+    else:
+        _write(path, lines[:1_501])
+
+    dataset, aggregates = _run(path)
+    assert dataset.status == incremental.MODIFIED
+    _assert_matches_full(path, dataset, aggregates)
+
+
+def test_source_check_reads_sampled_blocks_only(tmp_path, lines, monkeypatch):
+    monkeypatch.setattr(incremental, "_CHECK_BLOCK", 1_024)
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:3_001])
+    _run(path)
+    _write(path, lines[3_001:3_100], "a")
+
+    hash_range = incremental._hash_range
+    hashed = []
+
+    def counting(f, start, stop, hasher):
+        hashed.append(stop - start)
+        return hash_range(f, start, stop, hasher)
+
+    monkeypatch.setattr(incremental, "_hash_range", counting)
+    dataset, aggregates = _run(path)
+    assert dataset.status == incremental.APPENDED
+
+    appended = len("".join(lines[3_001:3_100]).encode())
+    assert sum(hashed) <= appended + 2 * incremental._CHECK_SAMPLES * 1_024
+    _assert_matches_full(path, dataset, aggregates)
+
+
+def test_other_mappings_reread_consumed_bytes(tmp_path, lines):
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:1_001])
+    _run(path, {**MAPPINGS, "entity": "region"})
+
+    _write(path, lines[1_001:1_500], "a")
+    dataset, aggregates = _run(path, {**MAPPINGS, "dimensions": ["region"]})
+    _assert_matches_full(path, dataset, aggregates)
+
+
+def test_fingerprint_follows_counted_bytes(tmp_path, lines):
+    path = str(tmp_path / "growing.csv")
+    _write(path, lines[:1_001])
+    first, _ = _run(path)
+
+    _write(path, [lines[1_001][:5]], "a")
+    partial, _ = _run(path)
+    assert partial.fingerprint != first.fingerprint
+    assert _run(path)[0].fingerprint == partial.fingerprint
+
+    _write(path, [lines[1_001][5:]], "a")
+    completed, _ = _run(path)
+    assert completed.fingerprint not in (first.fingerprint, partial.fingerprint)
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from src.v3.schema_extractor import extract_schema
+from src.v4 import parallel_schema
+from src.v4.parallel_schema import extract_schema_parallel
+
+
+def test_parallel_matches_serial(sales_csv):
+    df = pd.read_csv(sales_csv)
+    assert extract_schema_parallel(df, workers=2, min_cells=0) == extract_schema(df)
+
+
+def test_parallel_falls_back_without_scratch_space(sales_csv, monkeypatch):
+    monkeypatch.setattr(parallel_schema, "_scratch_dir", lambda needed: None)
+    df = pd.read_csv(sales_csv)
+    assert extract_schema_parallel(df, workers=2, min_cells=0) == extract_schema(df)
+
+
+def test_cached_columns_are_mapped_not_copied(sales_csv, monkeypatch):
+    from src.utils.dataset_cache import load_csv_cached, mapped_column_file
+
+    load_csv_cached(sales_csv)
+    df = load_csv_cached(sales_csv)
+    assert mapped_column_file(df["revenue"]) is not None
+    assert mapped_column_file(df["revenue"] * 2) is None
+
+    saved = []
+    save = parallel_schema.np.save
+    monkeypatch.setattr(
+        parallel_schema.np, "save", lambda path, values: saved.append(path) or save(path, values)
+    )
+    assert extract_schema_parallel(df, workers=2, min_cells=0) == extract_schema(df)
+    assert saved == []
@@ -0,0 +1,16 @@
+from src.v4.result_cache import ResultCache, result_key
+
+
+def test_hits_are_copies(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+    key = result_key("fp", {"measures": ["revenue"]}, "revenue", "rank")
+    cache.put(key, {"ranking": {"a": 3.0}}, "fp")
+
+    for _ in range(2):
+        result = cache.get(key)
+        result["ranking"]["a"] = 0.0
+        result["explanation"] = "formatted"
+
+    assert cache.get(key) == {"ranking": {"a": 3.0}}
+    assert ResultCache(cache.path).get(key) == {"ranking": {"a": 3.0}}
+    assert cache.memory_hits == 3
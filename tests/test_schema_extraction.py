@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from src.v3.schema_extractor import extract_schema
+from src.v4.streaming_schema import extract_schema_streaming
+
+
+def _approx(report):
+    """
+    Float signals compared approximately (chunked sums add in a different order).
+    """
+    approx = {}
+    for column, info in report.items():
+        approx[column] = dict(info)
+        if "signals" in info:
+            approx[column]["signals"] = {
+                key: pytest.approx(value) if isinstance(value, float) else value
+                for key, value in info["signals"].items()
+            }
+    return approx
+
+
+@pytest.mark.parametrize("chunk_rows", [1_000, 1_234, 100_000])
+def test_streaming_matches_in_memory(sales_csv, chunk_rows):
+    expected = extract_schema(pd.read_csv(sales_csv))
+    assert extract_schema_streaming(sales_csv, chunk_rows) == _approx(expected)
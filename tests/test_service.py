@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from src import service as service_module
+from src.service import AnalyticsService, ServiceError
+
+
+MAPPINGS = {"measures": ["revenue"], "entity": "salesperson", "time": "order_date"}
+
+
+def test_warm_open_skips_load(sales_csv, monkeypatch):
+    service = AnalyticsService(use_profiles=False)
+    first = service.open({"dataset": sales_csv})
+
+    def no_load(*args, **kwargs):
+        raise AssertionError("warm open loaded the dataset")
+
+    monkeypatch.setattr(service_module, "load_dataset", no_load)
+    assert service.open({"dataset": sales_csv})["session"] == first["session"]
+    assert service._opening == {}
+
+
+def test_concurrent_opens_build_once(sales_csv):
+    service = AnalyticsService(use_profiles=False)
+    request = {"dataset": sales_csv, "mappings": MAPPINGS}
+
+    threads = [threading.Thread(target=service.open, args=(request,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(service._sessions) == 1
+    assert service._opening == {}
+
+
+def test_negative_top_k_is_an_error(sales_csv):
+    service = AnalyticsService(use_profiles=False, use_cache=False)
+    session = service.open({"dataset": sales_csv, "mappings": MAPPINGS})["session"]
+
+    with pytest.raises(ValueError):
+        service.analyze({"session": session, "intent": "rank", "params": {"top_k": -3}})
+
+    with pytest.raises(ServiceError):
+        service.analyze({"session": "missing", "intent": "rank"})
+
+
+def test_concurrent_first_loads_parse_once(sales_csv, monkeypatch):
+    from src.utils import dataset_cache
+
+    read_csv = dataset_cache.pd.read_csv
+    parses = []
+
+    def counting(path, *args, **kwargs):
+        if kwargs.get("nrows") != 0:
+            parses.append(path)
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(dataset_cache.pd, "read_csv", counting)
+    barrier = threading.Barrier(4)
+    frames = []
+
+    def load():
+        barrier.wait()
+        frames.append(service_module.load_dataset(sales_csv))
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(parses) == 1
+    assert all(frame.equals(frames[0]) for frame in frames)